@@ -39,6 +39,7 @@ async def ensure_postgres_extensions() -> None:
         async with engine.begin() as connection:
             await connection.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
             await connection.execute(text('CREATE EXTENSION IF NOT EXISTS "postgis"'))
+            await connection.execute(text('CREATE EXTENSION IF NOT EXISTS "pg_trgm"'))
     except SQLAlchemyError as exc:  # pragma: no cover - logged for visibility
         logger.warning("Unable to ensure PostgreSQL extensions: %s", exc)
 
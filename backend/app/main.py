@@ -8,7 +8,11 @@ from app.models import news_models
 from app.config import settings
 from app.database import AsyncSessionLocal, engine
 from app.models.user_family_models import Role  # Import Role for seeding
-from app.routers import auth, users, responders, incidents, disasters, chat, surveys, reports, logs, tasks, disaster_news
+from app.routers import auth, users, responders, incidents, disasters, chat, surveys, reports, logs, tasks, disaster_news, search
+from app.services.chat_writer import CHAT_WRITER
+from app.services.http_client import close_http_pool
+from app.services.news_inference import start_inference, stop_inference
+from app.services.news_precrawl import start_precrawl, stop_precrawl
 
 # --- Lifecycle: Seed Roles on Startup ---
 @asynccontextmanager
@@ -33,9 +37,20 @@ async def lifespan(app: FastAPI):
             session.add_all(role_data)
             await session.commit()
             print("✅ Roles seeded successfully.")
-            
+
+    # Keep newspaper articles warm in the background (NEWS_PRECRAWL_INTERVAL)
+    start_precrawl()
+    # Warm the fake-news classifier worker (NEWS_CLASSIFIER_ENABLED)
+    start_inference()
+
     yield
-    # Shutdown logic if needed
+    # Shutdown: stop the pre-crawl and classifier, save queued chat messages,
+    # close the chat pub/sub connection, then release pooled scraper connections
+    await stop_precrawl()
+    await stop_inference()
+    await CHAT_WRITER.close()
+    await chat.manager.close()
+    await close_http_pool()
 
 app = FastAPI(title="ROSHNI API Backend", lifespan=lifespan)
 
@@ -51,6 +66,7 @@ app.add_middleware(
     allow_credentials=True,  # Required for cookies/session
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor"],  # Chat history paging
 )
 
 # Session Management
@@ -75,6 +91,7 @@ app.include_router(reports.router)
 app.include_router(logs.router)
 app.include_router(tasks.router)
 app.include_router(disaster_news.router)
+app.include_router(search.router)
 
 @app.get("/")
 def root():
@@ -1,6 +1,21 @@
 """
 Disaster News Classifier using BERT model.
 Implements lazy loading to prevent startup crashes.
+
+Batches are length-bucketed: texts are tokenized once without padding, sorted
+by token count and split into buckets of `NEWS_CLASSIFIER_BUCKET_SIZE`, each
+padded only to its longest item (rounded up to a multiple of 16 to bound the
+number of distinct shapes). Predictions are returned in input order. Models
+whose inputs have a fixed sequence length are still padded to that length.
+Set `NEWS_CLASSIFIER_FAST_TOKENIZER=1` to use the Rust `BertTokenizerFast`,
+which produces the same ids as `BertTokenizer`.
+
+`NEWS_CLASSIFIER_BACKEND=onnx` swaps the Keras model for an ONNX Runtime
+session (`app.ml.onnx_backend`) behind the same `predict()` contract.
+
+Predictions are cached by a hash of the cleaned text and the model version
+(`app.ml.prediction_cache`); only texts not seen before reach the model, and
+a fully cached batch does not even load it.
 """
 import logging
 import re
@@ -9,8 +24,70 @@ from typing import List, Optional, Dict, Any
 from pathlib import Path
 import numpy as np
 
+from app.ml.prediction_cache import PredictionCache, prediction_key
+
 logger = logging.getLogger(__name__)
 
+MAX_SEQUENCE_LENGTH = 128  # Standard BERT sequence length
+BUCKET_SIZE = int(os.getenv("NEWS_CLASSIFIER_BUCKET_SIZE", "32"))
+FAST_TOKENIZER = os.getenv("NEWS_CLASSIFIER_FAST_TOKENIZER", "0").lower() in ("1", "true", "yes")
+# Bucket widths are rounded up to this, so the model sees few distinct shapes.
+PAD_TO_MULTIPLE_OF = 16
+PREDICTION_CACHE_SIZE = int(os.getenv("NEWS_CLASSIFIER_CACHE_SIZE", "20000"))
+PREDICTION_CACHE_PATH = os.getenv("NEWS_CLASSIFIER_CACHE_PATH") or None
+# "keras" loads model.h5 through TensorFlow; "onnx" runs an exported copy on ONNX Runtime.
+BACKEND = os.getenv("NEWS_CLASSIFIER_BACKEND", "keras").lower()
+ONNX_MODEL_PATH = os.getenv("NEWS_CLASSIFIER_ONNX_PATH") or None
+ONNX_THREADS = int(os.getenv("NEWS_CLASSIFIER_ONNX_THREADS", "0"))
+# Overrides the version derived from the model file; change it to invalidate cached predictions.
+MODEL_VERSION = os.getenv("NEWS_CLASSIFIER_MODEL_VERSION") or None
+
+
+# Text cleaning, ported from preprocessor.py logic
+_URL_RE = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+_HTML_TAG_RE = re.compile(r'<.*?>')
+_SPECIAL_CHARS_RE = re.compile(r'[^a-zA-Z0-9\s.,!?;:\'-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _length_buckets(lengths: List[int], bucket_size: int) -> List[List[int]]:
+    """Indices grouped into buckets of similar length (shortest first)."""
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    bucket_size = max(1, bucket_size)
+    return [order[i:i + bucket_size] for i in range(0, len(order), bucket_size)]
+
+
+def _labels_from_outputs(outputs) -> List[tuple]:
+    """(label, confidence) per row of model output, computed on whole arrays.
+    
+    Rows are a sigmoid P(REAL) (one column) or a softmax [FAKE, REAL] (two
+    columns); any other width is treated as 50/50. Probabilities are
+    normalised to sum to 1 and the larger one wins, ties going to REAL.
+    """
+    probs = np.asarray(outputs, dtype=np.float64)
+    if probs.ndim == 1:
+        probs = probs[:, None]
+    if probs.shape[1] == 1:
+        prob_real = probs[:, 0]
+        prob_fake = 1.0 - prob_real
+    elif probs.shape[1] == 2:
+        prob_fake, prob_real = probs[:, 0], probs[:, 1]
+    else:
+        prob_fake = prob_real = np.full(len(probs), 0.5)
+    
+    # Normalize (rows summing to <= 0 are left as they are)
+    total = prob_fake + prob_real
+    total = np.where(total > 0, total, 1.0)
+    prob_fake = prob_fake / total
+    prob_real = prob_real / total
+    
+    # Determine label
+    is_fake = prob_fake > prob_real
+    labels = np.where(is_fake, "FAKE", "REAL")
+    confidences = np.where(is_fake, prob_fake, prob_real)
+    return list(zip(labels.tolist(), confidences.tolist()))
+
+
 class DisasterNewsClassifier:
     """
     Singleton-pattern ML classifier for disaster news prediction.
@@ -29,6 +106,8 @@ class DisasterNewsClassifier:
             self.model = None
             self.tokenizer = None
             self.model_path = Path(__file__).parent / "fake_news_model"
+            self.prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_PATH)
+            self._model_version: Optional[str] = None
             DisasterNewsClassifier._initialized = True
             logger.info("DisasterNewsClassifier instance created (lazy loading enabled)")
     
@@ -43,47 +122,25 @@ class DisasterNewsClassifier:
             logger.info("STARTING MODEL LOAD")
             logger.info("="*60)
             
-            # Set TensorFlow to use legacy Keras for compatibility
-            os.environ["TF_USE_LEGACY_KERAS"] = "1"
-            logger.info("Set TF_USE_LEGACY_KERAS=1")
-            
-            import tensorflow as tf
-            from tensorflow import keras
-            from transformers import BertTokenizer
-            
-            logger.info(f"TensorFlow version: {tf.__version__}")
-            logger.info(f"Keras version: {keras.__version__}")
-            
-            model_file = self.model_path / "model.h5"
-            logger.info(f"Model path: {model_file}")
-            logger.info(f"Model exists: {model_file.exists()}")
-            
-            if not model_file.exists():
-                raise FileNotFoundError(
-                    f"Model file not found: {model_file}\n"
-                    f"Please copy the .h5 file to {self.model_path}/"
-                )
-            
-            logger.info(f"Loading BERT model from {model_file}...")
-            
-            # Custom objects for TensorFlow Hub layers - required for KerasLayer
-            import tensorflow_hub as hub
-            logger.info(f"TensorFlow Hub version: {hub.__version__}")
-            custom_objects = {'KerasLayer': hub.KerasLayer}
+            if BACKEND == "onnx":
+                model = self._load_onnx_model()
+            else:
+                model = self._load_keras_model()
             
-            self.model = keras.models.load_model(
-                str(model_file),
-                compile=False,
-                custom_objects=custom_objects
-            )
+            logger.info(f"Model loaded! Type: {type(model)}")
+            logger.info(f"Model inputs: {len(model.inputs)}")
+            logger.info(f"Model outputs: {len(model.outputs)}")
             
-            logger.info(f"Model loaded! Type: {type(self.model)}")
-            logger.info(f"Model inputs: {len(self.model.inputs)}")
-            logger.info(f"Model outputs: {len(self.model.outputs)}")
+            if FAST_TOKENIZER:
+                from transformers import BertTokenizerFast as BertTokenizer
+            else:
+                from transformers import BertTokenizer
             
-            logger.info("Loading BERT tokenizer...")
+            logger.info(f"Loading BERT tokenizer ({BertTokenizer.__name__})...")
             self.tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
             logger.info(f"Tokenizer loaded! Vocab size: {len(self.tokenizer)}")
+            # Set last: a model without its tokenizer must not count as loaded.
+            self.model = model
             
             logger.info("="*60)
             logger.info("MODEL LOAD COMPLETE ✓")
@@ -97,6 +154,82 @@ class DisasterNewsClassifier:
             logger.error(f"Error message: {str(e)}", exc_info=True)
             raise RuntimeError(f"ML Model initialization failed: {str(e)}")
     
+    @property
+    def model_file(self) -> Path:
+        """Weights file of the configured backend."""
+        if BACKEND == "onnx":
+            return Path(ONNX_MODEL_PATH) if ONNX_MODEL_PATH else self.model_path / "model.int8.onnx"
+        return self.model_path / "model.h5"
+    
+    def _load_keras_model(self):
+        # Set TensorFlow to use legacy Keras for compatibility
+        os.environ["TF_USE_LEGACY_KERAS"] = "1"
+        logger.info("Set TF_USE_LEGACY_KERAS=1")
+        
+        import tensorflow as tf
+        from tensorflow import keras
+        
+        logger.info(f"TensorFlow version: {tf.__version__}")
+        logger.info(f"Keras version: {keras.__version__}")
+        
+        model_file = self.model_path / "model.h5"
+        logger.info(f"Model path: {model_file}")
+        logger.info(f"Model exists: {model_file.exists()}")
+        
+        if not model_file.exists():
+            raise FileNotFoundError(
+                f"Model file not found: {model_file}\n"
+                f"Please copy the .h5 file to {self.model_path}/"
+            )
+        
+        logger.info(f"Loading BERT model from {model_file}...")
+        
+        # Custom objects for TensorFlow Hub layers - required for KerasLayer
+        import tensorflow_hub as hub
+        logger.info(f"TensorFlow Hub version: {hub.__version__}")
+        custom_objects = {'KerasLayer': hub.KerasLayer}
+        
+        return keras.models.load_model(
+            str(model_file),
+            compile=False,
+            custom_objects=custom_objects
+        )
+    
+    def _load_onnx_model(self):
+        from app.ml.onnx_backend import OnnxModel
+        
+        model_file = self.model_file
+        logger.info(f"ONNX model path: {model_file}")
+        if not model_file.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found: {model_file}\n"
+                f"Export it with: python -m scripts.export_news_classifier_onnx"
+            )
+        return OnnxModel(model_file, intra_op_threads=ONNX_THREADS)
+    
+    @property
+    def model_version(self) -> str:
+        """Identifies the weights and preprocessing behind a prediction."""
+        if self._model_version is None:
+            if MODEL_VERSION:
+                version = MODEL_VERSION
+            else:
+                try:
+                    stat = self.model_file.stat()
+                    version = f"{BACKEND}:{stat.st_size}-{stat.st_mtime_ns}"
+                except OSError:
+                    version = "unknown"
+            self._model_version = f"{version}/len{MAX_SEQUENCE_LENGTH}"
+        return self._model_version
+    
+    def warmup(self) -> None:
+        """Load the model and run it once, bypassing the prediction cache."""
+        self._load_model()
+        self._run_model(["warmup"])
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.prediction_cache.stats()
+    
     def _clean_text(self, text: str) -> str:
         """
         Clean and preprocess text for prediction.
@@ -109,19 +242,70 @@ class DisasterNewsClassifier:
         text = text.lower()
         
         # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+        text = _URL_RE.sub('', text)
         
         # Remove HTML tags
-        text = re.sub(r'<.*?>', '', text)
+        text = _HTML_TAG_RE.sub('', text)
         
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^a-zA-Z0-9\s.,!?;:\'-]', ' ', text)
+        text = _SPECIAL_CHARS_RE.sub(' ', text)
         
         # Remove extra whitespaces
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         
         return text
     
+    def _clean_texts(self, texts: List[str]) -> List[str]:
+        """`_clean_text` for a whole batch, with one pass of each pattern.
+        
+        The URL, tag and special-character patterns never match across a
+        newline, so they can run once over all texts joined by newlines; each
+        text's lines are then regrouped and its whitespace collapsed.
+        """
+        texts = [text or "" for text in texts]
+        lowered = [text.lower() for text in texts]
+        joined = _SPECIAL_CHARS_RE.sub(' ', _HTML_TAG_RE.sub('', _URL_RE.sub('', "\n".join(lowered))))
+        lines = joined.split("\n")
+        cleaned = []
+        start = 0
+        for text in lowered:
+            end = start + text.count("\n") + 1
+            cleaned.append(_WHITESPACE_RE.sub(' ', " ".join(lines[start:end])).strip())
+            start = end
+        return cleaned
+    
+    def _predict_bucket(self, features: Dict[str, list]) -> np.ndarray:
+        """Pad one bucket of unpadded features and run the model on it."""
+        fixed_length = self.model.inputs[0].shape[1]
+        if fixed_length:
+            padding = dict(padding='max_length', max_length=int(fixed_length))
+        else:
+            padding = dict(padding='longest', pad_to_multiple_of=PAD_TO_MULTIPLE_OF)
+        encoded = self.tokenizer.pad(features, return_attention_mask=True, return_tensors='np', **padding)
+        
+        input_ids = encoded['input_ids']
+        attention_masks = encoded['attention_mask']
+        token_type_ids = encoded.get('token_type_ids')
+        
+        # Handle different model input requirements
+        if token_type_ids is None:
+            token_type_ids = np.zeros_like(input_ids)
+        
+        # Predict based on model input count
+        expected_inputs = len(self.model.inputs)
+        
+        if expected_inputs >= 3:
+            return self.model.predict(
+                [input_ids, attention_masks, token_type_ids], 
+                verbose=0
+            )
+        elif expected_inputs == 2:
+            return self.model.predict(
+                [input_ids, attention_masks], 
+                verbose=0
+            )
+        return self.model.predict(input_ids, verbose=0)
+    
     def predict(self, texts: List[str]) -> List[Dict[str, Any]]:
         """
         Predict whether news articles are REAL or FAKE.
@@ -134,103 +318,62 @@ class DisasterNewsClassifier:
             prediction: 'REAL' or 'FAKE'
             confidence: float between 0 and 1
         """
-        # Lazy load model on first call
-        self._load_model()
-        
         if not texts:
             return []
         
-        try:
-            # Clean all texts
-            cleaned_texts = [self._clean_text(text) for text in texts]
-            
-            logger.info(f"Running prediction on {len(texts)} articles")
-            
-            # Tokenize texts
-            max_length = 128  # Standard BERT sequence length
-            
-            encoded = self.tokenizer.batch_encode_plus(
-                cleaned_texts,
-                add_special_tokens=True,
-                max_length=max_length,
-                padding='max_length',
-                truncation=True,
-                return_attention_mask=True,
-                return_token_type_ids=True,
-                return_tensors='tf'
-            )
-            
-            input_ids = encoded['input_ids']
-            attention_masks = encoded['attention_mask']
-            token_type_ids = encoded.get('token_type_ids')
-            
-            # Handle different model input requirements
-            import tensorflow as tf
-            if token_type_ids is None:
-                token_type_ids = tf.zeros_like(input_ids)
-            
-            # Predict based on model input count
-            expected_inputs = len(self.model.inputs)
-            
-            if expected_inputs >= 3:
-                predictions = self.model.predict(
-                    [input_ids, attention_masks, token_type_ids], 
-                    verbose=0
-                )
-            elif expected_inputs == 2:
-                predictions = self.model.predict(
-                    [input_ids, attention_masks], 
-                    verbose=0
-                )
-            else:
-                predictions = self.model.predict(input_ids, verbose=0)
-            
-            # Format results
-            results = []
-            for idx, (text, pred) in enumerate(zip(texts, predictions)):
-                # Extract probability
-                if isinstance(pred, (list, np.ndarray)):
-                    if len(pred) == 1:
-                        # Binary sigmoid output
-                        prob_real = float(pred[0])
-                        prob_fake = 1.0 - prob_real
-                    elif len(pred) == 2:
-                        # Softmax [FAKE, REAL]
-                        prob_fake = float(pred[0])
-                        prob_real = float(pred[1])
-                    else:
-                        prob_real = 0.5
-                        prob_fake = 0.5
-                else:
-                    prob_real = float(pred)
-                    prob_fake = 1.0 - prob_real
-                
-                # Normalize
-                total = prob_fake + prob_real
-                if total > 0:
-                    prob_fake /= total
-                    prob_real /= total
-                
-                # Determine label
-                if prob_fake > prob_real:
-                    prediction_label = "FAKE"
-                    confidence = prob_fake
-                else:
-                    prediction_label = "REAL"
-                    confidence = prob_real
-                
-                results.append({
-                    'text': text,
-                    'prediction': prediction_label,
-                    'confidence': float(confidence)
-                })
-            
-            logger.info(f"Prediction completed: {len(results)} results")
-            return results
-            
-        except Exception as e:
-            logger.error(f"Prediction failed: {str(e)}", exc_info=True)
-            raise RuntimeError(f"ML Prediction failed: {str(e)}")
+        # Clean all texts
+        cleaned_texts = self._clean_texts(texts)
+        keys = [prediction_key(self.model_version, text) for text in cleaned_texts]
+        cached = self.prediction_cache.get_many(keys)
+        # One model input per distinct uncached text
+        misses = {key: text for key, text in zip(keys, cleaned_texts) if key not in cached}
+        
+        if misses:
+            # Lazy load model on first call
+            self._load_model()
+            try:
+                logger.info(f"Running prediction on {len(misses)} of {len(texts)} articles (rest cached)")
+                predicted = dict(zip(misses, self._run_model(list(misses.values()))))
+            except Exception as e:
+                logger.error(f"Prediction failed: {str(e)}", exc_info=True)
+                raise RuntimeError(f"ML Prediction failed: {str(e)}")
+            self.prediction_cache.set_many(predicted)
+            cached.update(predicted)
+        
+        results = []
+        for text, key in zip(texts, keys):
+            prediction_label, confidence = cached[key]
+            results.append({
+                'text': text,
+                'prediction': prediction_label,
+                'confidence': float(confidence)
+            })
+        logger.info(f"Prediction completed: {len(results)} results")
+        return results
+    
+    def _run_model(self, cleaned_texts: List[str]) -> List[tuple]:
+        """(label, confidence) for each cleaned text, straight from the model."""
+        # Tokenize once, unpadded; each bucket is padded separately below
+        encoded = self.tokenizer(
+            cleaned_texts,
+            add_special_tokens=True,
+            max_length=MAX_SEQUENCE_LENGTH,
+            truncation=True,
+            return_attention_mask=True,
+            return_token_type_ids=True
+        )
+        
+        outputs = None
+        for bucket in _length_buckets([len(ids) for ids in encoded['input_ids']], BUCKET_SIZE):
+            bucket_outputs = np.asarray(self._predict_bucket(
+                {key: [values[i] for i in bucket] for key, values in encoded.items()}
+            ))
+            if outputs is None:
+                outputs = np.empty((len(cleaned_texts),) + bucket_outputs.shape[1:], dtype=bucket_outputs.dtype)
+            # Scatter back to input order
+            outputs[bucket] = bucket_outputs
+        
+        return _labels_from_outputs(outputs)
 
 
 # Global singleton instance for easy import
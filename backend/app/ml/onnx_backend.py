@@ -0,0 +1,62 @@
+"""ONNX Runtime backend for the fake-news classifier.
+
+`OnnxModel` wraps an exported (optionally INT8-quantized) copy of `model.h5`
+behind the two things `DisasterNewsClassifier` uses from a Keras model:
+`inputs[i].shape` and `predict(inputs, verbose=0)`. Selecting it with
+`NEWS_CLASSIFIER_BACKEND=onnx` keeps TensorFlow, TF Hub and Keras out of the
+process entirely. Export and parity-check a model with
+`python -m scripts.export_news_classifier_onnx`.
+
+Requires `pip install onnxruntime`.
+"""
+import logging
+from pathlib import Path
+from typing import List, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_ORT_DTYPES = {
+    "tensor(int32)": np.int32,
+    "tensor(int64)": np.int64,
+    "tensor(float)": np.float32,
+}
+
+
+class _InputSpec:
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: Sequence, dtype):
+        self.name = name
+        # Symbolic dimensions ("batch", "sequence") become None, as in Keras.
+        self.shape = tuple(d if isinstance(d, int) else None for d in shape)
+        self.dtype = dtype
+
+
+class OnnxModel:
+    """Keras-`predict`-compatible view of an ONNX Runtime CPU session."""
+
+    def __init__(self, path: Union[str, Path], intra_op_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.path = Path(path)
+        self.session = ort.InferenceSession(str(self.path), options, providers=["CPUExecutionProvider"])
+        self.inputs = [
+            _InputSpec(i.name, i.shape, _ORT_DTYPES.get(i.type, np.int32)) for i in self.session.get_inputs()
+        ]
+        self.outputs = self.session.get_outputs()
+        logger.info(f"ONNX model loaded from {self.path} ({len(self.inputs)} inputs)")
+
+    def predict(self, inputs: Union[np.ndarray, List[np.ndarray]], verbose: int = 0) -> np.ndarray:
+        if not isinstance(inputs, (list, tuple)):
+            inputs = [inputs]
+        feed = {spec.name: np.asarray(value, dtype=spec.dtype) for spec, value in zip(self.inputs, inputs)}
+        return self.session.run([self.outputs[0].name], feed)[0]
+
+
+__all__ = ["OnnxModel"]
@@ -0,0 +1,109 @@
+"""Prediction cache for the news classifier.
+
+Predictions are keyed by a hash of the cleaned text and the model version, so
+an article seen again (same city re-analysed during a multi-day event) skips
+the model. An in-memory LRU sits in front of an optional SQLite file
+(`NEWS_CLASSIFIER_CACHE_PATH`) that survives restarts and is shared by every
+worker process on the host.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.services.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# (label, confidence)
+Prediction = Tuple[str, float]
+
+
+def prediction_key(model_version: str, cleaned_text: str) -> str:
+    return hashlib.sha256(f"{model_version}\0{cleaned_text}".encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """LRU of predictions with an optional persistent SQLite store behind it."""
+
+    def __init__(self, maxsize: int, path: Optional[str] = None):
+        self._memory: LRUCache[Prediction] = LRUCache(maxsize)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.persistent_hits = 0
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS predictions "
+                    "(key TEXT PRIMARY KEY, prediction TEXT NOT NULL, confidence REAL NOT NULL)"
+                )
+            except sqlite3.Error as exc:
+                logger.warning("Persistent prediction cache disabled (%s): %s", path, exc)
+                self._db = None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Prediction]:
+        found: Dict[str, Prediction] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            hit = self._memory.get(key)
+            if hit is None:
+                missing.append(key)
+            else:
+                found[key] = hit
+        if missing and self._db is not None:
+            stored = self._load(missing)
+            self.persistent_hits += len(stored)
+            for key, hit in stored.items():
+                self._memory.set(key, hit)
+            found.update(stored)
+        return found
+
+    def set_many(self, items: Dict[str, Prediction]) -> None:
+        for key, hit in items.items():
+            self._memory.set(key, hit)
+        if items and self._db is not None:
+            try:
+                with self._db_lock:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO predictions (key, prediction, confidence) VALUES (?, ?, ?)",
+                        [(key, label, confidence) for key, (label, confidence) in items.items()],
+                    )
+            except sqlite3.Error as exc:
+                logger.warning("Could not persist predictions: %s", exc)
+
+    def _load(self, keys: list) -> Dict[str, Prediction]:
+        stored: Dict[str, Prediction] = {}
+        try:
+            with self._db_lock:
+                # Stay well under SQLite's bound-parameter limit.
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, prediction, confidence FROM predictions WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                    stored.update((key, (label, confidence)) for key, label, confidence in rows)
+        except sqlite3.Error as exc:
+            logger.warning("Could not read persisted predictions: %s", exc)
+        return stored
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        stats = self._memory.stats()
+        # A lookup missed in memory but found on disk counts as a hit overall.
+        lookups = stats["hits"] + stats["misses"]
+        hits = stats["hits"] + self.persistent_hits
+        stats.update(
+            persistent=self._db is not None,
+            persistent_hits=self.persistent_hits,
+            overall_hit_rate=hits / lookups if lookups else 0.0,
+        )
+        return stats
+
+
+__all__ = ["PredictionCache", "prediction_key"]
@@ -31,7 +31,7 @@ from .questionnaires_and_logs import (
 )
 from .mapping_and_tracking import MapSite, UserLocationLog
 from .draft_reports import DisasterReportDraft
-from .news_models import NewsState, NewsCity, Newspaper, NewsAnalysisLog
+from .news_models import NewsState, NewsCity, Newspaper, NewsAnalysisLog, NewsAnalysisCache, NewsAnalysisLease, NewsArticle
 
 logger = logging.getLogger(__name__)
 
@@ -151,4 +151,7 @@ __all__ = [
     "NewsCity",
     "Newspaper",
     "NewsAnalysisLog",
+    "NewsAnalysisCache",
+    "NewsAnalysisLease",
+    "NewsArticle",
 ]
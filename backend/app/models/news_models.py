@@ -2,13 +2,14 @@
 Database models for disaster news feature.
 Uses SQLAlchemy 2.0 with strict typing (Mapped).
 """
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, JSON, func, Boolean
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, JSON, func, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
 from app.database import Base
+from app.models.text_search import document_index, trigram_index
 
 
 class NewsState(Base):
@@ -125,3 +126,80 @@ class NewsAnalysisLog(Base):
             f"<NewsAnalysisLog(id={self.id}, user={self.commander_user_id}, "
             f"city='{self.city_name}', timestamp={self.timestamp})>"
         )
+
+
+class NewsAnalysisCache(Base):
+    """Recent analysis results shared between API workers (see shared_analysis_cache)."""
+
+    __tablename__ = "news_analysis_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    result_json: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<NewsAnalysisCache(key='{self.cache_key}', created_at={self.created_at})>"
+
+
+class NewsAnalysisLease(Base):
+    """Which worker is computing an analysis, until when (see shared_analysis_cache)."""
+
+    __tablename__ = "news_analysis_leases"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    owner: Mapped[str] = mapped_column(String(32), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<NewsAnalysisLease(key='{self.cache_key}', owner='{self.owner}', expires_at={self.expires_at})>"
+
+
+class NewsArticle(Base):
+    """Article accepted by a news analysis, kept for history and analytics.
+
+    One row per canonical URL (tracking parameters, fragments and `www.`
+    stripped). `content_hash` identifies the same story syndicated by several
+    papers under different URLs and is unique: such copies are folded into the
+    first row and listed in `sources`. See `app.services.news_archive`.
+    """
+
+    __tablename__ = "news_articles"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    canonical_url: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True, unique=True)
+    newspaper_name: Mapped[str] = mapped_column(String(200), nullable=False)
+    sources: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    title: Mapped[str] = mapped_column(Text, nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    published_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    city: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    state: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    disaster_keyword: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, index=True)
+    severity: Mapped[Optional[str]] = mapped_column(String(50), nullable=True, index=True)
+    priority_score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<NewsArticle(id={self.id}, source='{self.newspaper_name}', url='{self.canonical_url}')>"
+
+
+# Search indexes (see app.repositories.search_repository)
+# The city/state filters compare case-insensitively, so the index is on lower().
+Index("ix_news_articles_city_state_lower", func.lower(NewsArticle.city), func.lower(NewsArticle.state))
+document_index("ix_news_articles_search", NewsArticle.title, NewsArticle.description)
+trigram_index("ix_news_articles_title_trgm", NewsArticle.title)
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -14,6 +15,7 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from ..database import Base
+from .text_search import document_index, trigram_index
 
 
 class DisasterFollower(Base):
@@ -125,6 +127,7 @@ class DisasterLog(Base):
             "('user_input', 'tweet', 'news_article', 'sensor', 'system', 'question_answer')",
             name="ck_disaster_log_source_type",
         ),
+        Index("ix_disaster_logs_disaster_created", "disaster_id", "created_at"),
     )
 
     media_items = None  # relationship set below
@@ -234,10 +237,22 @@ class DisasterChatMessage(Base):
     is_global = Column(Boolean, nullable=False, server_default="false")
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
+    __table_args__ = (
+        # Chat history pages: newest first, keyset on (created_at, message_id).
+        Index("ix_disaster_chat_messages_history", "disaster_id", "is_global", "created_at", "message_id"),
+    )
+
     def __repr__(self) -> str:
         return f"<DisasterChatMessage message_id={self.message_id} disaster_id={self.disaster_id}>"
 
 
+# Search indexes (see app.repositories.search_repository)
+document_index("ix_disaster_logs_search", DisasterLog.title, DisasterLog.text_body)
+trigram_index("ix_disaster_logs_title_trgm", DisasterLog.title)
+document_index("ix_disaster_chat_messages_search", DisasterChatMessage.message_text)
+trigram_index("ix_disaster_chat_messages_text_trgm", DisasterChatMessage.message_text)
+
+
 from sqlalchemy.orm import relationship
 from app.models.disaster_management import Incident
 
@@ -0,0 +1,37 @@
+"""Shared full-text search expressions.
+
+The GIN expression indexes declared next to the models and the queries in
+`app.repositories.search_repository` must build the *same* `to_tsvector(...)`
+expression, or PostgreSQL will not use the index. Both go through
+`search_document`, which renders only literals (no bound parameters) so the
+expression stays identical under prepared statements.
+
+Trigram indexes (`trigram_index`) need the `pg_trgm` extension, installed by
+`app.database.ensure_postgres_extensions`.
+"""
+from sqlalchemy import Index, func, text
+
+SEARCH_CONFIG = text("'english'::regconfig")
+_EMPTY = text("''")
+_SPACE = text("' '")
+
+
+def search_document(*columns):
+    """`to_tsvector('english', col1 || ' ' || col2 ...)` with NULLs treated as ''."""
+    document = func.coalesce(columns[0], _EMPTY)
+    for column in columns[1:]:
+        document = document.op("||")(_SPACE).op("||")(func.coalesce(column, _EMPTY))
+    return func.to_tsvector(SEARCH_CONFIG, document)
+
+
+def search_query(text: str):
+    """Web-search style query (`"quoted phrase" -excluded or alternative`)."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, text)
+
+
+def document_index(name: str, *columns) -> Index:
+    return Index(name, search_document(*columns), postgresql_using="gin")
+
+
+def trigram_index(name: str, column) -> Index:
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column.key: "gin_trgm_ops"})
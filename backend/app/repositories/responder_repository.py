@@ -6,6 +6,7 @@ from geoalchemy2.functions import ST_X, ST_Y
 
 from app.models.responder_models import Team, ResponderProfile
 from app.models.user_family_models import User, UserProfile
+from app.services.chat_auth_cache import CHAT_AUTH_CACHE
 
 class ResponderRepository:
     def __init__(self, db: AsyncSession):
@@ -186,6 +187,7 @@ class ResponderRepository:
         
         await self.db.execute(stmt)
         await self.db.commit()
+        CHAT_AUTH_CACHE.invalidate_user(user_id)
 
         # Fetch updated for return (simplified for now)
         return await self.get_responder_detail(user_id)
@@ -246,6 +248,8 @@ class ResponderRepository:
             await self.db.execute(Team.__table__.delete().where(Team.team_id == team_id))
 
         await self.db.commit()
+        # Its members' cached chat profiles still name the team.
+        CHAT_AUTH_CACHE.invalidate_users()
         return team
 
     async def delete_responder(self, user_id: UUID):
@@ -258,6 +262,7 @@ class ResponderRepository:
 
         await self.db.execute(User.__table__.delete().where(User.user_id == user_id))
         await self.db.commit()
+        CHAT_AUTH_CACHE.invalidate_user(user_id)
         return True
 
     async def assign_responder_to_team(self, user_id: UUID, team_id: UUID | None):
@@ -271,6 +276,7 @@ class ResponderRepository:
             update(ResponderProfile).where(ResponderProfile.user_id == user_id).values(**values)
         )
         await self.db.commit()
+        CHAT_AUTH_CACHE.invalidate_user(user_id)
         return await self.get_responder_detail(user_id)
 
     async def get_responder_team(self, user_id: UUID):
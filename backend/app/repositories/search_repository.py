@@ -0,0 +1,245 @@
+"""Ranked full-text search over news articles, disaster logs and chat messages.
+
+A row matches when its document (`app.models.text_search.search_document`)
+matches the web-search style query, served by the GIN `to_tsvector` indexes,
+or when the query is word-similar to its title / message (`%>`, served by
+the `pg_trgm` indexes) so misspelt place names and partial words still hit.
+Rank is `ts_rank_cd + word_similarity`.
+
+Pages are keyset-paginated: the cursor carries the sort key of the last row
+returned, `(rank, created_at, id)` or `(created_at, id)`, so page N costs the
+same as page 1 and rows inserted meanwhile do not shift later pages.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import cast, func, literal, null, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.news_models import NewsArticle
+from app.models.questionnaires_and_logs import DisasterChatMessage, DisasterLog
+from app.models.text_search import SEARCH_CONFIG, search_document, search_query
+
+MAX_LIMIT = 100
+_HEADLINE_OPTIONS = "MaxFragments=1, MaxWords=30, MinWords=10"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+def encode_cursor(values: List[Any]) -> str:
+    payload = [_jsonable(value) for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str, id_type: Callable[[Any], Any]) -> List[Any]:
+    """Sort key `[rank, created_at, id]` (relevance) or `[created_at, id]` (recent)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if sort == "relevance":
+            rank, created_at, row_id = values
+            return [float(rank), datetime.fromisoformat(created_at), id_type(row_id)]
+        created_at, row_id = values
+        return [datetime.fromisoformat(created_at), id_type(row_id)]
+    except (TypeError, ValueError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+class SearchRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _search(
+        self,
+        kind: str,
+        q: str,
+        *,
+        id_column,
+        id_type: Callable[[Any], Any],
+        created_at,
+        document,
+        fuzzy_column,
+        title,
+        body,
+        extra_columns: dict,
+        filters: list,
+        sort: str,
+        limit: int,
+        cursor: Optional[str],
+    ) -> Tuple[List[dict], Optional[str]]:
+        limit = max(1, min(limit, MAX_LIMIT))
+        tsquery = search_query(q)
+        rank = (
+            func.ts_rank_cd(document, tsquery) + func.word_similarity(q, func.coalesce(fuzzy_column, literal("")))
+        ).label("rank")
+        sort_key = [rank, created_at, id_column] if sort == "relevance" else [created_at, id_column]
+
+        stmt = (
+            select(
+                id_column.label("id"),
+                title.label("title"),
+                func.ts_headline(SEARCH_CONFIG, body, tsquery, _HEADLINE_OPTIONS).label("snippet"),
+                rank,
+                created_at.label("created_at"),
+                *(column.label(name) for name, column in extra_columns.items()),
+            )
+            .where(or_(document.op("@@")(tsquery), fuzzy_column.op("%>")(q)), *filters)
+            .order_by(*(key.desc() for key in sort_key))
+            .limit(limit + 1)
+        )
+        if cursor:
+            stmt = stmt.where(tuple_(*sort_key) < tuple_(*decode_cursor(cursor, sort, id_type)))
+
+        rows = (await self.db.execute(stmt)).mappings().all()
+        hits = [dict(row, kind=kind, id=str(row["id"])) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            keys = [last["rank"], last["created_at"], last["id"]] if sort == "relevance" else [last["created_at"], last["id"]]
+            next_cursor = encode_cursor(keys)
+        return hits, next_cursor
+
+    async def search_news(
+        self,
+        q: str,
+        source: Optional[str] = None,
+        keyword: Optional[str] = None,
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        created_at = func.coalesce(NewsArticle.published_at, NewsArticle.first_seen_at)
+        filters = []
+        if source:
+            filters.append(or_(
+                NewsArticle.newspaper_name == source,
+                cast(NewsArticle.sources, JSONB).contains([source]),
+            ))
+        if keyword:
+            filters.append(NewsArticle.disaster_keyword == keyword.lower())
+        if city:
+            filters.append(func.lower(NewsArticle.city) == city.lower())
+        if state:
+            filters.append(func.lower(NewsArticle.state) == state.lower())
+        if since:
+            filters.append(created_at >= since)
+        if until:
+            filters.append(created_at < until)
+        return await self._search(
+            "news", q,
+            id_column=NewsArticle.id,
+            id_type=int,
+            created_at=created_at,
+            document=search_document(NewsArticle.title, NewsArticle.description),
+            fuzzy_column=NewsArticle.title,
+            title=NewsArticle.title,
+            body=func.coalesce(NewsArticle.description, NewsArticle.title),
+            extra_columns={
+                "source": NewsArticle.newspaper_name,
+                "sources": NewsArticle.sources,
+                "url": NewsArticle.url,
+            },
+            filters=filters,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    async def search_logs(
+        self,
+        q: str,
+        disaster_id: Optional[UUID] = None,
+        source: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        filters = []
+        if disaster_id:
+            filters.append(DisasterLog.disaster_id == disaster_id)
+        if source:
+            filters.append(DisasterLog.source_type == source)
+        if since:
+            filters.append(DisasterLog.created_at >= since)
+        if until:
+            filters.append(DisasterLog.created_at < until)
+        return await self._search(
+            "log", q,
+            id_column=DisasterLog.log_id,
+            id_type=UUID,
+            created_at=DisasterLog.created_at,
+            document=search_document(DisasterLog.title, DisasterLog.text_body),
+            fuzzy_column=DisasterLog.title,
+            title=DisasterLog.title,
+            body=func.coalesce(DisasterLog.text_body, DisasterLog.title),
+            extra_columns={
+                "disaster_id": DisasterLog.disaster_id,
+                "source": DisasterLog.source_type,
+            },
+            filters=filters,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    async def search_chat(
+        self,
+        q: str,
+        disaster_id: Optional[UUID] = None,
+        team_id: Optional[UUID] = None,
+        sender_user_id: Optional[UUID] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sort: str = "relevance",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        filters = []
+        if disaster_id:
+            filters.append(DisasterChatMessage.disaster_id == disaster_id)
+        if team_id:
+            filters.append(DisasterChatMessage.team_id == team_id)
+        if sender_user_id:
+            filters.append(DisasterChatMessage.sender_user_id == sender_user_id)
+        if since:
+            filters.append(DisasterChatMessage.created_at >= since)
+        if until:
+            filters.append(DisasterChatMessage.created_at < until)
+        return await self._search(
+            "chat", q,
+            id_column=DisasterChatMessage.message_id,
+            id_type=UUID,
+            created_at=DisasterChatMessage.created_at,
+            document=search_document(DisasterChatMessage.message_text),
+            fuzzy_column=DisasterChatMessage.message_text,
+            title=null(),
+            body=DisasterChatMessage.message_text,
+            extra_columns={
+                "disaster_id": DisasterChatMessage.disaster_id,
+                "team_id": DisasterChatMessage.team_id,
+                "sender_user_id": DisasterChatMessage.sender_user_id,
+            },
+            filters=filters,
+            sort=sort,
+            limit=limit,
+            cursor=cursor,
+        )
@@ -9,6 +9,7 @@ from app.models.disaster_management import DisasterTask, DisasterTaskAssignment
 from app.models.responder_models import Team, ResponderProfile
 from app.models.questionnaires_and_logs import DisasterLog
 from app.schemas.tasks import TaskCreateRequest
+from app.services.chat_auth_cache import CHAT_AUTH_CACHE
 
 class TaskRepository:
     def __init__(self, db: AsyncSession):
@@ -107,13 +108,16 @@ class TaskRepository:
             .values(status='deployed')
         )
 
+        disaster_id = (await self.db.get(DisasterTask, task_id)).disaster_id
         await self._log_task_action(
-            (await self.db.get(DisasterTask, task_id)).disaster_id,
+            disaster_id,
             commander_id,
             "Team Assigned",
             f"Team {team_id} assigned to task {task_id}",
         )
         await self.db.commit()
+        # The team may now join the disaster's chat.
+        CHAT_AUTH_CACHE.invalidate_disaster(disaster_id)
 
     async def update_assignment_status(self, task_id: UUID, team_id: UUID, status: str, eta: datetime = None):
         # 1. Prepare Updates
@@ -177,6 +181,7 @@ class TaskRepository:
             f"Team {team_id} updated status to {status}",
         )
         await self.db.commit()
+        CHAT_AUTH_CACHE.invalidate_disaster(task.disaster_id)
 
     async def get_user_team_id(self, user_id: UUID) -> UUID | None:
         # Helper to verify if a user belongs to a specific team
@@ -210,4 +215,6 @@ class TaskRepository:
             f"Task {task_id} deleted",
         )
         await self.db.commit()
+        # Its assignments went with it.
+        CHAT_AUTH_CACHE.invalidate_disaster(disaster_id)
         return True
@@ -1,17 +1,20 @@
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, status, Body
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, Response, status, Body
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import func, literal, select, tuple_
 from sqlalchemy.orm import selectinload
 
 from app.database import get_db, AsyncSessionLocal
-from app.models.user_family_models import User
+from app.models.user_family_models import Role, User, UserProfile
 from app.models.questionnaires_and_logs import DisasterChatMessage
-from app.models.responder_management import ResponderProfile, Team
-from app.models.disaster_management import DisasterTask, DisasterTaskAssignment
+from app.models.responder_management import Team
+from app.repositories.search_repository import InvalidCursorError, decode_cursor, encode_cursor
 from app.repositories.user_repository import UserRepository
+from app.services.chat_auth_cache import CHAT_AUTH_CACHE, ChatUser
+from app.services.chat_writer import CHAT_WRITER, new_message_row
+from app.services.pubsub import create_pubsub_backend
 from app.services.websocket_manager import ConnectionManager
 from app.schemas.chat import ChatMessageResponse, ChatMessageCreate
 from app.dependencies import RoleChecker, get_current_user
@@ -23,9 +26,12 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
 
+HISTORY_MAX_LIMIT = 200
+
 
 router = APIRouter(prefix="/chat", tags=["Real-Time Chat"])
-manager = ConnectionManager()
+# Broadcasts reach sockets on every worker through CHAT_PUBSUB_BACKEND.
+manager = ConnectionManager(backend=create_pubsub_backend())
 
 
 async def _call_llm(context: str, prompt: str) -> dict:
@@ -103,15 +109,20 @@ async def get_user_from_token_or_cookie(
         return None
 
 
+async def _chat_user(websocket: WebSocket, db: AsyncSession) -> Optional[ChatUser]:
+    """The connecting user as a cached `ChatUser` snapshot (see chat_auth_cache)."""
+    user_id_str = websocket.query_params.get("user_id")
+    if not user_id_str:
+        return None
+    try:
+        user_uuid = UUID(user_id_str)
+    except ValueError:
+        return None
+    return await CHAT_AUTH_CACHE.user(db, user_uuid)
+
+
 async def _teams_for_disaster(db: AsyncSession, disaster_id: UUID) -> List[UUID]:
-    stmt = (
-        select(DisasterTaskAssignment.team_id)
-        .join(DisasterTask, DisasterTaskAssignment.task_id == DisasterTask.task_id)
-        .where(DisasterTask.disaster_id == disaster_id)
-    )
-    res = await db.execute(stmt)
-    team_ids = [row[0] for row in res.all() if row[0] is not None]
-    return team_ids
+    return list(await CHAT_AUTH_CACHE.disaster_teams(db, disaster_id))
 
 
 @router.get("/{disaster_id}/history", response_model=List[ChatMessageResponse])
@@ -120,84 +131,77 @@ async def get_chat_history(
     scope: str = Query("team", regex="^(team|global)$"),
     team_id: Optional[UUID] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    response: Response = None,
     db: AsyncSession = Depends(get_db),
 ):
+    """Newest messages first, one page at a time.
+
+    When the page is full, the `X-Next-Cursor` response header holds the sort
+    key `(created_at, message_id)` of its oldest message; pass it back as
+    `cursor` for the page before it. Each page is one range scan of
+    `ix_disaster_chat_messages_history`, however far back it is; databases
+    created before that index existed get it from
+    `schemas/migrations/search_indexes.sql`.
+    """
     # FastAPI's Query(...) places a sentinel object as the default when the
     # function is invoked by the framework. Tests may call this function
     # directly where `scope` can be that sentinel instead of a plain string.
     # Normalize so direct calls behave the same as route calls.
     if not isinstance(scope, str):
         scope = getattr(scope, "default", "team")
-    # Determine filter
-    teams = await _teams_for_disaster(db, disaster_id)
-    
-    if not teams:
-        teams = []
+    limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+    before = None
+    if cursor:
+        try:
+            before = decode_cursor(cursor, "recent", UUID)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Include messages still waiting in the write-behind queue.
+    await CHAT_WRITER.flush()
 
-    if scope == "team":
-        if team_id and team_id not in teams:
+    if scope == "team" and team_id:
+        teams = await _teams_for_disaster(db, disaster_id)
+        if team_id not in teams:
             raise HTTPException(status_code=403, detail="Team not part of disaster")
-        
-        stmt = (
-            select(DisasterChatMessage)
-            .options(
-                selectinload(DisasterChatMessage.sender)
-                    .selectinload(User.profile),
-                selectinload(DisasterChatMessage.sender)
-                    .selectinload(User.role)
-            )
-            .where(
-                DisasterChatMessage.disaster_id == disaster_id,
-                DisasterChatMessage.is_global == False,
-            )
-            .order_by(desc(DisasterChatMessage.created_at))
-            .limit(limit)
+
+    # Only the sender's display name and role are needed, not their User rows.
+    stmt = (
+        select(
+            DisasterChatMessage.message_id,
+            DisasterChatMessage.disaster_id,
+            DisasterChatMessage.team_id,
+            DisasterChatMessage.sender_user_id,
+            DisasterChatMessage.message_text,
+            DisasterChatMessage.is_global,
+            DisasterChatMessage.created_at,
+            func.coalesce(
+                func.nullif(UserProfile.full_name, ""), func.nullif(User.email, ""), literal("Unknown")
+            ).label("sender_name"),
+            func.coalesce(Role.name, literal("civilian")).label("sender_role"),
         )
-    else:
-        # global
-        
-        stmt = (
-            select(DisasterChatMessage)
-            .options(
-                selectinload(DisasterChatMessage.sender)
-                    .selectinload(User.profile),
-                selectinload(DisasterChatMessage.sender)
-                    .selectinload(User.role)
-            )
-            .where(
-                DisasterChatMessage.disaster_id == disaster_id,
-                DisasterChatMessage.is_global == True,
-            )
-            .order_by(desc(DisasterChatMessage.created_at))
-            .limit(limit)
+        .outerjoin(User, User.user_id == DisasterChatMessage.sender_user_id)
+        .outerjoin(UserProfile, UserProfile.user_id == DisasterChatMessage.sender_user_id)
+        .outerjoin(Role, Role.role_id == User.role_id)
+        .where(
+            DisasterChatMessage.disaster_id == disaster_id,
+            DisasterChatMessage.is_global == (scope == "global"),
+        )
+        .order_by(DisasterChatMessage.created_at.desc(), DisasterChatMessage.message_id.desc())
+        .limit(limit)
+    )
+    if before is not None:
+        stmt = stmt.where(
+            tuple_(DisasterChatMessage.created_at, DisasterChatMessage.message_id) < tuple_(*before)
         )
 
     result = await db.execute(stmt)
-    messages = result.scalars().all()
+    messages = [ChatMessageResponse(**row._asdict()) for row in result.all()]
 
-    response = []
-    for msg in messages:
-        sender_name = "Unknown"
-        sender_role = "civilian"
-        if msg.sender:
-            profile = getattr(msg.sender, "profile", None)
-            sender_name = getattr(profile, "full_name", None) or msg.sender.email or sender_name
-            if msg.sender.role:
-                sender_role = msg.sender.role.name
-
-        response.append(ChatMessageResponse(
-            message_id=msg.message_id,
-            disaster_id=msg.disaster_id,
-            team_id=getattr(msg, "team_id", None),
-            sender_user_id=msg.sender_user_id,
-            sender_name=sender_name,
-            sender_role=sender_role,
-            message_text=msg.message_text,
-            is_global=getattr(msg, "is_global", False),
-            created_at=msg.created_at,
-        ))
-
-    return response
+    if response is not None and len(messages) == limit:
+        last = messages[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last.created_at, last.message_id])
+    return messages
 
 
 def _format_message_response(msg: DisasterChatMessage, sender_name: str, sender_role: str) -> ChatMessageResponse:
@@ -225,6 +229,7 @@ async def update_message(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    await CHAT_WRITER.flush()  # the message may still be queued
     message = await db.get(DisasterChatMessage, message_id)
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
@@ -244,6 +249,7 @@ async def delete_message(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    await CHAT_WRITER.flush()  # the message may still be queued
     message = await db.get(DisasterChatMessage, message_id)
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
@@ -253,70 +259,68 @@ async def delete_message(
     await db.commit()
     return {"message": "Message deleted"}
 
+def _sender_fields(user: ChatUser) -> Dict[str, str]:
+    return {"sender_name": user.sender_name, "sender_role": user.sender_role}
+
+
+async def _reject(websocket: WebSocket, row: dict, detail: str) -> None:
+    """Tell the sender their message was not sent; nobody else sees it."""
+    await websocket.send_json({"error": "message_not_sent", "message_id": str(row["message_id"]), "detail": detail})
+
+
+async def _send_message(websocket: WebSocket, row: dict, sender: Dict[str, str], room_key: str) -> None:
+    message = {**row, **sender}
+    if not manager.fits(message):
+        # Pub/sub could not carry it to the other workers; refuse it rather than half-deliver it.
+        await _reject(websocket, row, "Message is too long to send; split it into shorter messages.")
+        return
+    # Broadcast now; the row is saved by the next batch (CHAT_FLUSH_INTERVAL_MS).
+    if not CHAT_WRITER.submit(row):
+        await _reject(websocket, row, "Chat is temporarily unable to save messages; try again shortly.")
+        return
+    await manager.broadcast(message, room_key)
+
+
 @router.websocket("/ws/{disaster_id}")  # pragma: no cover
 async def websocket_endpoint(
     websocket: WebSocket, 
     disaster_id: UUID
 ):
+    # Reconnect storms hit the auth cache instead of the database.
     async with AsyncSessionLocal() as db:
-        user = await get_user_from_token_or_cookie(websocket, db=db)
+        user = await _chat_user(websocket, db)
         if not user:
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
         teams = await _teams_for_disaster(db, disaster_id)
-        if not teams:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-            return
+    if not teams:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
 
-        # Check membership: only allow actual team members (commanders removed)
-        stmt = select(ResponderProfile).where(ResponderProfile.user_id == user.user_id)
-        rres = await db.execute(stmt)
-        profile = rres.scalar_one_or_none()
+    # Only a responder with a profile assigned to this team can join (commanders removed)
+    if not user.is_responder or user.team_id not in teams:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
 
-        # Only a responder with a profile assigned to this team can join
-        if not profile or profile.team_id not in teams:
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-            return
+    room_key = f"teams:{disaster_id}"
+    await manager.connect(websocket, room_key)
 
-        room_key = f"teams:{disaster_id}"
-        await manager.connect(websocket, room_key)
-
-        can_write = bool(profile)
+    can_write = user.is_responder
 
+    sender = _sender_fields(user)
     try:
         while True:
             data = await websocket.receive_text()
             if not can_write:
                 continue
 
-            async with AsyncSessionLocal() as db:
-                new_msg = DisasterChatMessage(
-                    disaster_id=disaster_id,
-                    team_id=profile.team_id,
-                    sender_user_id=user.user_id,
-                    message_text=data,
-                    is_global=False,
-                )
-                db.add(new_msg)
-                await db.commit()
-                await db.refresh(new_msg)
-
-                payload = {
-                    "message_id": new_msg.message_id,
-                    "disaster_id": new_msg.disaster_id,
-                    "team_id": new_msg.team_id,
-                    "sender_user_id": new_msg.sender_user_id,
-                    "sender_name": user.full_name or user.email,
-                    "sender_role": user.role.name if user.role else "civilian",
-                    "message_text": new_msg.message_text,
-                    "is_global": False,
-                    "created_at": new_msg.created_at,
-                }
-
-            await manager.broadcast(payload, room_key)
+            row = new_message_row(disaster_id, user.user_id, data, is_global=False, team_id=user.team_id)
+            await _send_message(websocket, row, sender, room_key)
 
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, room_key)
 
 
@@ -326,67 +330,41 @@ async def websocket_global(
     disaster_id: UUID,
 ):
     async with AsyncSessionLocal() as db:
-        user = await get_user_from_token_or_cookie(websocket, db=db)
+        user = await _chat_user(websocket, db)
         if not user:
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
         teams = await _teams_for_disaster(db, disaster_id)
-        # Build set of team ids
-        team_set = set(teams)
-
-        stmt = select(ResponderProfile).where(ResponderProfile.user_id == user.user_id)
-        rres = await db.execute(stmt)
-        profile = rres.scalar_one_or_none()
+    # Build set of team ids
+    team_set = set(teams)
 
-        is_commander = (user.role and user.role.name == "commander")
-        is_logistician = bool(profile and profile.responder_type == "logistician" and profile.team_id in team_set)
+    is_commander = user.role_name == "commander"
+    is_logistician = user.responder_type == "logistician" and user.team_id in team_set
 
-        if not (is_commander or is_logistician):
-            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-            return
+    if not (is_commander or is_logistician):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
 
-        room_key = f"global:{disaster_id}"
-        await manager.connect(websocket, room_key)
+    room_key = f"global:{disaster_id}"
+    await manager.connect(websocket, room_key)
 
-        can_write = is_commander or is_logistician
+    can_write = is_commander or is_logistician
 
+    sender = _sender_fields(user)
     try:
         while True:
             data = await websocket.receive_text()
             if not can_write:
                 continue
 
-            async with AsyncSessionLocal() as db:
-                new_msg = DisasterChatMessage(
-                    disaster_id=disaster_id,
-                    sender_user_id=user.user_id,
-                    message_text=data,
-                    is_global=True,
-                )
-                # Optionally link team_id of sender when available
-                if profile:
-                    new_msg.team_id = profile.team_id
-
-                db.add(new_msg)
-                await db.commit()
-                await db.refresh(new_msg)
-
-                payload = {
-                    "message_id": new_msg.message_id,
-                    "disaster_id": new_msg.disaster_id,
-                    "team_id": getattr(new_msg, "team_id", None),
-                    "sender_user_id": new_msg.sender_user_id,
-                    "sender_name": user.full_name or user.email,
-                    "sender_role": user.role.name if user.role else "civilian",
-                    "message_text": new_msg.message_text,
-                    "is_global": True,
-                    "created_at": new_msg.created_at,
-                }
-
-            await manager.broadcast(payload, room_key)
+            # Optionally link team_id of sender when available
+            row = new_message_row(disaster_id, user.user_id, data, is_global=True, team_id=user.team_id)
+            await _send_message(websocket, row, sender, room_key)
 
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, room_key)
         
 
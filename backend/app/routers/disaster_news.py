@@ -3,18 +3,21 @@ Disaster News Analysis API Router.
 Provides endpoints for analyzing disaster-related news articles.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from pydantic import BaseModel, Field
+import json
 import logging
 from datetime import datetime
 
 from app.database import get_db
 from app.models.news_models import NewsState, NewsCity, Newspaper, NewsAnalysisLog
 from app.dependencies import RoleChecker, get_current_user
-from app.services.news_scraper import fetch_all_news
+from app.services.news_inference import NEWS_INFERENCE, classify_news
+from app.services.news_precrawl import analyze_news, stream_news
 from app.services.news_selection import build_prioritized_newspaper_dicts
 from app.models.user_family_models import User
 
@@ -32,6 +35,9 @@ class NewsAnalysisRequest(BaseModel):
     state_id: int = Field(..., description="State ID", gt=0)
     city: str = Field(..., description="City name", min_length=1)
     keyword: Optional[str] = Field(None, description="Optional additional keyword filter")
+    force_refresh: bool = Field(
+        False, description="Re-crawl the selected newspapers now instead of using pre-crawled articles"
+    )
 
 
 class NewsArticleResult(BaseModel):
@@ -81,6 +87,47 @@ class AnalysisHistoryItem(BaseModel):
     fake_count: int
     real_count: int
 
+async def _prediction_results(articles: List[dict]) -> List[dict]:
+    """Scraped articles in `NewsArticleResult` shape, classified REAL/FAKE.
+
+    Predictions come from the batched classifier worker (`news_inference`);
+    when it is disabled or fails every article is UNAVAILABLE.
+    """
+    predictions = await classify_news(
+        [f"{article['title']} {article.get('description', '')}" for article in articles]
+    )
+    prediction_results = []
+    for idx, article in enumerate(articles):
+        pred = predictions[idx] if predictions else {}
+        prediction_results.append({
+            'source': article.get('newspaper_name', 'IMD'),
+            'title': article['title'],
+            'description': article.get('description', ''),
+            'link': article.get('link', ''),
+            'published': article.get('published') or 'Unknown',
+            'prediction': pred.get('prediction', 'UNAVAILABLE'),
+            'confidence': pred.get('confidence'),
+            'disaster_keyword': article.get('disaster_keyword'),
+            'priority_score': article.get('priority_score')
+        })
+    return prediction_results
+
+
+def _prediction_counts(prediction_results: List[dict]) -> dict:
+    unavailable_count = sum(1 for r in prediction_results if r['prediction'] == 'UNAVAILABLE')
+    if unavailable_count:
+        message = "Analysis completed successfully (ML prediction unavailable for some articles)"
+    else:
+        message = "Analysis completed successfully"
+    return {
+        'total_articles': len(prediction_results),
+        'fake_count': sum(1 for r in prediction_results if r['prediction'] == 'FAKE'),
+        'real_count': sum(1 for r in prediction_results if r['prediction'] == 'REAL'),
+        'unavailable_count': unavailable_count,
+        'message': message,
+    }
+
+
 @router.post("/analyze", response_model=NewsAnalysisResponse)
 async def analyze_disaster_news(
     request: NewsAnalysisRequest,
@@ -93,7 +140,8 @@ async def analyze_disaster_news(
     - Identify local newspapers for the requested city/state (is_national = False)
     - Identify national newspapers (is_national = True)
     - Build prioritized list: [first local] + first 5 national
-    - Pass combined list to scraper orchestrator
+    - Answer from the warm pre-crawled article store (papers with no fresh
+      crawl, or all of them with `force_refresh`, are crawled first)
     """
     try:
         # Fake user for environments without auth wired yet
@@ -112,9 +160,9 @@ async def analyze_disaster_news(
                 detail="No prioritized newspapers available (seed data missing)."
             )
 
-        # Scrape combined sources
+        # Query pre-crawled sources
         try:
-            articles = await fetch_all_news(newspaper_dicts, request.keyword)
+            articles = await analyze_news(newspaper_dicts, request.keyword, force_refresh=request.force_refresh)
         except Exception as scrape_error:
             logger.error(f"Scraping failed: {scrape_error}", exc_info=True)
             raise HTTPException(
@@ -133,35 +181,11 @@ async def analyze_disaster_news(
                 message="No disaster-related news articles found for the selected location"
             )
 
-        # Predictions (CNN classifier removed; fallback only)
-        prediction_results = []
-        for article in articles:
-            prediction_results.append({
-                'source': article.get('newspaper_name', 'IMD'),
-                'title': article['title'],
-                'description': article.get('description', ''),
-                'link': article.get('link', ''),
-                'published': article.get('published') or 'Unknown',
-                'prediction': 'UNAVAILABLE',
-                'confidence': None,
-                'disaster_keyword': article.get('disaster_keyword'),
-                'priority_score': article.get('priority_score')
-            })
-
-        fake_count = sum(1 for r in prediction_results if r['prediction'] == 'FAKE')
-        real_count = sum(1 for r in prediction_results if r['prediction'] == 'REAL')
-        unavailable_count = sum(1 for r in prediction_results if r['prediction'] == 'UNAVAILABLE')
-
-        message = "Analysis completed successfully (ML prediction unavailable; classifier removed)"
-
+        prediction_results = await _prediction_results(articles)
         return NewsAnalysisResponse(
             success=True,
-            total_articles=len(prediction_results),
-            fake_count=fake_count,
-            real_count=real_count,
-            unavailable_count=unavailable_count,
             articles=[NewsArticleResult(**r) for r in prediction_results],
-            message=message
+            **_prediction_counts(prediction_results)
         )
     except HTTPException:
         raise
@@ -173,6 +197,59 @@ async def analyze_disaster_news(
         )
 
 
+@router.post("/analyze/stream")
+async def analyze_disaster_news_stream(
+    request: NewsAnalysisRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Streaming variant of `/analyze` (NDJSON, one JSON object per line).
+
+    Frames, in order:
+    - `{"type": "source", "source": ..., "articles": [...]}` for the IMD feed
+      and each newspaper, as soon as that source is ready (articles in the
+      `NewsArticleResult` shape);
+    - `{"type": "summary", "success": true, ...counts, "message": ...}` once
+      every source is in, with the same counts as `/analyze`;
+    - `{"type": "error", "detail": ...}` instead of the summary if the
+      analysis fails after the response has started.
+    """
+    newspaper_dicts = await build_prioritized_newspaper_dicts(
+        db=db,
+        state_id=request.state_id,
+        city_name=request.city
+    )
+    if not newspaper_dicts:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No prioritized newspapers available (seed data missing)."
+        )
+
+    async def frames():
+        prediction_results = []
+        try:
+            async for source, articles in stream_news(
+                newspaper_dicts, request.keyword, force_refresh=request.force_refresh
+            ):
+                results = await _prediction_results(articles)
+                prediction_results.extend(results)
+                frame = {
+                    "type": "source",
+                    "source": source,
+                    "articles": [NewsArticleResult(**r).model_dump() for r in results],
+                }
+                yield json.dumps(frame) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}", exc_info=True)
+            yield json.dumps({"type": "error", "detail": f"News scraping failed: {str(e)}"}) + "\n"
+            return
+        summary = {"type": "summary", "success": True, **_prediction_counts(prediction_results)}
+        if not prediction_results:
+            summary["message"] = "No disaster-related news articles found for the selected location"
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+
 # @router.post("/analyze", response_model=NewsAnalysisResponse)
 # async def analyze_disaster_news(
 #     request: NewsAnalysisRequest,
@@ -343,6 +420,19 @@ async def analyze_disaster_news(
 #         )
 
 
+@router.get("/classifier/stats")
+async def get_classifier_stats(
+    current_user: User = Depends(RoleChecker(["commander"]))
+):
+    """Batching counters of the classifier worker and its prediction-cache hit rate."""
+    try:
+        cache = await NEWS_INFERENCE.cache_stats()
+    except Exception as e:
+        logger.warning(f"Classifier cache stats unavailable: {e}")
+        cache = None
+    return {"service": NEWS_INFERENCE.stats(), "cache": cache}
+
+
 @router.get("/states", response_model=List[StateResponse])
 async def get_news_states(
     db: AsyncSession = Depends(get_db),
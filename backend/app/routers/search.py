@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import RoleChecker
+from app.repositories.search_repository import MAX_LIMIT, InvalidCursorError, SearchRepository
+from app.schemas.search import SearchResponse, SearchSort
+
+router = APIRouter(prefix="/search", tags=["Search"], dependencies=[Depends(RoleChecker(["commander"]))])
+
+QueryText = Query(..., min_length=2, max_length=200, description="Words, \"phrases\" and -exclusions")
+PageSize = Query(20, ge=1, le=MAX_LIMIT)
+
+
+async def _page(search) -> SearchResponse:
+    try:
+        results, next_cursor = await search
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return SearchResponse(results=results, next_cursor=next_cursor)
+
+
+@router.get("/news", response_model=SearchResponse)
+async def search_news(
+    q: str = QueryText,
+    source: Optional[str] = None,
+    keyword: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sort: SearchSort = "relevance",
+    limit: int = PageSize,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await _page(SearchRepository(db).search_news(
+        q, source=source, keyword=keyword, city=city, state=state,
+        since=since, until=until, sort=sort, limit=limit, cursor=cursor,
+    ))
+
+
+@router.get("/logs", response_model=SearchResponse)
+async def search_logs(
+    q: str = QueryText,
+    disaster_id: Optional[UUID] = None,
+    source: Optional[str] = Query(None, description="Log source_type, e.g. user_input or system"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sort: SearchSort = "relevance",
+    limit: int = PageSize,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await _page(SearchRepository(db).search_logs(
+        q, disaster_id=disaster_id, source=source,
+        since=since, until=until, sort=sort, limit=limit, cursor=cursor,
+    ))
+
+
+@router.get("/chat", response_model=SearchResponse)
+async def search_chat(
+    q: str = QueryText,
+    disaster_id: Optional[UUID] = None,
+    team_id: Optional[UUID] = None,
+    sender_user_id: Optional[UUID] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sort: SearchSort = "relevance",
+    limit: int = PageSize,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await _page(SearchRepository(db).search_chat(
+        q, disaster_id=disaster_id, team_id=team_id, sender_user_id=sender_user_id,
+        since=since, until=until, sort=sort, limit=limit, cursor=cursor,
+    ))
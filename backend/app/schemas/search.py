@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+from uuid import UUID
+from datetime import datetime
+
+# "relevance": best match first; "recent": newest first.
+SearchSort = Literal["relevance", "recent"]
+
+
+class SearchHit(BaseModel):
+    kind: Literal["news", "log", "chat"]
+    id: str
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    rank: float
+    created_at: datetime
+    # Set depending on kind
+    disaster_id: Optional[UUID] = None
+    team_id: Optional[UUID] = None
+    sender_user_id: Optional[UUID] = None
+    source: Optional[str] = None
+    sources: Optional[List[str]] = None
+    url: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchHit]
+    # Pass back as `cursor` for the next page; None on the last page.
+    next_cursor: Optional[str] = None
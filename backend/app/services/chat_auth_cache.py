@@ -0,0 +1,153 @@
+"""Short-lived cache of who may join which chat room.
+
+Every chat WebSocket connect used to load the user (with profile, medical
+profile and role), the teams assigned to the disaster and the user's
+responder profile; when a whole team reconnects after a network blip that is
+the same handful of queries once per socket. `ChatAuthCache` keeps
+
+- per user, a `ChatUser` snapshot: role, display name, responder type and team;
+- per disaster, the ids of the teams assigned to its tasks;
+
+for `CHAT_AUTH_CACHE_TTL` seconds. The chat connect path and chat history
+share it. `TaskRepository` drops a disaster's teams when assignments change
+and `ResponderRepository` drops a user when their team or profile changes, so
+the TTL only bounds staleness for changes made on other workers or elsewhere
+(e.g. role edits).
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.disaster_management import DisasterTask, DisasterTaskAssignment
+from app.models.responder_management import ResponderProfile
+from app.models.user_family_models import Role, User, UserProfile
+from app.services.lru_cache import LRUCache
+
+CACHE_TTL = float(os.getenv("CHAT_AUTH_CACHE_TTL", "30"))
+CACHE_SIZE = int(os.getenv("CHAT_AUTH_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class ChatUser:
+    """What the chat needs to know about a user, detached from any session."""
+
+    user_id: UUID
+    email: Optional[str] = None
+    role_name: Optional[str] = None
+    full_name: Optional[str] = None
+    responder_type: Optional[str] = None
+    team_id: Optional[UUID] = None
+
+    @property
+    def is_responder(self) -> bool:
+        return self.responder_type is not None
+
+    @property
+    def sender_name(self) -> str:
+        return self.full_name or self.email or "Unknown"
+
+    @property
+    def sender_role(self) -> str:
+        return self.role_name or "civilian"
+
+
+async def load_chat_user(db: AsyncSession, user_id: UUID) -> Optional[ChatUser]:
+    """One query for the user, their role, display name and responder profile."""
+    stmt = (
+        select(
+            User.user_id,
+            User.email,
+            Role.name.label("role_name"),
+            UserProfile.full_name,
+            ResponderProfile.responder_type,
+            ResponderProfile.team_id,
+        )
+        .outerjoin(Role, User.role_id == Role.role_id)
+        .outerjoin(UserProfile, User.user_id == UserProfile.user_id)
+        .outerjoin(ResponderProfile, User.user_id == ResponderProfile.user_id)
+        .where(User.user_id == user_id)
+    )
+    row = (await db.execute(stmt)).first()
+    return ChatUser(**row._asdict()) if row else None
+
+
+async def load_disaster_teams(db: AsyncSession, disaster_id: UUID) -> FrozenSet[UUID]:
+    stmt = (
+        select(DisasterTaskAssignment.team_id)
+        .join(DisasterTask, DisasterTaskAssignment.task_id == DisasterTask.task_id)
+        .where(DisasterTask.disaster_id == disaster_id)
+    )
+    res = await db.execute(stmt)
+    return frozenset(row[0] for row in res.all() if row[0] is not None)
+
+
+class ChatAuthCache:
+    """TTL caches of `ChatUser` snapshots and of team ids per disaster.
+
+    A load that started before an invalidation of the same key is returned to
+    its caller but not stored, so it cannot put the old state back.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, maxsize: int = CACHE_SIZE):
+        self.users: LRUCache[ChatUser] = LRUCache(maxsize, ttl=ttl)
+        self.teams: LRUCache[FrozenSet[UUID]] = LRUCache(maxsize, ttl=ttl)
+        self._generation = 0
+
+    async def user(self, db: AsyncSession, user_id: UUID) -> Optional[ChatUser]:
+        cached = self.users.get(user_id)
+        if cached is not None:
+            return cached
+        generation = self._generation
+        user = await load_chat_user(db, user_id)
+        # Unknown users are not cached; they are rejected before anything else.
+        if user is not None and generation == self._generation:
+            self.users.set(user_id, user)
+        return user
+
+    async def disaster_teams(self, db: AsyncSession, disaster_id: UUID) -> FrozenSet[UUID]:
+        cached = self.teams.get(disaster_id)
+        if cached is not None:
+            return cached
+        generation = self._generation
+        teams = await load_disaster_teams(db, disaster_id)
+        if generation == self._generation:
+            self.teams.set(disaster_id, teams)
+        return teams
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        self._generation += 1
+        self.users.pop(user_id)
+
+    def invalidate_users(self) -> None:
+        self._generation += 1
+        self.users.clear()
+
+    def invalidate_disaster(self, disaster_id: UUID) -> None:
+        self._generation += 1
+        self.teams.pop(disaster_id)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self.users.clear()
+        self.teams.clear()
+
+    def stats(self) -> dict:
+        return {"users": self.users.stats(), "teams": self.teams.stats()}
+
+
+CHAT_AUTH_CACHE = ChatAuthCache()
+
+
+__all__ = [
+    "CHAT_AUTH_CACHE",
+    "ChatAuthCache",
+    "ChatUser",
+    "load_chat_user",
+    "load_disaster_teams",
+]
@@ -0,0 +1,245 @@
+"""Write-behind persistence for chat messages.
+
+The chat WebSockets used to open a session, INSERT, commit and refresh each
+message before broadcasting it. Now the message id and timestamp are
+assigned in the app, the message is broadcast at once, and `ChatMessageWriter`
+inserts queued messages in batches: one multi-row INSERT and one commit
+per batch. A batch is written when it reaches `CHAT_FLUSH_BATCH` messages or
+`CHAT_FLUSH_INTERVAL_MS` after its first message, whichever comes first, so
+at most that interval of messages is lost if the process dies. Shutdown
+flushes whatever is queued.
+
+Failures are told apart by cause:
+
+- a data error (e.g. a message for a disaster deleted meanwhile) retries the
+  batch row by row, and only the rows that fail again are dropped;
+- anything else (database down, connection reset, pool exhausted) puts the
+  rows back at the front of the queue and retries after a backoff that grows
+  from `RETRY_DELAY` to `RETRY_MAX_DELAY` seconds.
+
+The queue holds at most `CHAT_MAX_PENDING` messages; once it is full
+`submit` refuses new ones, so a long outage cannot grow it without bound and
+the chat can tell the sender instead of broadcasting an unsaved message.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.database import AsyncSessionLocal
+from app.models.questionnaires_and_logs import DisasterChatMessage
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH = int(os.getenv("CHAT_FLUSH_BATCH", "100"))
+FLUSH_INTERVAL = float(os.getenv("CHAT_FLUSH_INTERVAL_MS", "200")) / 1000
+MAX_PENDING = int(os.getenv("CHAT_MAX_PENDING", "10000"))
+RETRY_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+# Errors caused by the rows themselves; retrying the same row cannot help.
+_DATA_ERRORS = (IntegrityError, DataError)
+
+
+class _Unwritten(Exception):
+    """The database went away while a batch was being split."""
+
+    def __init__(self, rows: List[dict], written: int, cause: Exception):
+        super().__init__(str(cause))
+        self.rows = rows
+        self.written = written
+
+
+def new_message_row(
+    disaster_id: UUID,
+    sender_user_id: UUID,
+    message_text: str,
+    is_global: bool,
+    team_id: Optional[UUID] = None,
+) -> dict:
+    """A `disaster_chat_messages` row with its id and timestamp assigned here."""
+    return {
+        "message_id": uuid4(),
+        "disaster_id": disaster_id,
+        "team_id": team_id,
+        "sender_user_id": sender_user_id,
+        "message_text": message_text,
+        "is_global": is_global,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+class ChatMessageWriter:
+    """Loop-bound queue of chat rows flushed by a background task."""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        max_batch: int = FLUSH_BATCH,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_pending: int = MAX_PENDING,
+        retry_delay: float = RETRY_DELAY,
+        retry_max_delay: float = RETRY_MAX_DELAY,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.max_batch, max_pending)
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.written = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self._rows: List[dict] = []
+        self._in_flight = 0
+        self._backoff = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._rows, self._in_flight, self._backoff = loop, [], 0, 0.0
+            self._wakeup, self._lock = asyncio.Event(), asyncio.Lock()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def submit(self, row: dict) -> bool:
+        """Queue a row from `new_message_row` for the next batch.
+
+        Returns False, without queueing, when `max_pending` messages are
+        already waiting (the database has been unreachable for a while).
+        """
+        self._ensure_started()
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return False
+        self._rows.append(row)
+        if len(self._rows) == 1 or len(self._rows) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if len(self._rows) < self.max_batch:
+                # Let the batch fill up, but never hold a message longer than the interval.
+                try:
+                    await asyncio.wait_for(self._filled(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+            if self._backoff:
+                # The database was unreachable; the rows are queued again.
+                await asyncio.sleep(self._backoff)
+                self._wakeup.set()
+
+    async def _filled(self) -> None:
+        while len(self._rows) < self.max_batch:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def flush(self) -> int:
+        """Write everything queued so far; returns the rows written.
+
+        Stops at the first batch that cannot reach the database, leaving it
+        and the rest queued for the background task to retry.
+        """
+        if self._loop is not asyncio.get_running_loop() or not self._rows:
+            return 0
+        async with self._lock:
+            written = 0
+            while self._rows:
+                batch, self._rows = self._rows[:self.max_batch], self._rows[self.max_batch:]
+                self._in_flight = len(batch)
+                try:
+                    written += await self._write(batch)
+                except Exception as exc:
+                    unwritten = batch
+                    if isinstance(exc, _Unwritten):
+                        unwritten, written = exc.rows, written + exc.written
+                    # Rows submitted meanwhile stay behind the older ones.
+                    self._rows = unwritten + self._rows
+                    self._backoff = min(self.retry_max_delay, max(self.retry_delay, self._backoff * 2))
+                    logger.warning(
+                        "Saving chat messages failed (%s); %d queued, retrying in %.1fs",
+                        exc, len(self._rows), self._backoff,
+                    )
+                    break
+                finally:
+                    self._in_flight = 0
+            else:
+                self._backoff = 0.0
+            return written
+
+    async def _write(self, batch: List[dict]) -> int:
+        """Insert a batch, splitting it on data errors; other errors propagate."""
+        try:
+            await self._insert(batch)
+        except _DATA_ERRORS as exc:
+            if len(batch) == 1:
+                self.failed += 1
+                logger.error("Dropping chat message %s that could not be saved: %s", batch[0]["message_id"], exc)
+                return 0
+            logger.warning("Saving %d chat messages failed (%s); retrying one by one", len(batch), exc)
+            written = 0
+            for index, row in enumerate(batch):
+                try:
+                    written += await self._write([row])
+                except Exception as exc:
+                    # Lost the database mid-split: requeue only the rows not yet written.
+                    raise _Unwritten(batch[index:], written, exc)
+            return written
+        self.batches += 1
+        self.written += len(batch)
+        return len(batch)
+
+    async def _insert(self, batch: List[dict]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(DisasterChatMessage), batch)
+            await session.commit()
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows) + self._in_flight
+
+    async def close(self) -> None:
+        """Flush what is queued and stop the background task."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        task, self._task = self._task, None
+        if task is not None:
+            # Under the lock the task is not mid-write, so no batch is lost.
+            async with self._lock:
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+        if self._rows:
+            logger.error("Shutting down with %d chat messages that could not be saved", len(self._rows))
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "written": self.written,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "batches": self.batches,
+        }
+
+
+CHAT_WRITER = ChatMessageWriter()
+
+
+__all__ = ["CHAT_WRITER", "ChatMessageWriter", "new_message_row"]
@@ -0,0 +1,185 @@
+"""Targeted HTML extraction for the news scraper.
+
+The scraper only needs a handful of things from a page: anchors (with whether
+they sit in nav/header/footer chrome, their class and id), `<meta>` and
+`<time>` publish dates, `ld+json` blocks, the headline and `<p>` text. Rather
+than building a full BeautifulSoup tree and querying it repeatedly, a page is
+walked once and reduced to a `PageExtract`.
+
+lxml is used when installed (`pip install lxml`); otherwise the same extract
+is built from BeautifulSoup's `html.parser` tree, so behaviour does not depend
+on which backend is present. Text follows `Tag.get_text(strip=True)`: each
+text node stripped and concatenated, skipping comments and script/style.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - exercised only without lxml
+    lxml = None
+
+# Anchors under these elements count as site chrome (`nav a[href]` etc.).
+_CHROME_TAGS = frozenset(("nav", "header", "footer"))
+# Elements whose strings `get_text` leaves out.
+_NON_TEXT_TAGS = ("script", "style", "template", "rt", "rp")
+_LD_JSON = "application/ld+json"
+
+
+@dataclass
+class Anchor:
+    href: str
+    text: str
+    classes: List[str] = field(default_factory=list)
+    id: str = ""
+    in_chrome: bool = False
+
+
+@dataclass
+class PageExtract:
+    anchors: List[Anchor] = field(default_factory=list)
+    # Attributes of every <meta>, in document order.
+    metas: List[Dict[str, str]] = field(default_factory=list)
+    # `datetime` attribute of every <time> carrying one, in document order.
+    times: List[str] = field(default_factory=list)
+    ld_json: List[str] = field(default_factory=list)
+    # Text of the first <h1>, else of <title>; None when the page has neither.
+    title: Optional[str] = None
+    # Text of every <p> inside the first <article> (or the whole page).
+    paragraphs: List[str] = field(default_factory=list)
+
+
+if lxml is not None:
+    _TEXT_NODES = etree.XPath(
+        "descendant::text()[not(" + " or ".join(f"parent::{t}" for t in _NON_TEXT_TAGS) + ")]"
+    )
+
+    def _lxml_text(el) -> str:
+        return "".join(s.strip() for s in _TEXT_NODES(el))
+
+    def _lxml_root(html: str):
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # Unicode input with an XML encoding declaration must go in as bytes.
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+
+    def _extract_lxml(html: str) -> PageExtract:
+        page = PageExtract()
+        try:
+            root = _lxml_root(html)
+        except etree.ParserError:
+            return page
+        h1 = title = article = None
+        paragraphs = []
+        for el in root.iter("a", "meta", "time", "script", "h1", "title", "p", "article"):
+            tag = el.tag
+            if tag == "a":
+                href = el.get("href")
+                if href is None:
+                    continue
+                page.anchors.append(Anchor(
+                    href=href,
+                    text=_lxml_text(el),
+                    classes=(el.get("class") or "").split(),
+                    id=el.get("id") or "",
+                    in_chrome=any(anc.tag in _CHROME_TAGS for anc in el.iterancestors()),
+                ))
+            elif tag == "p":
+                paragraphs.append(el)
+            elif tag == "meta":
+                page.metas.append(dict(el.attrib))
+            elif tag == "time":
+                value = el.get("datetime")
+                if value is not None:
+                    page.times.append(value)
+            elif tag == "script":
+                if el.get("type") == _LD_JSON:
+                    page.ld_json.append(el.text or "")
+            elif tag == "h1":
+                if h1 is None:
+                    h1 = el
+            elif tag == "title":
+                if title is None:
+                    title = el
+            elif article is None:
+                article = el
+        heading = h1 if h1 is not None else title
+        page.title = _lxml_text(heading) if heading is not None else None
+        if article is not None:
+            paragraphs = [p for p in paragraphs if article in p.iterancestors()]
+        page.paragraphs = [_lxml_text(p) for p in paragraphs]
+        return page
+
+
+def _extract_bs4(html: str) -> PageExtract:
+    soup = BeautifulSoup(html, "html.parser")
+    page = PageExtract()
+    h1 = title = article = None
+    paragraphs = []
+    for el in soup.find_all(["a", "meta", "time", "script", "h1", "title", "p", "article"]):
+        name = el.name
+        if name == "a":
+            href = el.get("href")
+            if href is None:
+                continue
+            page.anchors.append(Anchor(
+                href=href,
+                text=el.get_text(strip=True),
+                classes=list(el.get("class", [])),
+                id=el.get("id") or "",
+                in_chrome=any(parent.name in _CHROME_TAGS for parent in el.parents),
+            ))
+        elif name == "p":
+            paragraphs.append(el)
+        elif name == "meta":
+            page.metas.append({k: v if isinstance(v, str) else " ".join(v) for k, v in el.attrs.items()})
+        elif name == "time":
+            value = el.get("datetime")
+            if value is not None:
+                page.times.append(value)
+        elif name == "script":
+            if el.get("type") == _LD_JSON:
+                page.ld_json.append(el.string or "")
+        elif name == "h1":
+            if h1 is None:
+                h1 = el
+        elif name == "title":
+            if title is None:
+                title = el
+        elif article is None:
+            article = el
+    heading = h1 if h1 is not None else title
+    page.title = heading.get_text(strip=True) if heading is not None else None
+    if article is not None:
+        # Tags compare by content, so test ancestry by identity.
+        paragraphs = [p for p in paragraphs if any(parent is article for parent in p.parents)]
+    page.paragraphs = [p.get_text(strip=True) for p in paragraphs]
+    return page
+
+
+def extract_page(html: str) -> PageExtract:
+    """Reduce an HTML document to what the scraper reads from it."""
+    if lxml is not None:
+        return _extract_lxml(html)
+    return _extract_bs4(html)
+
+
+def extract_links(html: str) -> List[str]:
+    """`href` of every anchor, in document order (section pages need nothing else)."""
+    if lxml is not None:
+        try:
+            root = _lxml_root(html)
+        except etree.ParserError:
+            return []
+        return [href for href in (a.get("href") for a in root.iter("a")) if href is not None]
+    soup = BeautifulSoup(html, "html.parser")
+    return [a["href"] for a in soup.find_all("a", href=True)]
+
+
+__all__ = ["Anchor", "PageExtract", "extract_links", "extract_page"]
@@ -0,0 +1,145 @@
+"""Shared, pooled HTTP clients for outbound scraper traffic.
+
+One `httpx.AsyncClient` per TLS mode is kept for the life of the process, so
+repeated crawls of the same newspapers reuse open keep-alive connections
+instead of paying a TCP + TLS handshake per article. The SSL context (and its
+loaded CA bundle) is built once per client rather than once per request.
+
+- Pool size, keep-alive size and idle expiry are configurable via environment.
+- A per-host semaphore caps concurrent connections to any single site.
+- `stream()` lets callers stop reading a body early (size caps, head-only checks).
+- HTTP/2 is negotiated when the optional `h2` package is installed
+  (`pip install h2`) and `SCRAPER_HTTP2` is not set to `0`.
+
+The pool is bound to the event loop that created it; `close_http_pool()` is
+called from the FastAPI lifespan on shutdown. When a new loop takes over (a
+reload, or each test's loop) the previous pool is closed in the background so
+its keep-alive sockets are not left open.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SCRAPER_MAX_KEEPALIVE_CONNECTIONS", "50"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("SCRAPER_MAX_CONNECTIONS_PER_HOST", "6"))
+KEEPALIVE_EXPIRY = float(os.getenv("SCRAPER_KEEPALIVE_EXPIRY", "60"))
+HTTP2_ENABLED = (
+    os.getenv("SCRAPER_HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+)
+
+
+class HttpClientPool:
+    """Loop-bound set of pooled clients plus per-host connection slots."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._clients: Dict[bool, httpx.AsyncClient] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def client(self, verify: bool = True) -> httpx.AsyncClient:
+        client = self._clients.get(verify)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                verify=verify,
+                http2=HTTP2_ENABLED,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._clients[verify] = client
+        return client
+
+    def host_slot(self, host: str) -> asyncio.Semaphore:
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+        return slot
+
+    async def get(
+        self,
+        url: str,
+        *,
+        headers: Optional[dict] = None,
+        timeout: float = 5.0,
+        verify: bool = True,
+    ) -> httpx.Response:
+        async with self.host_slot(urlparse(url).netloc):
+            return await self.client(verify).get(url, headers=headers, timeout=timeout)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        *,
+        headers: Optional[dict] = None,
+        timeout: float = 5.0,
+        verify: bool = True,
+    ) -> AsyncIterator[httpx.Response]:
+        """Streamed GET; the body is read by the caller and the connection is
+        released (or dropped, if the body was abandoned) on exit."""
+        async with self.host_slot(urlparse(url).netloc):
+            async with self.client(verify).stream("GET", url, headers=headers, timeout=timeout) as resp:
+                yield resp
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+_POOL: Optional[HttpClientPool] = None
+_CLOSING: Set[asyncio.Task] = set()
+
+
+def get_http_pool() -> HttpClientPool:
+    """Return the pool for the running loop, creating it on first use."""
+    global _POOL
+    loop = asyncio.get_running_loop()
+    if _POOL is None or _POOL.loop is not loop:
+        if _POOL is not None:
+            _retire(_POOL, loop)
+        _POOL = HttpClientPool(loop)
+    return _POOL
+
+
+def _retire(pool: HttpClientPool, loop: asyncio.AbstractEventLoop) -> None:
+    """Close a pool left behind by another event loop without blocking the caller."""
+    logger.info("HTTP client pool belongs to another event loop; closing it and starting a new one")
+    if pool.loop.is_running() and not pool.loop.is_closed():
+        # Still serving on another thread: close it there.
+        asyncio.run_coroutine_threadsafe(_close_quietly(pool), pool.loop)
+        return
+    task = loop.create_task(_close_quietly(pool))
+    _CLOSING.add(task)
+    task.add_done_callback(_CLOSING.discard)
+
+
+async def _close_quietly(pool: HttpClientPool) -> None:
+    try:
+        await pool.aclose()
+    except Exception as exc:  # its loop may be gone; the sockets are dropped anyway
+        logger.warning("Closing a replaced HTTP client pool failed: %s", exc)
+
+
+async def close_http_pool() -> None:
+    global _POOL
+    pool, _POOL = _POOL, None
+    if pool is not None:
+        await pool.aclose()
+
+
+__all__ = ["HttpClientPool", "get_http_pool", "close_http_pool"]
@@ -0,0 +1,148 @@
+"""Precompiled multi-pattern substring matcher for the scraper keyword corpora.
+
+The article filter asks many `kw in text` questions of the same text (disaster
+keywords, required natural-hazard keywords, exclusions, severity phrases,
+location aliases). `KeywordMatcher` answers all of them from a single pass.
+
+All patterns are folded into one trie-shaped regex, so a match at a position is
+the longest pattern starting there. For each such pattern a table precomputed
+at construction lists the shorter patterns it contains and the offset where
+the next search must resume. The resume offset is the first point at which
+another pattern could start inside the match and run past its end. The result
+is exactly what the equivalent `kw in text` checks would return, including
+occurrence counts of overlapping patterns.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Trie node key marking the end of a pattern.
+_END = ""
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    """Regex matching the longest of `patterns` at a position (greedy, trie-shaped)."""
+    trie: dict = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[_END] = {}
+
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != _END]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if _END in node:
+            # Greedy optional: try the longer continuation first.
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class KeywordHits:
+    """Result of one `KeywordMatcher.scan`.
+
+    `counts` maps each pattern found to its number of (possibly overlapping)
+    occurrences; `title` holds the patterns that occur entirely within the
+    leading `title_end` characters of the scanned text.
+    """
+
+    __slots__ = ("_matcher", "counts", "title")
+
+    def __init__(self, matcher: "KeywordMatcher", counts: Dict[str, int], title: frozenset):
+        self._matcher = matcher
+        self.counts = counts
+        self.title = title
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self.counts
+
+    def matched(self, group: str) -> List[str]:
+        """Patterns of `group` found in the text, in the group's declared order."""
+        return [p for p in self._matcher.groups[group] if p in self.counts]
+
+    def title_matched(self, group: str) -> List[str]:
+        return [p for p in self._matcher.groups[group] if p in self.title]
+
+    def first(self, group: str) -> Optional[str]:
+        for pattern in self._matcher.groups[group]:
+            if pattern in self.counts:
+                return pattern
+        return None
+
+    def count(self, group: str) -> int:
+        """Number of distinct patterns of `group` present."""
+        return len(self.matched(group))
+
+    def by_group(self) -> Dict[str, Dict[str, int]]:
+        """All hits as `{group: {pattern: occurrences}}`."""
+        return {
+            group: {p: self.counts[p] for p in patterns if p in self.counts}
+            for group, patterns in self._matcher.groups.items()
+        }
+
+
+class KeywordMatcher:
+    """Named groups of lowercase substring patterns compiled into one regex.
+
+    Args:
+        groups: mapping of group name to patterns. Order within a group is kept
+            so callers can ask for the first hit in priority order.
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]):
+        self.groups: Dict[str, Tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(p.lower() for p in patterns if p))
+            for name, patterns in groups.items()
+        }
+        patterns = sorted({p for group in self.groups.values() for p in group})
+        self._regex = re.compile(_trie_regex(patterns))
+        self._expansions = {longest: self._expansion(longest, patterns) for longest in patterns}
+
+    @staticmethod
+    def _expansion(longest: str, patterns: List[str]) -> Tuple[int, Tuple[Tuple[int, str], ...]]:
+        """(resume offset, (offset, pattern) occurrences inside `longest` before it)."""
+        resume = len(longest)
+        for offset in range(1, len(longest)):
+            suffix = longest[offset:]
+            if any(len(p) > len(suffix) and p.startswith(suffix) for p in patterns):
+                resume = offset
+                break
+        occurrences = tuple(
+            (offset, p)
+            for offset in range(resume)
+            for p in patterns
+            if longest.startswith(p, offset)
+        )
+        return resume, occurrences
+
+    def scan(self, text: str, title_end: int = 0) -> KeywordHits:
+        """Find every pattern in `text` (already lowercased) in one pass.
+
+        `title_end` marks a leading slice of `text` (e.g. a title joined to the
+        body) whose hits are also reported separately.
+        """
+        counts: Dict[str, int] = {}
+        title = set()
+        search = self._regex.search
+        expansions = self._expansions
+        pos = 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            resume, occurrences = expansions[match.group()]
+            for offset, pattern in occurrences:
+                counts[pattern] = counts.get(pattern, 0) + 1
+                if start + offset + len(pattern) <= title_end:
+                    title.add(pattern)
+            pos = start + resume
+        return KeywordHits(self, counts, frozenset(title))
+
+
+__all__ = ["KeywordHits", "KeywordMatcher"]
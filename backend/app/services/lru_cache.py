@@ -0,0 +1,108 @@
+"""Small thread-safe LRU cache with optional TTL and size-weighted eviction.
+
+Used by the scraper caches (HTTP responses, parsed articles) where entries are
+touched from both the event loop and worker threads.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[V]):
+    """Bounded mapping that evicts the least recently used entry.
+
+    Args:
+        maxsize: capacity; number of entries, or total weight when `sizeof` is given.
+        ttl: seconds an entry stays valid after being stored; None keeps it until evicted.
+        sizeof: optional weigher, e.g. `len` for byte strings.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Tuple[V, float, int]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        weight = self._sizeof(value) if self._sizeof else 1
+        if weight > self.maxsize:
+            return
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, expires_at, weight)
+            self._weight += weight
+            while self._weight > self.maxsize:
+                oldest = next(iter(self._data))
+                self._pop(oldest)
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._pop(key)
+            return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def _pop(self, key: Hashable):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[2]
+        return entry
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "size": self._weight,
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hit_rate,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+__all__ = ["LRUCache"]
@@ -0,0 +1,250 @@
+"""Persist analysed news articles into the indexed `news_articles` table.
+
+Every distinct analysis upserts the articles it accepted. Rows are keyed by
+canonical URL, so the same article seen by later analyses only refreshes its
+metadata and `last_seen_at`. Wire copies syndicated by several papers share a
+content hash (normalised title + description). The first row keeps the story,
+and later copies add their paper to its `sources` instead of new rows. IMD
+nowcasts are transient and not archived.
+
+Archiving runs in the background after the analysis has answered
+(`archive_in_background`) and never fails a request. Set
+`NEWS_ARCHIVE_ENABLED=0` to turn it off.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.news_models import NewsArticle
+from app.services.news_scraper import IST
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ENABLED = os.getenv("NEWS_ARCHIVE_ENABLED", "1").lower() in ("1", "true", "yes")
+
+_IMD_SOURCE = "IMD RSS Feed"
+_TRACKING_PARAMS = frozenset(("fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"))
+_NON_WORD = re.compile(r"[\W_]+")
+_PUBLISHED_FORMAT = "%Y-%m-%d %H:%M IST"
+
+
+def canonical_url(url: str) -> str:
+    """Stable identity of an article URL.
+
+    Treats http and https alike, lower-cases the host and drops `www.`,
+    default ports, the fragment, tracking parameters (`utm_*`, `fbclid`, ...)
+    and a trailing slash, and sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, urlencode(query), ""))
+
+
+def content_hash(title: str, description: Optional[str]) -> str:
+    """Hash of the story text with case, punctuation and spacing normalised away."""
+    normalised = " ".join(_NON_WORD.sub(" ", f"{title} {description or ''}".lower()).split())
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+def parse_published(value: Optional[str]) -> Optional[datetime]:
+    """Scraper (`2024-07-01 09:30 IST`) or RFC 822 publish time, else None."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, _PUBLISHED_FORMAT).replace(tzinfo=IST)
+    except ValueError:
+        pass
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=IST)
+
+
+def article_rows(articles: Iterable[dict], city: str = "", state: str = "") -> List[dict]:
+    """`news_articles` rows for analysis results, one per canonical URL."""
+    rows: Dict[str, dict] = {}
+    for article in articles:
+        source = article.get("newspaper_name") or ""
+        link = article.get("link") or ""
+        title = article.get("title") or ""
+        if source == _IMD_SOURCE or not link or not title:
+            continue
+        url = canonical_url(link)
+        row = rows.get(url)
+        if row is not None:
+            if source not in row["sources"]:
+                row["sources"].append(source)
+            continue
+        rows[url] = {
+            "canonical_url": url,
+            "url": link,
+            "content_hash": content_hash(title, article.get("description")),
+            "newspaper_name": source,
+            "sources": [source],
+            "title": title,
+            "description": article.get("description") or None,
+            "published_at": parse_published(article.get("published")),
+            "city": city or None,
+            "state": state or None,
+            "disaster_keyword": (article.get("disaster_keyword") or None),
+            "severity": article.get("severity"),
+            "priority_score": int(article.get("priority_score") or 0),
+        }
+    return list(rows.values())
+
+
+def collapse_syndicated(rows: List[dict], known: Dict[str, dict]) -> List[dict]:
+    """Fold rows whose content hash is already taken into that row's `sources`.
+
+    `known` maps content hash -> row (stored or earlier in the batch) and is
+    updated in place; returns the rows that still need inserting/upserting.
+    """
+    fresh = []
+    for row in rows:
+        owner = known.get(row["content_hash"])
+        if owner is not None and owner["canonical_url"] != row["canonical_url"]:
+            for source in row["sources"]:
+                if source not in owner["sources"]:
+                    owner["sources"].append(source)
+            if "id" in owner:
+                # A stored row: its `sources` must be written back.
+                owner["dirty"] = True
+            continue
+        known.setdefault(row["content_hash"], row)
+        fresh.append(row)
+    return fresh
+
+
+async def store_articles(session: AsyncSession, articles: Iterable[dict], city: str = "", state: str = "") -> int:
+    """Upsert analysis results into `news_articles`; returns the rows written."""
+    rows = article_rows(articles, city, state)
+    written = 0
+    # A row that lost a race with a concurrent archive of the same URL or story
+    # is retried once; the second pass finds the winner and merges into it.
+    for _ in range(2):
+        if not rows:
+            break
+        stored, rows = await _store_rows(session, rows)
+        written += stored
+    await session.commit()
+    return written
+
+
+async def _store_rows(session: AsyncSession, rows: List[dict]) -> Tuple[int, List[dict]]:
+    """One upsert pass; returns the rows written and the rows that lost a race."""
+    by_url = {row["canonical_url"]: row for row in rows}
+    hashes = list({row["content_hash"] for row in rows})
+    existing = await session.execute(
+        select(NewsArticle.id, NewsArticle.canonical_url, NewsArticle.content_hash, NewsArticle.sources)
+        .where(or_(NewsArticle.content_hash.in_(hashes), NewsArticle.canonical_url.in_(list(by_url))))
+        .order_by(NewsArticle.id)
+    )
+    known: Dict[str, dict] = {}
+    stored_urls: Set[str] = set()
+    for stored in existing:
+        sources = list(stored.sources or [])
+        row = by_url.get(stored.canonical_url)
+        if row is not None:
+            # Re-seen URL: keep the papers recorded so far ahead of this batch's.
+            row["sources"] = sources + [s for s in row["sources"] if s not in sources]
+            stored_urls.add(stored.canonical_url)
+        else:
+            known.setdefault(stored.content_hash, {
+                "id": stored.id, "canonical_url": stored.canonical_url, "sources": sources,
+            })
+    fresh = collapse_syndicated(rows, known)
+
+    for owner in known.values():
+        if owner.get("dirty"):
+            await session.execute(
+                update(NewsArticle)
+                .where(NewsArticle.id == owner["id"])
+                .values(sources=owner["sources"], last_seen_at=func.now())
+            )
+    seen_again = [row for row in fresh if row["canonical_url"] in stored_urls]
+    new = [row for row in fresh if row["canonical_url"] not in stored_urls]
+    if seen_again:
+        stmt = insert(NewsArticle).values(seen_again)
+        excluded = stmt.excluded
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[NewsArticle.canonical_url],
+            set_={
+                "content_hash": excluded.content_hash,
+                "sources": excluded.sources,
+                "title": excluded.title,
+                "description": excluded.description,
+                "published_at": func.coalesce(excluded.published_at, NewsArticle.published_at),
+                "city": func.coalesce(excluded.city, NewsArticle.city),
+                "state": func.coalesce(excluded.state, NewsArticle.state),
+                "disaster_keyword": func.coalesce(excluded.disaster_keyword, NewsArticle.disaster_keyword),
+                "severity": func.coalesce(excluded.severity, NewsArticle.severity),
+                "priority_score": func.greatest(excluded.priority_score, NewsArticle.priority_score),
+                "last_seen_at": func.now(),
+            },
+        ))
+    lost: List[dict] = []
+    if new:
+        # No conflict target: a row taken meanwhile by URL *or* content hash is skipped.
+        inserted = set((await session.execute(
+            insert(NewsArticle).values(new).on_conflict_do_nothing().returning(NewsArticle.canonical_url)
+        )).scalars())
+        lost = [row for row in new if row["canonical_url"] not in inserted]
+    return len(fresh) - len(lost), lost
+
+
+async def archive_articles(articles: List[dict], city: str = "", state: str = "", session_factory=AsyncSessionLocal) -> int:
+    """`store_articles` in its own session; failures are logged, not raised."""
+    try:
+        async with session_factory() as session:
+            return await store_articles(session, articles, city, state)
+    except Exception as exc:
+        logger.warning("Archiving %d news articles failed: %s", len(articles), exc)
+        return 0
+
+
+_PENDING: Set[asyncio.Task] = set()
+
+
+def archive_in_background(articles: List[dict], city: str = "", state: str = "") -> Optional[asyncio.Task]:
+    """Archive without delaying the caller; the task is kept referenced until done."""
+    if not ARCHIVE_ENABLED or not articles:
+        return None
+    task = asyncio.create_task(archive_articles(list(articles), city, state))
+    _PENDING.add(task)
+    task.add_done_callback(_PENDING.discard)
+    return task
+
+
+__all__ = [
+    "archive_articles",
+    "archive_in_background",
+    "article_rows",
+    "canonical_url",
+    "collapse_syndicated",
+    "content_hash",
+    "parse_published",
+    "store_articles",
+]
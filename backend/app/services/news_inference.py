@@ -0,0 +1,240 @@
+"""Batched fake-news classification in a persistent worker process.
+
+`DisasterNewsClassifier` loads TensorFlow and the BERT tokenizer on first use
+and runs `model.predict` synchronously, which must never happen on the API
+event loop. `NewsInferenceService` owns a single-process pool whose worker
+loads the model once (warmed at startup). Texts submitted by concurrent
+analyses are queued and micro-batched: a batch is sent to the worker when it
+reaches `NEWS_CLASSIFIER_MAX_BATCH` texts or `NEWS_CLASSIFIER_MAX_WAIT_MS`
+after its first text arrived, whichever comes first. Each caller awaits
+futures for its own texts only.
+
+The service runs only with `NEWS_CLASSIFIER_ENABLED=1`. When it is off, or the
+model cannot be loaded, `classify_news` returns None and the router reports
+predictions as UNAVAILABLE, as before.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_ENABLED = os.getenv("NEWS_CLASSIFIER_ENABLED", "0").lower() in ("1", "true", "yes")
+MAX_BATCH_SIZE = int(os.getenv("NEWS_CLASSIFIER_MAX_BATCH", "64"))
+MAX_WAIT = float(os.getenv("NEWS_CLASSIFIER_MAX_WAIT_MS", "20")) / 1000
+PREDICT_TIMEOUT = float(os.getenv("NEWS_CLASSIFIER_TIMEOUT", "30"))
+
+Prediction = Dict[str, Any]
+
+
+# --- Worker process side -------------------------------------------------
+
+def _worker_warmup() -> None:
+    """Load the model and run one prediction so the first real batch is fast."""
+    from app.ml.news_classifier import classifier
+
+    classifier.warmup()
+
+
+def _worker_predict(texts: List[str]) -> List[Prediction]:
+    from app.ml.news_classifier import classifier
+
+    return classifier.predict(texts)
+
+
+def _worker_cache_stats() -> Dict[str, Any]:
+    from app.ml.news_classifier import classifier
+
+    return classifier.cache_stats()
+
+
+def _default_executor() -> Executor:
+    # spawn: the worker must not inherit the API process's event loop or sockets.
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+
+# --- API process side ----------------------------------------------------
+
+class NewsInferenceService:
+    """Micro-batching front end for a classifier worker.
+
+    Args:
+        max_batch_size: most texts sent to the worker in one call.
+        max_wait: seconds a batch waits for more texts after its first one.
+        executor_factory: builds the worker pool (one persistent process by default).
+        predict_fn / warmup_fn: picklable callables run in the worker.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait: float = MAX_WAIT,
+        executor_factory: Callable[[], Executor] = _default_executor,
+        predict_fn: Callable[[List[str]], List[Prediction]] = _worker_predict,
+        warmup_fn: Optional[Callable[[], None]] = _worker_warmup,
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.executor_factory = executor_factory
+        self.predict_fn = predict_fn
+        self.warmup_fn = warmup_fn
+        self.ready = False
+        self.error: Optional[BaseException] = None
+        self.batches = 0
+        self.texts = 0
+        self._executor: Optional[Executor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._executor = self.executor_factory()
+        self._queue = asyncio.Queue()
+        self.ready, self.error = self.warmup_fn is None, None
+        self._tasks = [asyncio.create_task(self._batcher())]
+        if self.warmup_fn is not None:
+            self._tasks.append(asyncio.create_task(self._warmup()))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        queue, self._queue = self._queue, None
+        while queue is not None and not queue.empty():
+            _, future = queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("News classifier stopped"))
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.ready = False
+
+    async def _warmup(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self.warmup_fn)
+        except Exception as exc:
+            self.error = exc
+            logger.error("News classifier warmup failed; predictions unavailable: %s", exc)
+        else:
+            self.ready = True
+            logger.info("News classifier worker warmed up")
+
+    async def predict(self, texts: List[str]) -> List[Prediction]:
+        """Classify `texts`, sharing worker batches with concurrent callers."""
+        if not self.running:
+            raise RuntimeError("News classifier is not running")
+        if self.error is not None:
+            raise RuntimeError(f"News classifier unavailable: {self.error}")
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        for text, future in zip(texts, futures):
+            self._queue.put_nowait((text, future))
+        return list(await asyncio.gather(*futures))
+
+    async def _next_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        queue = self._queue
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        closes_at = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = closes_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Callers that gave up (timeout, disconnect) need no prediction.
+        return [(text, future) for text, future in batch if not future.done()]
+
+    async def _batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_fn, texts)
+            except Exception as exc:
+                if isinstance(exc, BrokenProcessPool):
+                    logger.error("News classifier worker died; restarting it")
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = self.executor_factory()
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """The worker's prediction-cache stats (hit rate), or None when not running."""
+        if not self.running:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _worker_cache_stats)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "ready": self.ready,
+            "error": str(self.error) if self.error else None,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0,
+        }
+
+
+NEWS_INFERENCE = NewsInferenceService()
+
+
+def start_inference() -> Optional[NewsInferenceService]:
+    """Start the worker (and its warmup) when `NEWS_CLASSIFIER_ENABLED` is set."""
+    if not CLASSIFIER_ENABLED:
+        return None
+    NEWS_INFERENCE.start()
+    return NEWS_INFERENCE
+
+
+async def stop_inference() -> None:
+    await NEWS_INFERENCE.stop()
+
+
+async def classify_news(texts: List[str], timeout: float = PREDICT_TIMEOUT) -> Optional[List[Prediction]]:
+    """Predictions for `texts`, or None when the classifier is off or fails."""
+    if not texts or not NEWS_INFERENCE.running:
+        return None
+    try:
+        return await asyncio.wait_for(NEWS_INFERENCE.predict(texts), timeout)
+    except Exception as exc:
+        logger.error("ML prediction failed: %s", exc)
+        return None
+
+
+__all__ = [
+    "NEWS_INFERENCE",
+    "NewsInferenceService",
+    "classify_news",
+    "start_inference",
+    "stop_inference",
+]
@@ -0,0 +1,374 @@
+"""Background pre-crawl of the configured newspapers into a warm article store.
+
+Analyses used to crawl every selected paper live inside the request. Instead,
+`NewsPrecrawler` (started from the FastAPI lifespan) periodically crawls every
+`Newspaper` row and the IMD nowcast feed and keeps the location-independent
+article extracts in `WarmNewsStore`. An analysis then only runs the per-query
+gating (city, state, keyword) over what is already stored.
+
+- A paper whose snapshot is missing or older than `NEWS_WARM_MAX_AGE` is
+  crawled on demand; `force_refresh` re-crawls the selected papers now.
+- Crawls are single-flight per paper: concurrent analyses (or an analysis and
+  the scheduler) needing the same paper wait on one crawl. A caller that hits
+  its deadline stops waiting, but the crawl finishes and warms the store.
+- `stream_news` yields each source's articles as soon as that source is ready
+  instead of waiting for the slowest one.
+
+The scheduler runs only when `NEWS_PRECRAWL_INTERVAL` (seconds) is set above
+zero; without it the store still fills lazily from analyses.
+
+`analyze_news` also coalesces whole analyses. Identical concurrent requests
+(same papers, city, state and keyword) share one run, and the result is kept
+for `NEWS_ANALYSIS_CACHE_TTL` seconds to serve repeats. With
+`NEWS_ANALYSIS_SHARED_CACHE=1` the run is also coalesced across workers
+through the database (`shared_analysis_cache`). Accepted articles are
+upserted into `news_articles` in the background (`news_archive`).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.news_models import Newspaper
+from app.services import news_scraper
+from app.services.news_scraper import (
+    FETCH_DEADLINE_SECONDS,
+    IMD_RSS_URL,
+    Paper,
+    combine_results,
+    location_query_for,
+    rank_paper_extracts,
+)
+from app.services.lru_cache import LRUCache
+from app.services.news_archive import archive_in_background
+from app.services.news_selection import newspaper_to_dict
+from app.services.shared_analysis_cache import SharedAnalysisCache
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+PRECRAWL_INTERVAL = float(os.getenv("NEWS_PRECRAWL_INTERVAL", "0"))
+WARM_MAX_AGE = float(os.getenv("NEWS_WARM_MAX_AGE", "900"))
+ANALYSIS_CACHE_TTL = float(os.getenv("NEWS_ANALYSIS_CACHE_TTL", "30"))
+SHARED_ANALYSIS_CACHE = os.getenv("NEWS_ANALYSIS_SHARED_CACHE", "0").lower() in ("1", "true", "yes")
+
+_IMD_KEY = ("IMD", IMD_RSS_URL)
+
+
+@dataclass
+class Snapshot:
+    """Result of one crawl: article extracts for a paper, or the IMD feed index."""
+
+    data: Any
+    crawled_at: float = field(default_factory=time.time)
+
+    def age(self) -> float:
+        return time.time() - self.crawled_at
+
+
+class WarmNewsStore:
+    """Latest crawl of each paper (and of the IMD feed), answered per query."""
+
+    def __init__(self, max_age: float = WARM_MAX_AGE):
+        self.max_age = max_age
+        self._snapshots: Dict[tuple, Snapshot] = {}
+        self._flights = SingleFlight()
+
+    def _is_fresh(self, key: tuple) -> bool:
+        snapshot = self._snapshots.get(key)
+        return snapshot is not None and snapshot.age() < self.max_age
+
+    async def _refresh(self, key: tuple, fetch) -> Snapshot:
+        async def crawl() -> Snapshot:
+            try:
+                snapshot = Snapshot(await fetch())
+            except Exception as exc:
+                logger.warning("News crawl of %s failed: %s", key[0], exc)
+                raise
+            self._snapshots[key] = snapshot
+            return snapshot
+
+        return await self._flights.do(key, crawl)
+
+    async def refresh_paper(self, paper: Paper) -> Snapshot:
+        return await self._refresh(paper.key, lambda: news_scraper.crawl_paper_extracts(paper))
+
+    async def refresh_imd(self) -> Snapshot:
+        return await self._refresh(_IMD_KEY, news_scraper.IMD_FEED_CACHE.refresh)
+
+    async def analyze(
+        self,
+        newspaper_dicts: List[dict],
+        user_keyword: Optional[str] = None,
+        force_refresh: bool = False,
+        deadline: Optional[float] = FETCH_DEADLINE_SECONDS,
+    ) -> List[dict]:
+        """Same result shape as `news_scraper.fetch_all_news`, served from the store.
+
+        Papers without a fresh snapshot (all of them with `force_refresh`) are
+        crawled first, bounded by `deadline`; a paper that misses it falls back
+        to its previous snapshot, if any.
+        """
+        if not newspaper_dicts:
+            return []
+        location_query = location_query_for(newspaper_dicts)
+        city = location_query["city"]
+        papers = [Paper(d) for d in newspaper_dicts]
+        user_keywords = [user_keyword] if user_keyword else None
+
+        refreshes = list(self._start_refreshes(papers, city, force_refresh))
+        if refreshes:
+            _, pending = await asyncio.wait(refreshes, timeout=deadline)
+            if pending:
+                logger.warning("%d news source(s) missed the %ss deadline; serving stored results", len(pending), deadline)
+                for waiter in pending:
+                    waiter.cancel()
+            # Failures were logged by the crawl itself; stored snapshots are used below.
+            await asyncio.gather(*refreshes, return_exceptions=True)
+
+        paper_results = []
+        for paper in papers:
+            snapshot = self._snapshots.get(paper.key)
+            ranked = rank_paper_extracts(paper, snapshot.data, location_query, user_keywords) if snapshot else []
+            paper_results.append((paper, ranked))
+        imd = self._snapshots.get(_IMD_KEY)
+        imd_alerts = imd.data.alerts(city) if imd is not None and city else []
+        return combine_results(paper_results, imd_alerts, user_keyword)
+
+    def _start_refreshes(self, papers: List[Paper], city: str, force_refresh: bool) -> Dict[asyncio.Future, tuple]:
+        """Start a crawl for every source that needs one; future -> source key."""
+        refreshes = {}
+        for paper in papers:
+            if (force_refresh or not self._is_fresh(paper.key)) and paper.key not in refreshes.values():
+                refreshes[asyncio.ensure_future(self.refresh_paper(paper))] = paper.key
+        if city and (force_refresh or not self._is_fresh(_IMD_KEY)):
+            refreshes[asyncio.ensure_future(self.refresh_imd())] = _IMD_KEY
+        return refreshes
+
+    async def analyze_stream(
+        self,
+        newspaper_dicts: List[dict],
+        user_keyword: Optional[str] = None,
+        force_refresh: bool = False,
+        deadline: Optional[float] = FETCH_DEADLINE_SECONDS,
+    ) -> AsyncIterator[Tuple[str, List[dict]]]:
+        """Yield `(source name, articles)` per source as soon as it is ready.
+
+        Sources with a fresh snapshot come first (IMD before the papers), then
+        each crawled source as its crawl finishes. At `deadline` the remaining
+        sources are answered from their previous snapshot (or empty).
+        Articles are in the same format as `analyze` returns.
+        """
+        if not newspaper_dicts:
+            return
+        location_query = location_query_for(newspaper_dicts)
+        city = location_query["city"]
+        papers = [Paper(d) for d in newspaper_dicts]
+        user_keywords = [user_keyword] if user_keyword else None
+
+        def frames(key: tuple) -> List[Tuple[str, List[dict]]]:
+            snapshot = self._snapshots.get(key)
+            if key == _IMD_KEY:
+                alerts = snapshot.data.alerts(city) if snapshot is not None else []
+                return [("IMD RSS Feed", combine_results([], alerts, user_keyword))]
+            return [
+                (paper.name, combine_results(
+                    [(paper, rank_paper_extracts(paper, snapshot.data, location_query, user_keywords) if snapshot else [])],
+                    [],
+                    user_keyword,
+                ))
+                for paper in papers
+                if paper.key == key
+            ]
+
+        pending = self._start_refreshes(papers, city, force_refresh)
+        try:
+            ready = ([_IMD_KEY] if city else []) + list(dict.fromkeys(p.key for p in papers))
+            for key in ready:
+                if key not in pending.values():
+                    for frame in frames(key):
+                        yield frame
+
+            loop = asyncio.get_running_loop()
+            ends_at = None if deadline is None else loop.time() + deadline
+            while pending:
+                timeout = None if ends_at is None else max(ends_at - loop.time(), 0)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.warning("%d news source(s) missed the %ss deadline; serving stored results", len(pending), deadline)
+                    break
+                for future in done:
+                    if not future.cancelled():
+                        future.exception()  # logged by the crawl; the stored snapshot is used
+                    for frame in frames(pending.pop(future)):
+                        yield frame
+            for key in list(pending.values()):
+                for frame in frames(key):
+                    yield frame
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+
+    def stats(self) -> dict:
+        return {
+            "sources": len(self._snapshots),
+            "articles": sum(len(s.data) for k, s in self._snapshots.items() if k != _IMD_KEY),
+            "crawling": len(self._flights),
+            "max_age": self.max_age,
+        }
+
+
+class NewsPrecrawler:
+    """Periodically crawls every `Newspaper` row and the IMD feed into a store."""
+
+    def __init__(self, store: WarmNewsStore, interval: float, session_factory=AsyncSessionLocal):
+        self.store = store
+        self.interval = interval
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def crawl_all(self) -> int:
+        async with self.session_factory() as session:
+            rows = (await session.execute(select(Newspaper))).scalars().all()
+            papers = {}
+            for row in rows:
+                paper = Paper(newspaper_to_dict(row))
+                papers.setdefault(paper.key, paper)
+        results = await asyncio.gather(
+            self.store.refresh_imd(),
+            *(self.store.refresh_paper(p) for p in papers.values()),
+            return_exceptions=True,
+        )
+        crawled = sum(1 for r in results if isinstance(r, Snapshot))
+        logger.info("News pre-crawl refreshed %d of %d sources", crawled, len(results))
+        return crawled
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.crawl_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("News pre-crawl failed")
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 1.0))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+NEWS_STORE = WarmNewsStore()
+_PRECRAWLER: Optional[NewsPrecrawler] = None
+
+
+def start_precrawl() -> Optional[NewsPrecrawler]:
+    """Start the scheduler when `NEWS_PRECRAWL_INTERVAL` is configured."""
+    global _PRECRAWLER
+    if PRECRAWL_INTERVAL <= 0:
+        return None
+    if _PRECRAWLER is None:
+        _PRECRAWLER = NewsPrecrawler(NEWS_STORE, PRECRAWL_INTERVAL)
+    _PRECRAWLER.start()
+    return _PRECRAWLER
+
+
+async def stop_precrawl() -> None:
+    global _PRECRAWLER
+    precrawler, _PRECRAWLER = _PRECRAWLER, None
+    if precrawler is not None:
+        await precrawler.stop()
+
+
+_ANALYSIS_FLIGHTS = SingleFlight()
+_ANALYSIS_RESULTS: LRUCache[List[dict]] = LRUCache(256, ttl=ANALYSIS_CACHE_TTL)
+_SHARED_CACHE: Optional[SharedAnalysisCache] = (
+    SharedAnalysisCache(ANALYSIS_CACHE_TTL) if SHARED_ANALYSIS_CACHE else None
+)
+
+
+def analysis_key(newspaper_dicts: List[dict], keyword: Optional[str] = None) -> tuple:
+    """Everything an analysis result depends on."""
+    location_query = location_query_for(newspaper_dicts)
+    return (
+        tuple(Paper(d).key for d in newspaper_dicts),
+        location_query["city"],
+        location_query["state"],
+        keyword or "",
+    )
+
+
+async def analyze_news(
+    newspaper_dicts: List[dict],
+    keyword: Optional[str] = None,
+    force_refresh: bool = False,
+) -> List[dict]:
+    """`NEWS_STORE.analyze`, coalesced per `analysis_key` and briefly cached.
+
+    A forced refresh skips the cache but still joins a forced refresh of the
+    same analysis that is already running.
+    """
+    key = analysis_key(newspaper_dicts, keyword)
+    if not force_refresh and ANALYSIS_CACHE_TTL > 0:
+        cached = _ANALYSIS_RESULTS.get(key)
+        if cached is not None:
+            return [dict(a) for a in cached]
+
+    async def run() -> List[dict]:
+        async def compute() -> List[dict]:
+            return await NEWS_STORE.analyze(newspaper_dicts, keyword, force_refresh=force_refresh)
+
+        if _SHARED_CACHE is not None:
+            result = await _SHARED_CACHE.get_or_compute(key, compute, force=force_refresh)
+        else:
+            result = await compute()
+        if ANALYSIS_CACHE_TTL > 0:
+            _ANALYSIS_RESULTS.set(key, result)
+        # Once per distinct analysis, not per coalesced or cached caller.
+        archive_in_background(result, city=key[1], state=key[2])
+        return result
+
+    result = await _ANALYSIS_FLIGHTS.do((key, force_refresh), run)
+    # Callers get their own dicts; the cached/shared list stays untouched.
+    return [dict(a) for a in result]
+
+
+async def stream_news(
+    newspaper_dicts: List[dict],
+    keyword: Optional[str] = None,
+    force_refresh: bool = False,
+) -> AsyncIterator[Tuple[str, List[dict]]]:
+    location_query = location_query_for(newspaper_dicts)
+    async for source, articles in NEWS_STORE.analyze_stream(newspaper_dicts, keyword, force_refresh=force_refresh):
+        archive_in_background(articles, city=location_query["city"], state=location_query["state"])
+        yield source, articles
+
+
+__all__ = [
+    "NEWS_STORE",
+    "NewsPrecrawler",
+    "Snapshot",
+    "WarmNewsStore",
+    "analysis_key",
+    "analyze_news",
+    "start_precrawl",
+    "stop_precrawl",
+    "stream_news",
+]
@@ -1,6 +1,7 @@
 """Centralized newspaper prioritization logic.
 
-Exports build_prioritized_newspaper_dicts used by router and tests.
+Exports build_prioritized_newspaper_dicts used by router and tests, and
+newspaper_to_dict used by the background pre-crawl.
 Selection rule: 1 local (non-national) matching city/state + up to 5 national.
 """
 from typing import List, Dict
@@ -39,19 +40,21 @@ async def build_prioritized_newspaper_dicts(db: AsyncSession, state_id: int, cit
         prioritized.append(local_papers[0])
     prioritized.extend(national_papers[:MAX_NATIONAL])
 
-    result: List[Dict] = []
-    for paper in prioritized:
-        base_url = paper.base_url
-        if not base_url and paper.rss_url:
-            parsed = urlparse(paper.rss_url)
-            if parsed.scheme and parsed.netloc:
-                base_url = f"{parsed.scheme}://{parsed.netloc}"
-        result.append({
-            'name': paper.name,
-            'rss_url': paper.rss_url,
-            'rss_feed_url': paper.rss_url,  # legacy alias
-            'base_url': base_url,
-            'city': city_name,
-            'state': None,
-        })
-    return result
+    return [newspaper_to_dict(paper, city_name) for paper in prioritized]
+
+
+def newspaper_to_dict(paper, city_name: str = '') -> Dict:
+    """Scraper dict for a `Newspaper` row; base_url falls back to the RSS origin."""
+    base_url = paper.base_url
+    if not base_url and paper.rss_url:
+        parsed = urlparse(paper.rss_url)
+        if parsed.scheme and parsed.netloc:
+            base_url = f"{parsed.scheme}://{parsed.netloc}"
+    return {
+        'name': paper.name,
+        'rss_url': paper.rss_url,
+        'rss_feed_url': paper.rss_url,  # legacy alias
+        'base_url': base_url,
+        'city': city_name,
+        'state': None,
+    }
@@ -0,0 +1,218 @@
+"""Pub/sub backends for fanning WebSocket broadcasts out across workers.
+
+`ConnectionManager` keeps sockets per process. With several uvicorn workers or
+pods, each broadcast is also published on the room's channel, and every
+worker subscribed to that channel (because it has local sockets in the room)
+delivers it to its own sockets.
+
+- `InMemoryPubSub`: process-local; instances sharing an `InMemoryHub` behave
+  like separate workers, which is what the tests use.
+- `PostgresPubSub`: PostgreSQL LISTEN/NOTIFY on one dedicated asyncpg
+  connection per worker. Payloads are limited to `MAX_NOTIFY_PAYLOAD` bytes
+  by PostgreSQL; larger messages are refused with `PayloadTooLarge`, so
+  callers check `max_payload` before accepting a message they must fan out.
+
+Select one with `CHAT_PUBSUB_BACKEND=memory|postgres` (`create_pubsub_backend`).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+PUBSUB_BACKEND = os.getenv("CHAT_PUBSUB_BACKEND", "memory").lower()
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_PAYLOAD = 7999
+RECONNECT_DELAY = float(os.getenv("CHAT_PUBSUB_RECONNECT_DELAY", "1.0"))
+
+Handler = Callable[[str, str], Awaitable[None]]
+
+
+class PayloadTooLarge(ValueError):
+    pass
+
+
+class PubSubBackend:
+    """Deliver `publish(channel, payload)` to every subscriber of `channel`.
+
+    Handlers are called as `await handler(channel, payload)`, also for the
+    publisher's own subscription; callers filter their own echoes.
+    `max_payload` is the largest payload in UTF-8 bytes, None when unlimited.
+    """
+
+    max_payload: Optional[int] = None
+
+    async def publish(self, channel: str, payload: str) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        raise NotImplementedError
+
+    async def unsubscribe(self, channel: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryHub:
+    """Stands in for the broker shared by several `InMemoryPubSub` workers."""
+
+    def __init__(self) -> None:
+        self.subscribers: Dict[str, Set["InMemoryPubSub"]] = {}
+
+
+class InMemoryPubSub(PubSubBackend):
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub or InMemoryHub()
+        self._handlers: Dict[str, Handler] = {}
+
+    async def publish(self, channel: str, payload: str) -> None:
+        for subscriber in list(self.hub.subscribers.get(channel, ())):
+            handler = subscriber._handlers.get(channel)
+            if handler is not None:
+                await handler(channel, payload)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel] = handler
+        self.hub.subscribers.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+        subscribers = self.hub.subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self.hub.subscribers[channel]
+
+    @property
+    def channels(self) -> Set[str]:
+        return set(self._handlers)
+
+    async def close(self) -> None:
+        for channel in list(self._handlers):
+            await self.unsubscribe(channel)
+
+
+class PostgresPubSub(PubSubBackend):
+    """LISTEN/NOTIFY on a dedicated connection, re-established if it drops."""
+
+    max_payload = MAX_NOTIFY_PAYLOAD
+
+    def __init__(self, dsn: str, reconnect_delay: float = RECONNECT_DELAY):
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self._handlers: Dict[str, Handler] = {}
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+    def _state(self) -> asyncio.Lock:
+        # The connection and lock belong to the loop that created them.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._lock, self._connection = loop, asyncio.Lock(), None
+        return self._lock
+
+    async def _connect(self):
+        """The listening connection, (re)connecting and re-LISTENing as needed.
+
+        Called with the lock held.
+        """
+        if self._connection is not None and not self._connection.is_closed():
+            return self._connection
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        connection.add_termination_listener(self._on_terminated)
+        for channel in self._handlers:
+            await connection.add_listener(channel, self._on_notify)
+        self._connection = connection
+        return connection
+
+    def _on_notify(self, _connection, _pid, channel: str, payload: str) -> None:
+        handler = self._handlers.get(channel)
+        if handler is not None:
+            self._spawn(handler(channel, payload))
+
+    def _on_terminated(self, _connection) -> None:
+        if self._closed:
+            return
+        logger.warning("Chat pub/sub connection lost; reconnecting")
+        self._connection = None
+        self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while not self._closed and self._handlers:
+            try:
+                async with self._state():
+                    await self._connect()
+                return
+            except Exception as exc:  # OSError, asyncpg errors
+                logger.warning("Chat pub/sub reconnect failed: %s", exc)
+                await asyncio.sleep(self.reconnect_delay)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def publish(self, channel: str, payload: str) -> None:
+        if len(payload.encode("utf-8")) > self.max_payload:
+            raise PayloadTooLarge(f"{len(payload)} characters exceed the NOTIFY payload limit")
+        async with self._state():
+            connection = await self._connect()
+            await connection.execute("SELECT pg_notify($1, $2)", channel, payload)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        async with self._state():
+            self._handlers[channel] = handler
+            connection = await self._connect()
+            await connection.add_listener(channel, self._on_notify)
+
+    async def unsubscribe(self, channel: str) -> None:
+        async with self._state():
+            if self._handlers.pop(channel, None) is None:
+                return
+            if self._connection is not None and not self._connection.is_closed():
+                await self._connection.remove_listener(channel, self._on_notify)
+
+    async def close(self) -> None:
+        self._closed = True
+        self._handlers.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+
+def _asyncpg_dsn(url: str) -> str:
+    # SQLAlchemy URLs name the driver ("postgresql+asyncpg://"); asyncpg does not.
+    scheme, sep, rest = url.partition("://")
+    return f"{scheme.split('+')[0]}{sep}{rest}"
+
+
+def create_pubsub_backend(kind: str = PUBSUB_BACKEND) -> PubSubBackend:
+    if kind == "postgres":
+        from app.database import SQLALCHEMY_DATABASE_URL
+
+        return PostgresPubSub(_asyncpg_dsn(SQLALCHEMY_DATABASE_URL))
+    if kind != "memory":
+        logger.warning("Unknown CHAT_PUBSUB_BACKEND %r; using in-memory pub/sub", kind)
+    return InMemoryPubSub()
+
+
+__all__ = [
+    "InMemoryHub",
+    "InMemoryPubSub",
+    "PayloadTooLarge",
+    "PostgresPubSub",
+    "PubSubBackend",
+    "create_pubsub_backend",
+]
@@ -0,0 +1,65 @@
+"""Per-domain token-bucket scheduling for polite crawling.
+
+Each domain gets a bucket refilled at one token per crawl-delay interval and
+holding at most `burst` tokens. A fetch reserves a token and sleeps only for
+its own reservation, so no lock is held while waiting and one slow site never
+delays requests to any other site. Reservations are taken synchronously on
+the event loop, which makes them atomic without any locking.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """Token bucket that lets callers reserve future tokens.
+
+    `reserve()` always succeeds and returns how long the caller must wait for
+    its token; the bucket's balance may go negative to represent the queue of
+    waiting callers.
+    """
+
+    __slots__ = ("burst", "tokens", "updated")
+
+    def __init__(self, burst: float = 1.0):
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self, interval: float) -> float:
+        now = time.monotonic()
+        if interval <= 0:
+            self.tokens, self.updated = self.burst, now
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) / interval)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens * interval
+
+
+class DomainRateLimiter:
+    """One `TokenBucket` per domain; the interval is passed per call so it can
+    follow each site's robots.txt Crawl-delay."""
+
+    def __init__(self, burst: float = 1.0):
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def reserve(self, domain: str, interval: float) -> float:
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = self._buckets[domain] = TokenBucket(self.burst)
+        return bucket.reserve(interval)
+
+    async def wait(self, domain: str, interval: float) -> None:
+        delay = self.reserve(domain, interval)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+__all__ = ["DomainRateLimiter", "TokenBucket"]
@@ -0,0 +1,233 @@
+"""URL-keyed HTTP response cache with conditional revalidation for the scraper.
+
+Entries keep the decoded body plus the `ETag` / `Last-Modified` validators.
+
+- Within `ttl` seconds of being stored (or revalidated) an entry is served
+  without touching the network.
+- After that the scraper sends a conditional GET; a `304 Not Modified` refreshes
+  the entry and reuses the stored body, a `200` replaces it.
+- Entries older than `max_age` are dropped. The default matches the 48 hour
+  window of `is_recent_ist`, beyond which articles are filtered out anyway.
+
+The in-memory tier is a byte-bounded LRU. Setting `SCRAPER_CACHE_PATH` adds a
+SQLite tier so the cache survives restarts and is shared by workers on one host.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+
+from app.services.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = float(os.getenv("SCRAPER_CACHE_TTL", "300"))
+CACHE_MAX_AGE = float(os.getenv("SCRAPER_CACHE_MAX_AGE", str(48 * 3600)))
+CACHE_MEMORY_BYTES = int(os.getenv("SCRAPER_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+CACHE_PATH = os.getenv("SCRAPER_CACHE_PATH")
+
+# Only headers needed to decode the body and revalidate are kept; transport
+# headers such as Content-Encoding would be wrong for the stored decoded body.
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    content: bytes
+    headers: dict = field(default_factory=dict)
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def validators(self) -> dict:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers=self.headers,
+            content=self.content,
+            request=httpx.Request("GET", self.url),
+        )
+
+    @classmethod
+    def from_response(cls, url: str, resp: httpx.Response) -> "CachedResponse":
+        headers = {k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers}
+        return cls(url=url, content=resp.content, headers=headers)
+
+
+class SqliteResponseStore:
+    """On-disk tier; every call is blocking and meant to run in a worker thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " content BLOB NOT NULL,"
+                " content_type TEXT,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " stored_at REAL NOT NULL)"
+            )
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, content_type, etag, last_modified, stored_at"
+                " FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        content, content_type, etag, last_modified, stored_at = row
+        headers = {
+            k: v
+            for k, v in (("content-type", content_type), ("etag", etag), ("last-modified", last_modified))
+            if v
+        }
+        return CachedResponse(url=url, content=content, headers=headers, stored_at=stored_at)
+
+    def put(self, entry: CachedResponse) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (url, content, content_type, etag, last_modified, stored_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    entry.url,
+                    entry.content,
+                    entry.headers.get("content-type"),
+                    entry.etag,
+                    entry.last_modified,
+                    entry.stored_at,
+                ),
+            )
+
+    def delete_older_than(self, cutoff: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE stored_at < ?", (cutoff,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) response cache."""
+
+    # Prune the disk tier once per this many writes.
+    _PRUNE_EVERY = 500
+
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL,
+        max_age: float = CACHE_MAX_AGE,
+        memory_bytes: int = CACHE_MEMORY_BYTES,
+        disk: Optional[SqliteResponseStore] = None,
+    ):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.memory: LRUCache[CachedResponse] = LRUCache(
+            memory_bytes, ttl=max_age, sizeof=lambda e: len(e.content)
+        )
+        self.disk = disk
+        self._writes = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        disk = None
+        if CACHE_PATH:
+            try:
+                disk = SqliteResponseStore(CACHE_PATH)
+            except sqlite3.Error as exc:
+                logger.warning("Response cache disk tier disabled (%s): %s", CACHE_PATH, exc)
+        return cls(disk=disk)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return entry.age() < self.ttl
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        entry = self.memory.get(url)
+        if entry is None and self.disk is not None:
+            try:
+                entry = await asyncio.to_thread(self.disk.get, url)
+            except sqlite3.Error as exc:
+                logger.warning("Response cache read failed for %s: %s", url, exc)
+                entry = None
+            if entry is not None:
+                self._remember(entry)
+        if entry is not None and entry.age() >= self.max_age:
+            self.memory.pop(url)
+            return None
+        return entry
+
+    async def store(self, url: str, resp: httpx.Response) -> Optional[CachedResponse]:
+        """Cache a successful response for `url` unless the server forbids storing it."""
+        if resp.status_code != 200 or "no-store" in resp.headers.get("cache-control", "").lower():
+            return None
+        entry = CachedResponse.from_response(url, resp)
+        await self._save(entry)
+        return entry
+
+    async def revalidated(self, entry: CachedResponse, not_modified: httpx.Response) -> CachedResponse:
+        """Refresh an entry after a 304, picking up any updated validators."""
+        headers = dict(entry.headers)
+        for key in ("etag", "last-modified"):
+            if key in not_modified.headers:
+                headers[key] = not_modified.headers[key]
+        refreshed = CachedResponse(url=entry.url, content=entry.content, headers=headers)
+        await self._save(refreshed)
+        return refreshed
+
+    def _remember(self, entry: CachedResponse) -> None:
+        self.memory.set(entry.url, entry, ttl=max(self.max_age - entry.age(), 1.0))
+
+    async def _save(self, entry: CachedResponse) -> None:
+        self._remember(entry)
+        if self.disk is None:
+            return
+        self._writes += 1
+        try:
+            await asyncio.to_thread(self.disk.put, entry)
+            if self._writes % self._PRUNE_EVERY == 0:
+                await asyncio.to_thread(self.disk.delete_older_than, time.time() - self.max_age)
+        except sqlite3.Error as exc:
+            logger.warning("Response cache write failed for %s: %s", entry.url, exc)
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "ttl": self.ttl, "disk": bool(self.disk)}
+
+
+__all__ = ["CachedResponse", "ResponseCache", "SqliteResponseStore"]
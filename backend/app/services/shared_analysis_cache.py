@@ -0,0 +1,155 @@
+"""Cross-worker coalescing of news analyses through PostgreSQL.
+
+The in-process single flight in `news_precrawl` only merges requests that hit
+the same API worker. With several workers, `SharedAnalysisCache` lets one
+worker compute an analysis while the others wait for its result:
+
+1. A short transaction reads the `news_analysis_cache` row and, when it is
+   not fresh, tries to take the key's lease in `news_analysis_leases` (a row
+   with an owner and an expiry, taken over only once it has expired).
+2. The lease holder runs the analysis with no transaction or connection held.
+3. Another short transaction upserts the result and releases the lease.
+
+Workers that find the lease taken re-check every `POLL_INTERVAL` seconds and
+return the row once it is written. A worker that dies mid-analysis holds
+nothing but its lease row, which the others take over after `LEASE_SECONDS`.
+
+A forced refresh only reuses a row written after the request started, i.e.
+by a forced refresh that was already running. Database errors fall back to
+computing locally, so the cache can never take the endpoint down.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Hashable, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import AsyncSessionLocal
+from app.models.news_models import NewsAnalysisCache, NewsAnalysisLease
+
+logger = logging.getLogger(__name__)
+
+# Longest an analysis is expected to take; a lease older than this is taken over.
+LEASE_SECONDS = float(os.getenv("NEWS_ANALYSIS_LEASE_SECONDS", "120"))
+POLL_INTERVAL = 0.5
+
+_MISSING = object()
+
+
+def cache_key_digest(key: Hashable) -> str:
+    return hashlib.sha256(json.dumps(key, default=str).encode("utf-8")).hexdigest()
+
+
+class SharedAnalysisCache:
+    def __init__(
+        self,
+        ttl: float,
+        session_factory=AsyncSessionLocal,
+        lease_seconds: float = LEASE_SECONDS,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[List[dict]]],
+        force: bool = False,
+    ) -> List[dict]:
+        result: Any = _MISSING
+
+        async def run() -> List[dict]:
+            nonlocal result
+            result = await compute()
+            return result
+
+        try:
+            return await self._coalesced(cache_key_digest(key), run, force)
+        except (SQLAlchemyError, OSError) as exc:
+            logger.warning("Shared news analysis cache unavailable: %s", exc)
+            return await compute() if result is _MISSING else result
+
+    async def _coalesced(self, digest: str, compute, force: bool) -> List[dict]:
+        owner = uuid4().hex
+        started: Optional[datetime] = None
+        while True:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    now = (await session.execute(select(func.now()))).scalar_one()
+                    # The first check marks when the request started.
+                    started = started or now
+                    row = (await session.execute(
+                        select(NewsAnalysisCache.result_json, NewsAnalysisCache.created_at)
+                        .where(NewsAnalysisCache.cache_key == digest)
+                    )).one_or_none()
+                    if row is not None and self._fresh(row.created_at, started, force):
+                        return row.result_json
+                    if await self._take_lease(session, digest, owner, now):
+                        break
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            result = await compute()
+        except BaseException:
+            await self._release(digest, owner)
+            raise
+
+        async with self.session_factory() as session:
+            async with session.begin():
+                # clock_timestamp(): stamp the row when written, not when this transaction began.
+                stmt = insert(NewsAnalysisCache).values(
+                    cache_key=digest, result_json=result, created_at=func.clock_timestamp()
+                )
+                await session.execute(stmt.on_conflict_do_update(
+                    index_elements=[NewsAnalysisCache.cache_key],
+                    set_={"result_json": stmt.excluded.result_json, "created_at": stmt.excluded.created_at},
+                ))
+                await session.execute(self._lease_of(digest, owner))
+        return result
+
+    def _fresh(self, created_at: datetime, started: datetime, force: bool) -> bool:
+        if force:
+            return created_at >= started
+        return (started - created_at).total_seconds() < self.ttl
+
+    async def _take_lease(self, session, digest: str, owner: str, now: datetime) -> bool:
+        """Take the key's lease unless another worker holds an unexpired one."""
+        stmt = insert(NewsAnalysisLease).values(
+            cache_key=digest, owner=owner, expires_at=now + timedelta(seconds=self.lease_seconds)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NewsAnalysisLease.cache_key],
+            set_={"owner": stmt.excluded.owner, "expires_at": stmt.excluded.expires_at},
+            where=NewsAnalysisLease.expires_at <= now,
+        ).returning(NewsAnalysisLease.owner)
+        return (await session.execute(stmt)).first() is not None
+
+    @staticmethod
+    def _lease_of(digest: str, owner: str):
+        return delete(NewsAnalysisLease).where(
+            NewsAnalysisLease.cache_key == digest, NewsAnalysisLease.owner == owner
+        )
+
+    async def _release(self, digest: str, owner: str) -> None:
+        # Best effort: an unreleased lease only delays the next worker until it expires.
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    await session.execute(self._lease_of(digest, owner))
+        except (SQLAlchemyError, OSError) as exc:
+            logger.warning("Releasing news analysis lease failed: %s", exc)
+
+
+__all__ = ["SharedAnalysisCache", "cache_key_digest"]
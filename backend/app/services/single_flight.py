@@ -0,0 +1,56 @@
+"""In-process request coalescing ("single flight").
+
+Concurrent callers asking for the same key share one task instead of each
+doing the work. Waiters are shielded from one another: a caller that gives up
+(timeout, client disconnect) does not cancel the shared task, which finishes
+for the remaining waiters and anything it warms along the way.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Loop-bound map of key -> in-flight task."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def _inflight(self) -> Dict[Hashable, asyncio.Task]:
+        # Tasks belong to the loop that started them (tests, `asyncio.run`).
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._tasks = loop, {}
+        return self._tasks
+
+    def task(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """The in-flight task for `key`, starting `factory()` if there is none."""
+        tasks = self._inflight()
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = asyncio.ensure_future(factory())
+
+            def _done(t: asyncio.Task) -> None:
+                if tasks.get(key) is t:
+                    del tasks[key]
+                if not t.cancelled():
+                    t.exception()  # mark retrieved; waiters re-raise it
+
+            task.add_done_callback(_done)
+        return task
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        return await asyncio.shield(self.task(key, factory))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+__all__ = ["SingleFlight"]
@@ -1,36 +1,241 @@
-from typing import Dict, List
-from fastapi import WebSocket
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+from uuid import uuid4
+from fastapi import WebSocket, status
+import asyncio
 import json
+import logging
+import os
+
+from app.services.pubsub import PubSubBackend
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel per room; keeps chat rooms apart from other NOTIFY users.
+CHANNEL_PREFIX = "ws:"
+
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+# "drop_oldest": a slow socket skips its oldest queued messages.
+# "disconnect": a slow socket whose queue fills up is closed.
+OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "drop_oldest").lower()
+SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "10"))
+
+
+class _Writer:
+    """Bounded outbound queue of one socket, drained by its own task."""
+
+    def __init__(self, websocket: WebSocket, maxsize: int):
+        self.websocket = websocket
+        self.maxsize = max(1, maxsize)
+        self.queue: Deque[str] = deque()
+        self.rooms: Set[str] = set()
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, text_data: str, policy: str) -> bool:
+        """Queue a message; False when the socket should be dropped instead."""
+        if len(self.queue) >= self.maxsize:
+            if policy == "disconnect":
+                return False
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(text_data)
+        self.idle.clear()
+        self.wakeup.set()
+        return True
+
 
 class ConnectionManager:
-    def __init__(self):
+    """Rooms of local WebSockets, optionally fanned out across workers.
+
+    Every socket has a bounded send queue and a writer task, so a broadcast
+    only serializes the message once and enqueues it; one slow client never
+    delays the others. When a queue is full the overflow policy applies
+    (`WS_OVERFLOW_POLICY`), and sockets whose send fails or times out are
+    evicted from their rooms.
+
+    With a pub/sub `backend`, every broadcast is delivered to the local sockets
+    right away and published on the room's channel for the other workers. A
+    worker subscribes to a room's channel only while it has local sockets in
+    that room, and ignores the echo of its own publications.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[PubSubBackend] = None,
+        queue_size: int = SEND_QUEUE_SIZE,
+        overflow_policy: str = OVERFLOW_POLICY,
+        send_timeout: float = SEND_TIMEOUT,
+    ):
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        self.backend = backend
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+        # Tags this worker's publications so it can skip its own echoes.
+        self.instance_id = uuid4().hex
+        self._writers: Dict[WebSocket, _Writer] = {}
+        self._pending: set = set()
+        self.evicted = 0
 
     async def connect(self, websocket: WebSocket, room_key: str):
-        room_key = str(room_key)  
+        room_key = str(room_key)
         await websocket.accept()
         if room_key not in self.active_connections:
             self.active_connections[room_key] = []
+            if self.backend is not None:
+                await self._subscribe(room_key)
         self.active_connections[room_key].append(websocket)
+        writer = self._writers.get(websocket)
+        if writer is None:
+            writer = self._writers[websocket] = _Writer(websocket, self.queue_size)
+            writer.task = asyncio.get_running_loop().create_task(self._drain(writer))
+        writer.rooms.add(room_key)
 
     def disconnect(self, websocket: WebSocket, room_key: str):
-        room_key = str(room_key)  
+        room_key = str(room_key)
         if room_key in self.active_connections:
             if websocket in self.active_connections[room_key]:
                 self.active_connections[room_key].remove(websocket)
             if not self.active_connections[room_key]:
                 del self.active_connections[room_key]
+                if self.backend is not None:
+                    self._spawn(self._unsubscribe(room_key))
+        writer = self._writers.get(websocket)
+        if writer is not None:
+            writer.rooms.discard(room_key)
+            if not writer.rooms:
+                self._stop_writer(writer)
+
+    def fits(self, message: dict) -> bool:
+        """Whether `broadcast(message)` can reach the other workers too.
+
+        Counts the whole published payload (serialized message plus this
+        worker's tag) against the backend's `max_payload`.
+        """
+        limit = getattr(self.backend, "max_payload", None)
+        if limit is None:
+            return True
+        size = len(self.instance_id) + 1 + len(json.dumps(message, default=str).encode("utf-8"))
+        return size <= limit
 
     async def broadcast(self, message: dict, room_key: str):
-        room_key = str(room_key)   
+        room_key = str(room_key)
+        text_data = json.dumps(message, default=str)
+        self._send_local(text_data, room_key)
+        if self.backend is not None:
+            try:
+                await self.backend.publish(CHANNEL_PREFIX + room_key, f"{self.instance_id}:{text_data}")
+            except Exception as exc:
+                # Local sockets already have it; other workers miss this one.
+                logger.warning("Publishing to room %s failed: %s", room_key, exc)
+
+    def _send_local(self, text_data: str, room_key: str):
+        for connection in list(self.active_connections.get(room_key, ())):
+            writer = self._writers.get(connection)
+            if writer is not None and not writer.offer(text_data, self.overflow_policy):
+                logger.info("Disconnecting slow WebSocket consumer in room %s", room_key)
+                self._evict(writer, close_code=status.WS_1013_TRY_AGAIN_LATER)
+
+    async def _drain(self, writer: _Writer):
+        while True:
+            if not writer.queue:
+                writer.idle.set()
+                writer.wakeup.clear()
+                await writer.wakeup.wait()
+                continue
+            text_data = writer.queue.popleft()
+            # A timer, not wait_for: no extra task per message on the hot path.
+            deadline = asyncio.get_running_loop().call_later(self.send_timeout, self._send_timed_out, writer)
+            try:
+                await writer.websocket.send_text(text_data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.info("Evicting WebSocket after failed send: %r", exc)
+                self._evict(writer)
+                return
+            finally:
+                deadline.cancel()
+
+    def _send_timed_out(self, writer: _Writer):
+        if self._writers.get(writer.websocket) is writer:
+            logger.info("Evicting WebSocket whose send took over %ss", self.send_timeout)
+            self._evict(writer, close_code=status.WS_1013_TRY_AGAIN_LATER)
+
+    def _evict(self, writer: _Writer, close_code: Optional[int] = None):
+        """Remove a dead or slow socket from all its rooms and stop its writer."""
+        self.evicted += 1
+        for room_key in list(writer.rooms):
+            self.disconnect(writer.websocket, room_key)
+        self._stop_writer(writer)
+        if close_code is not None:
+            self._spawn(self._close(writer.websocket, close_code))
+
+    def _stop_writer(self, writer: _Writer):
+        if self._writers.get(writer.websocket) is writer:
+            del self._writers[writer.websocket]
+        writer.queue.clear()
+        writer.idle.set()
+        if writer.task is not None and writer.task is not asyncio.current_task():
+            writer.task.cancel()
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass  # already gone
+
+    async def drain(self):
+        """Wait until every queued message has been handed to its socket."""
+        await asyncio.gather(*(writer.idle.wait() for writer in list(self._writers.values())))
+
+    def stats(self) -> dict:
+        writers = list(self._writers.values())
+        return {
+            "rooms": len(self.active_connections),
+            "connections": len(writers),
+            "queued": sum(len(w.queue) for w in writers),
+            "dropped": sum(w.dropped for w in writers),
+            "evicted": self.evicted,
+        }
+
+    async def _on_published(self, channel: str, payload: str):
+        origin, _, text_data = payload.partition(":")
+        if origin == self.instance_id:
+            return
+        self._send_local(text_data, channel[len(CHANNEL_PREFIX):])
+
+    async def _subscribe(self, room_key: str):
+        try:
+            await self.backend.subscribe(CHANNEL_PREFIX + room_key, self._on_published)
+        except Exception as exc:
+            logger.warning("Subscribing to room %s failed; it only sees local messages: %s", room_key, exc)
+
+    async def _unsubscribe(self, room_key: str):
+        # The room may have been re-joined while this was scheduled.
         if room_key in self.active_connections:
-            text_data = json.dumps(message, default=str)
-            for connection in list(self.active_connections[room_key]):
-                try:
-                    await connection.send_text(text_data)
-                except Exception:
-                    # Ignore failing sends to avoid interrupting other connections.
-                    # Do NOT remove the connection here; callers can disconnect
-                    # explicitly if needed. Removing here caused tests to observe
-                    # missing connections after a broadcast.
-                    continue
+            return
+        try:
+            await self.backend.unsubscribe(CHANNEL_PREFIX + room_key)
+        except Exception as exc:
+            logger.warning("Unsubscribing from room %s failed: %s", room_key, exc)
+
+    def _spawn(self, coro):
+        try:
+            task = asyncio.get_running_loop().create_task(coro)
+        except RuntimeError:
+            coro.close()  # no loop: nothing is listening either
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def close(self):
+        for writer in list(self._writers.values()):
+            self._stop_writer(writer)
+        if self.backend is not None:
+            await self.backend.close()
@@ -6,3 +6,6 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
 -- Enable PostGIS for geographic data types
 CREATE EXTENSION IF NOT EXISTS postgis;
+
+-- Enable trigram matching for fuzzy search (GIN gin_trgm_ops indexes)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
@@ -0,0 +1,31 @@
+-- Full-text and trigram search indexes (see app/models/text_search.py) and
+-- the keyset index behind chat history paging.
+--
+-- New databases get these from Base.metadata.create_all at startup, but
+-- create_all does not add indexes to tables that already exist. Run this once
+-- against a database created before search and chat history paging were added:
+--
+--   psql -d roshni -f backend/schemas/migrations/search_indexes.sql
+--
+-- CONCURRENTLY keeps the tables writable while the indexes build; it cannot
+-- run inside a transaction, so do not pass -1 / --single-transaction.
+-- Every statement is idempotent.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Disaster logs: newest-first listing per disaster, ranked search, fuzzy titles.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_disaster_logs_disaster_created ON disaster_logs (disaster_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_disaster_logs_search ON disaster_logs USING gin (to_tsvector('english'::regconfig, (coalesce(title, '') || ' ') || coalesce(text_body, '')));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_disaster_logs_title_trgm ON disaster_logs USING gin (title gin_trgm_ops);
+
+-- Chat messages: history pages newest-first per room, ranked search, fuzzy text.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_disaster_chat_messages_history ON disaster_chat_messages (disaster_id, is_global, created_at, message_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_disaster_chat_messages_search ON disaster_chat_messages USING gin (to_tsvector('english'::regconfig, coalesce(message_text, '')));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_disaster_chat_messages_text_trgm ON disaster_chat_messages USING gin (message_text gin_trgm_ops);
+
+-- News articles: case-insensitive city/state filter (replaces the plain
+-- ix_news_articles_city_state, which lower() filters could not use), ranked search, fuzzy titles.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_news_articles_city_state_lower ON news_articles (lower(city), lower(state));
+DROP INDEX CONCURRENTLY IF EXISTS ix_news_articles_city_state;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_news_articles_search ON news_articles USING gin (to_tsvector('english'::regconfig, (coalesce(title, '') || ' ') || coalesce(description, '')));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_news_articles_title_trgm ON news_articles USING gin (title gin_trgm_ops);
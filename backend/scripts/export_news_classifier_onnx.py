@@ -0,0 +1,124 @@
+"""
+Export the fake-news BERT classifier to ONNX, quantize it to INT8 and check
+that it agrees with the Keras model.
+
+Writes `model.onnx` (FP32) and `model.int8.onnx` (dynamic INT8 weights) next
+to `model.h5`, then classifies a set of texts with all three and reports label
+agreement, the largest confidence difference and the per-article latency.
+Exits non-zero when the INT8 model's agreement is below `--min-agreement`.
+Serve the result with `NEWS_CLASSIFIER_BACKEND=onnx`.
+
+Needs the TensorFlow requirements plus `pip install tf2onnx onnxruntime`.
+
+Usage:
+    python -m scripts.export_news_classifier_onnx
+    python -m scripts.export_news_classifier_onnx --texts headlines.txt --min-agreement 0.98
+    python -m scripts.export_news_classifier_onnx --skip-export   # parity check only
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.ml.news_classifier import classifier
+from app.ml.onnx_backend import OnnxModel
+
+
+# Used when no --texts file is given: short IMD-style titles and full snippets.
+SAMPLE_TEXTS = [
+    "CHENNAI Thunderstorm with lightning and moderate rain very likely",
+    "Heavy rain floods low-lying areas of Chennai; IMD issues red alert for coastal districts",
+    "Cyclone to make landfall near Mumbai by Thursday evening, fishermen warned not to venture out",
+    "Earthquake of magnitude 4.2 jolts Assam, no casualties reported",
+    "Landslide blocks national highway in Himachal Pradesh after overnight cloudburst",
+    "Government confirms aliens caused the floods in Patna, says viral message",
+    "Forward this message: dam in Kerala will burst tonight, evacuate immediately",
+    "NDRF teams deployed as Brahmaputra crosses danger mark in Guwahati",
+    "Heatwave warning for Delhi as temperature crosses 45 degrees Celsius",
+    "Tsunami alert issued for entire east coast after minor tremor, claims unverified post",
+]
+
+
+def export(model, output: Path, opset: int) -> None:
+    import tensorflow as tf
+    import tf2onnx
+
+    signature = [
+        tf.TensorSpec((None,) + tuple(inp.shape[1:]), inp.dtype, name=inp.name.split(":")[0])
+        for inp in model.inputs
+    ]
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=str(output))
+    print(f"✅ Exported {output} ({output.stat().st_size / 1e6:.1f} MB)")
+
+
+def quantize(source: Path, output: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(source), str(output), weight_type=QuantType.QInt8)
+    print(f"✅ Quantized {output} ({output.stat().st_size / 1e6:.1f} MB)")
+
+
+def run(model, texts):
+    classifier.model = model
+    cleaned = [classifier._clean_text(t) for t in texts]
+    classifier._run_model(cleaned[:1])  # warm up outside the timing
+    started = time.perf_counter()
+    results = classifier._run_model(cleaned)
+    return results, (time.perf_counter() - started) / len(texts)
+
+
+def compare(name, reference, candidate) -> float:
+    (ref, ref_latency), (got, latency) = reference, candidate
+    agreement = sum(r[0] == g[0] for r, g in zip(ref, got)) / len(ref)
+    max_diff = max(
+        abs((r[1] if r[0] == "REAL" else 1 - r[1]) - (g[1] if g[0] == "REAL" else 1 - g[1]))
+        for r, g in zip(ref, got)
+    )
+    print(
+        f"{name:>6}: label agreement {agreement:.2%}, max |P(REAL) diff| {max_diff:.4f}, "
+        f"{latency * 1000:.1f} ms/article (keras {ref_latency * 1000:.1f} ms/article)"
+    )
+    return agreement
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output-dir", type=Path, default=classifier.model_path)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--texts", type=Path, help="file with one text per line for the parity check")
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    parser.add_argument("--skip-export", action="store_true", help="only run the parity check")
+    args = parser.parse_args()
+
+    fp32 = args.output_dir / "model.onnx"
+    int8 = args.output_dir / "model.int8.onnx"
+
+    # Reference: the Keras model plus the tokenizer, loaded the usual way.
+    keras_model = classifier._load_keras_model()
+    from transformers import BertTokenizer
+    classifier.tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
+
+    if not args.skip_export:
+        export(keras_model, fp32, args.opset)
+        quantize(fp32, int8)
+
+    texts = SAMPLE_TEXTS
+    if args.texts:
+        texts = [line.strip() for line in args.texts.read_text(encoding="utf-8").splitlines() if line.strip()]
+    print(f"Parity check on {len(texts)} texts")
+
+    reference = run(keras_model, texts)
+    compare("fp32", reference, run(OnnxModel(fp32), texts))
+    agreement = compare("int8", reference, run(OnnxModel(int8), texts))
+    if agreement < args.min_agreement:
+        print(f"❌ INT8 agreement {agreement:.2%} is below {args.min_agreement:.2%}")
+        return 1
+    print("🎉 ONNX export matches the Keras model")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
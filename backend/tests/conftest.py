@@ -90,6 +90,7 @@ def _ensure_postgres_extensions(engine) -> None:
     with engine.begin() as conn:
         conn.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
         conn.execute(text('CREATE EXTENSION IF NOT EXISTS "postgis"'))
+        conn.execute(text('CREATE EXTENSION IF NOT EXISTS "pg_trgm"'))
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -0,0 +1,160 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.ml import news_classifier
+from app.ml.news_classifier import classifier
+from app.ml.prediction_cache import PredictionCache
+
+pytestmark = pytest.mark.no_db
+
+
+class FakeTokenizer:
+    """Word-level stand-in for BertTokenizer: one id per word plus [CLS]/[SEP]."""
+
+    def __init__(self):
+        self.padded_shapes = []
+
+    def __call__(self, texts, max_length, **kwargs):
+        ids = [([101] + [len(w) for w in t.split()] + [102])[:max_length] for t in texts]
+        return {
+            "input_ids": ids,
+            "attention_mask": [[1] * len(i) for i in ids],
+            "token_type_ids": [[0] * len(i) for i in ids],
+        }
+
+    def pad(self, features, padding, max_length=None, pad_to_multiple_of=None, **kwargs):
+        width = max(len(i) for i in features["input_ids"])
+        if padding == "max_length":
+            width = max_length
+        elif pad_to_multiple_of:
+            width = -(-width // pad_to_multiple_of) * pad_to_multiple_of
+        out = {k: np.array([row + [0] * (width - len(row)) for row in v]) for k, v in features.items()}
+        self.padded_shapes.append(out["input_ids"].shape)
+        return out
+
+
+class FakeModel:
+    """Sigmoid 'REAL' probability that grows with the number of real tokens."""
+
+    def __init__(self, seq_len=None):
+        self.inputs = [SimpleNamespace(shape=(None, seq_len))] * 3
+
+    def predict(self, inputs, verbose=0):
+        input_ids, attention_mask, _ = inputs
+        assert input_ids.shape == attention_mask.shape
+        return (attention_mask.sum(axis=1, keepdims=True) / 100.0).astype(np.float32)
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    tokenizer = FakeTokenizer()
+    monkeypatch.setattr(classifier, "tokenizer", tokenizer)
+    monkeypatch.setattr(classifier, "model", FakeModel())
+    monkeypatch.setattr(news_classifier, "BUCKET_SIZE", 2)
+    monkeypatch.setattr(classifier, "prediction_cache", PredictionCache(100))
+    return tokenizer
+
+
+def test_length_buckets_group_similar_lengths():
+    assert news_classifier._length_buckets([5, 1, 9, 3, 7], 2) == [[1, 3], [0, 4], [2]]
+    assert news_classifier._length_buckets([], 4) == []
+
+
+def test_predict_pads_per_bucket_and_keeps_input_order(fake_model):
+    texts = ["word " * 60, "flood", "rain in city", "cyclone " * 20, "storm surge"]
+
+    results = classifier.predict(texts)
+
+    assert [r["text"] for r in results] == texts
+    # Token counts: 62, 3, 5, 22, 4 -> buckets (3, 4), (5, 22), (62), each padded to a multiple of 16.
+    assert fake_model.padded_shapes == [(2, 16), (2, 32), (1, 64)]
+    confidences = [r["confidence"] for r in results]
+    assert confidences[1] == pytest.approx(1 - 0.03)
+    assert confidences[0] == pytest.approx(0.62)
+    assert [r["prediction"] for r in results] == ["REAL", "FAKE", "FAKE", "FAKE", "FAKE"]
+
+
+def test_fixed_length_models_are_padded_to_their_input_size(fake_model, monkeypatch):
+    monkeypatch.setattr(classifier, "model", FakeModel(seq_len=128))
+
+    classifier.predict(["flood", "heavy rain"])
+
+    assert fake_model.padded_shapes == [(2, 128)]
+
+
+def test_predictions_are_cached_by_cleaned_text(fake_model, monkeypatch, tmp_path):
+    path = str(tmp_path / "predictions.sqlite")
+    monkeypatch.setattr(classifier, "prediction_cache", PredictionCache(100, path))
+
+    first = classifier.predict(["Flood in <b>Chennai</b>", "heavy rain"])
+    # Same cleaned text (case, markup) and a repeat within the batch: no model call.
+    again = classifier.predict(["flood in chennai", "FLOOD IN CHENNAI"])
+    assert len(fake_model.padded_shapes) == 1
+    assert [r["confidence"] for r in again] == [first[0]["confidence"]] * 2
+    assert [r["text"] for r in again] == ["flood in chennai", "FLOOD IN CHENNAI"]
+    assert classifier.cache_stats()["hit_rate"] == pytest.approx(1 / 3)
+
+    # A fresh process (empty LRU) finds it on disk.
+    monkeypatch.setattr(classifier, "prediction_cache", PredictionCache(100, path))
+    classifier.predict(["heavy rain"])
+    assert len(fake_model.padded_shapes) == 1
+    assert classifier.cache_stats()["overall_hit_rate"] == 1.0
+
+    # A new model version misses.
+    monkeypatch.setattr(classifier, "_model_version", "v2")
+    classifier.predict(["heavy rain"])
+    assert len(fake_model.padded_shapes) == 2
+
+
+def _legacy_labels(predictions):
+    results = []
+    for pred in predictions:
+        if isinstance(pred, (list, np.ndarray)):
+            if len(pred) == 1:
+                prob_real = float(pred[0])
+                prob_fake = 1.0 - prob_real
+            elif len(pred) == 2:
+                prob_fake = float(pred[0])
+                prob_real = float(pred[1])
+            else:
+                prob_real = prob_fake = 0.5
+        else:
+            prob_real = float(pred)
+            prob_fake = 1.0 - prob_real
+        total = prob_fake + prob_real
+        if total > 0:
+            prob_fake /= total
+            prob_real /= total
+        if prob_fake > prob_real:
+            results.append(("FAKE", prob_fake))
+        else:
+            results.append(("REAL", prob_real))
+    return results
+
+
+@pytest.mark.parametrize("outputs", [
+    np.array([[0.9], [0.1], [0.5], [0.0]], dtype=np.float32),
+    np.array([[0.7, 0.3], [0.2, 0.8], [0.5, 0.5], [0.0, 0.0], [3.0, 1.0]], dtype=np.float32),
+    np.array([[0.2, 0.3, 0.5]]),
+    np.array([0.25, 0.75]),
+])
+def test_vectorized_labels_match_legacy_loop(outputs):
+    assert news_classifier._labels_from_outputs(outputs) == _legacy_labels(list(outputs))
+
+
+def test_batched_cleaning_matches_per_text_cleaning():
+    texts = [
+        "Flood ALERT: see https://imd.gov.in/x?y=1 now!!",
+        "<b>Heavy</b> rain\nin <a\nhref='x'>Chennai</a>",
+        "",
+        None,
+        "multi\n\nline\n",
+        "İstanbul quake — 5.1 magnitude; www.example.com <i>update</i>",
+        "\n",
+        "tabs\tand   spaces",
+    ]
+    expected = [classifier._clean_text(t) for t in texts]
+    assert classifier._clean_texts(texts) == expected
+    assert expected[0] == "flood alert: see now!!"
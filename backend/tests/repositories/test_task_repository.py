@@ -11,6 +11,7 @@ from app.models.user_family_models import Role, User, UserProfile
 from app.models.questionnaires_and_logs import DisasterLog
 from app.repositories.task_repository import TaskRepository
 from app.schemas.tasks import TaskCreateRequest
+from app.services.chat_auth_cache import CHAT_AUTH_CACHE
 
 
 class AsyncSessionAdapter:
@@ -195,6 +196,30 @@ async def test_assign_team_updates_statuses(db_session):
         await repo.assign_team(task.task_id, team.team_id, commander.user_id)
 
 
+@pytest.mark.asyncio
+async def test_assign_team_invalidates_cached_chat_teams(db_session):
+    disaster, commander = _seed_disaster(db_session)
+    team = _seed_team(db_session, commander)
+    task = DisasterTask(
+        disaster_id=disaster.disaster_id,
+        created_by_commander_id=commander.user_id,
+        task_type="search_rescue",
+        priority="high",
+        status="pending",
+        location=_make_point(),
+    )
+    db_session.add(task)
+    db_session.commit()
+    db = AsyncSessionAdapter(db_session)
+    assert await CHAT_AUTH_CACHE.disaster_teams(db, disaster.disaster_id) == frozenset()
+
+    await TaskRepository(db).assign_team(task.task_id, team.team_id, commander.user_id)
+    assert await CHAT_AUTH_CACHE.disaster_teams(db, disaster.disaster_id) == {team.team_id}
+
+    await TaskRepository(db).delete_task(task.task_id)
+    assert await CHAT_AUTH_CACHE.disaster_teams(db, disaster.disaster_id) == frozenset()
+
+
 @pytest.mark.asyncio
 async def test_update_assignment_status_manages_team_and_task_completion(db_session):
     disaster, commander = _seed_disaster(db_session)
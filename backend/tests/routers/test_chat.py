@@ -8,7 +8,7 @@ from types import SimpleNamespace
 import json
 from fastapi.testclient import TestClient
 import httpx
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from app.main import app
 from app.routers import chat
@@ -41,6 +41,9 @@ class DummyWebSocket:
             raise RuntimeError("boom")
         self.sent_messages.append(text)
 
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data))
+
 @pytest.mark.asyncio
 async def test_connection_manager_room_keys():
     manager = ConnectionManager()
@@ -80,20 +83,22 @@ async def test_connection_manager_room_keys():
     # Broadcast
     msg = {"text": "hello"}
     await manager.broadcast(msg, room_key)
+    await manager.drain()
     assert len(ws1.sent_messages) == 1
     assert len(ws2.sent_messages) == 1
     assert "hello" in ws1.sent_messages[0]
-    # broadcast should not explode if a socket send fails
+    # A socket whose send fails is evicted without disturbing the others
+    assert len(manager.active_connections[str(disaster_id)]) == 2
     await manager.broadcast(msg, disaster_id)
-    
-    # Disconnect
+    await manager.drain()
+    assert len(ws1.sent_messages) == 2
+
+    # Disconnect (ws3 is already gone; disconnecting it again is a no-op)
+    manager.disconnect(ws3, disaster_id)
     manager.disconnect(ws1, disaster_id)
-    assert len(manager.active_connections[str(disaster_id)]) == 2
-    
-    manager.disconnect(ws2, disaster_id)
     assert len(manager.active_connections[str(disaster_id)]) == 1
 
-    manager.disconnect(ws3, disaster_id)
+    manager.disconnect(ws2, disaster_id)
     assert str(disaster_id) not in manager.active_connections
 
 @pytest.mark.asyncio
@@ -433,6 +438,112 @@ async def test_history_invalid_team(async_db_session, async_create_disaster):
         )
         assert resp.status_code == 403
 
+
+@pytest.mark.asyncio
+async def test_history_pages_backwards_with_cursor(async_db_session, async_create_user, async_create_disaster):
+    commander = await async_create_user(email="pager@example.com", role_name="commander")
+    disaster = await async_create_disaster()
+    base = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    # Two messages share a timestamp; message_id breaks the tie.
+    offsets = [0, 1, 1, 2, 3]
+    async_db_session.add_all([
+        DisasterChatMessage(
+            disaster_id=disaster.disaster_id,
+            sender_user_id=commander.user_id,
+            message_text=f"order {n}",
+            is_global=True,
+            created_at=base + timedelta(seconds=offset),
+        )
+        for n, offset in enumerate(offsets)
+    ])
+    async_db_session.add(DisasterChatMessage(
+        disaster_id=disaster.disaster_id, sender_user_id=commander.user_id, message_text="team only", created_at=base,
+    ))
+    await async_db_session.commit()
+
+    test_app = FastAPI()
+    test_app.include_router(chat.router)
+
+    async def override_db():
+        yield async_db_session
+
+    test_app.dependency_overrides[get_db] = override_db
+
+    pages, cursor = [], None
+    async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://x") as ac:
+        while True:
+            params = {"scope": "global", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            resp = await ac.get(f"/chat/{disaster.disaster_id}/history", params=params)
+            assert resp.status_code == 200
+            pages.append(resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        resp = await ac.get(f"/chat/{disaster.disaster_id}/history", params={"cursor": "not-a-cursor"})
+        assert resp.status_code == 400
+
+    messages = [m for page in pages for m in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert len({m["message_id"] for m in messages}) == 5
+    assert messages[0]["message_text"] == "order 4"
+    assert messages[-1]["message_text"] == "order 0"
+    assert {(m["sender_name"], m["sender_role"]) for m in messages} == {("Test User", "commander")}
+
+
+@pytest.mark.no_db
+def test_history_index_matches_the_keyset_order():
+    index = {i.name: i for i in DisasterChatMessage.__table__.indexes}["ix_disaster_chat_messages_history"]
+    assert [c.name for c in index.columns] == ["disaster_id", "is_global", "created_at", "message_id"]
+
+
+@pytest.mark.no_db
+@pytest.mark.asyncio
+async def test_message_is_refused_when_the_save_queue_is_full(monkeypatch):
+    from app.services.chat_writer import ChatMessageWriter, new_message_row
+
+    writer = ChatMessageWriter(max_batch=1, flush_interval=60, max_pending=1)
+    writer._ensure_started()
+    writer._rows.append({"message_id": uuid4()})  # a row stuck behind an outage
+    broadcasts = []
+
+    async def fake_broadcast(message, room_key):
+        broadcasts.append(message)
+
+    monkeypatch.setattr(chat, "CHAT_WRITER", writer)
+    monkeypatch.setattr(chat.manager, "broadcast", fake_broadcast)
+    ws = DummyWebSocket()
+    row = new_message_row(uuid4(), uuid4(), "hello", is_global=False)
+
+    await chat._send_message(ws, row, {"sender_name": "A", "sender_role": "responder"}, "teams:x")
+
+    assert broadcasts == []
+    assert json.loads(ws.sent_messages[0])["error"] == "message_not_sent"
+    writer._task.cancel()
+
+
+@pytest.mark.no_db
+@pytest.mark.asyncio
+async def test_message_too_large_for_pubsub_is_refused(monkeypatch):
+    from app.services.chat_writer import ChatMessageWriter, new_message_row
+    from app.services.pubsub import PostgresPubSub
+
+    writer = ChatMessageWriter(flush_interval=60)
+    manager = ConnectionManager(backend=PostgresPubSub("postgresql://unused"))
+    monkeypatch.setattr(chat, "CHAT_WRITER", writer)
+    monkeypatch.setattr(chat, "manager", manager)
+    ws = DummyWebSocket()
+    row = new_message_row(uuid4(), uuid4(), "situation report " * 1000, is_global=True)
+
+    await chat._send_message(ws, row, {"sender_name": "A", "sender_role": "commander"}, "global:x")
+
+    reply = json.loads(ws.sent_messages[0])
+    assert reply["error"] == "message_not_sent" and reply["message_id"] == str(row["message_id"])
+    assert writer.pending == 0  # neither saved nor delivered anywhere
+
+
 # -------------------------------------------------------------------
 # 5. TEST get_disaster_chat_summary() — SANITIZE FAKE TEAM IDs
 # -------------------------------------------------------------------
@@ -1,8 +1,11 @@
+import json
 import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
+from starlette.middleware.sessions import SessionMiddleware
 from types import SimpleNamespace
 
+from app.dependencies import get_current_user
 from app.routers import disaster_news
 
 
@@ -17,7 +20,7 @@ async def test_analyze_disaster_news_success(monkeypatch):
     async def fake_prioritized(db, state_id, city_name):
         return [{"name": "Local", "rss_url": "http://example.com/rss", "city": "City", "state": "State"}]
 
-    async def fake_fetch(newspapers, keyword=None):
+    async def fake_fetch(newspapers, keyword=None, force_refresh=False):
         return [
             {
                 "title": "Flood alert",
@@ -32,7 +35,7 @@ async def test_analyze_disaster_news_success(monkeypatch):
 
     app.dependency_overrides[disaster_news.get_db] = _db
     monkeypatch.setattr(disaster_news, "build_prioritized_newspaper_dicts", fake_prioritized)
-    monkeypatch.setattr(disaster_news, "fetch_all_news", fake_fetch)
+    monkeypatch.setattr(disaster_news, "analyze_news", fake_fetch)
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as client:
@@ -74,12 +77,12 @@ async def test_analyze_disaster_news_scraper_failure(monkeypatch):
     async def fake_prioritized(db, state_id, city_name):
         return [{"name": "Local", "rss_url": "http://example.com/rss"}]
 
-    async def fake_fetch(newspapers, keyword=None):
+    async def fake_fetch(newspapers, keyword=None, force_refresh=False):
         raise RuntimeError("boom")
 
     app.dependency_overrides[disaster_news.get_db] = _db
     monkeypatch.setattr(disaster_news, "build_prioritized_newspaper_dicts", fake_prioritized)
-    monkeypatch.setattr(disaster_news, "fetch_all_news", fake_fetch)
+    monkeypatch.setattr(disaster_news, "analyze_news", fake_fetch)
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as client:
@@ -98,12 +101,12 @@ async def test_analyze_disaster_news_handles_empty_articles(monkeypatch):
     async def fake_prioritized(db, state_id, city_name):
         return [{"name": "Local", "rss_url": "http://example.com/rss"}]
 
-    async def fake_fetch(newspapers, keyword=None):
+    async def fake_fetch(newspapers, keyword=None, force_refresh=False):
         return []
 
     app.dependency_overrides[disaster_news.get_db] = _db
     monkeypatch.setattr(disaster_news, "build_prioritized_newspaper_dicts", fake_prioritized)
-    monkeypatch.setattr(disaster_news, "fetch_all_news", fake_fetch)
+    monkeypatch.setattr(disaster_news, "analyze_news", fake_fetch)
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as client:
@@ -123,12 +126,12 @@ async def test_analyze_disaster_news_unexpected_error(monkeypatch):
     async def fake_prioritized(db, state_id, city_name):
         return [{"name": "Local", "rss_url": "http://example.com/rss"}]
 
-    async def fake_fetch(newspapers, keyword=None):
+    async def fake_fetch(newspapers, keyword=None, force_refresh=False):
         return [{"link": "missing_title"}]  # will raise KeyError
 
     app.dependency_overrides[disaster_news.get_db] = _db
     monkeypatch.setattr(disaster_news, "build_prioritized_newspaper_dicts", fake_prioritized)
-    monkeypatch.setattr(disaster_news, "fetch_all_news", fake_fetch)
+    monkeypatch.setattr(disaster_news, "analyze_news", fake_fetch)
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as client:
@@ -172,3 +175,84 @@ async def test_disaster_news_lookup_endpoints():
     )
     history = await disaster_news.get_analysis_history(db=StubDB([log]), current_user=commander)
     assert history[0].city == "City"
+
+
+@pytest.mark.asyncio
+async def test_analyze_disaster_news_stream_emits_sources_then_summary(monkeypatch):
+    app = FastAPI()
+    app.include_router(disaster_news.router)
+
+    async def _db():
+        yield object()
+
+    async def fake_prioritized(db, state_id, city_name):
+        return [{"name": "Local", "rss_url": "http://example.com/rss", "city": "City", "state": "State"}]
+
+    async def fake_stream(newspapers, keyword=None, force_refresh=False):
+        yield "IMD RSS Feed", [{"title": "CITY", "newspaper_name": "IMD RSS Feed", "published": ""}]
+        yield "Local", [
+            {"title": "Flood alert", "link": "http://example.com/1", "newspaper_name": "Local", "priority_score": 10},
+            {"title": "Rain", "link": "http://example.com/2", "newspaper_name": "Local", "priority_score": 5},
+        ]
+
+    app.dependency_overrides[disaster_news.get_db] = _db
+    monkeypatch.setattr(disaster_news, "build_prioritized_newspaper_dicts", fake_prioritized)
+    monkeypatch.setattr(disaster_news, "stream_news", fake_stream)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        resp = await client.post("/api/disaster-news/analyze/stream", json={"state_id": 1, "city": "City"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        frames = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert [(f["type"], f.get("source")) for f in frames] == [
+        ("source", "IMD RSS Feed"), ("source", "Local"), ("summary", None)
+    ]
+    assert frames[0]["articles"][0]["published"] == "Unknown"
+    assert [a["link"] for a in frames[1]["articles"]] == ["http://example.com/1", "http://example.com/2"]
+    assert frames[2]["total_articles"] == 3
+    assert frames[2]["unavailable_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_classifier_stats_when_disabled():
+    app = FastAPI()
+    app.include_router(disaster_news.router)
+
+    async def _current_user():
+        return SimpleNamespace(role=SimpleNamespace(name="commander"))
+
+    app.dependency_overrides[get_current_user] = _current_user
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        resp = await client.get("/api/disaster-news/classifier/stats")
+        assert resp.status_code == 200
+        assert resp.json()["service"]["running"] is False
+        assert resp.json()["cache"] is None
+
+
+@pytest.mark.asyncio
+async def test_classifier_stats_requires_a_commander():
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, secret_key="test")
+    app.include_router(disaster_news.router)
+
+    async def _db():
+        yield object()
+
+    app.dependency_overrides[disaster_news.get_db] = _db
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        resp = await client.get("/api/disaster-news/classifier/stats")
+    assert resp.status_code == 401
+
+    async def _responder():
+        return SimpleNamespace(role=SimpleNamespace(name="responder"))
+
+    app.dependency_overrides[get_current_user] = _responder
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        resp = await client.get("/api/disaster-news/classifier/stats")
+    assert resp.status_code == 403
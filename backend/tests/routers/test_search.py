@@ -0,0 +1,151 @@
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.dependencies import get_current_user
+from app.models.news_models import NewsArticle
+from app.models.questionnaires_and_logs import DisasterChatMessage, DisasterLog
+from app.repositories.search_repository import InvalidCursorError, decode_cursor, encode_cursor
+from app.routers import search
+
+
+@pytest_asyncio.fixture
+async def client(async_db_session, async_create_user):
+    app = FastAPI()
+    app.include_router(search.router)
+
+    async def _db():
+        yield async_db_session
+
+    commander = await async_create_user(email="commander@example.com", role_name="commander")
+    current_user = SimpleNamespace(user_id=commander.user_id, role=SimpleNamespace(name="commander"))
+
+    async def _current_user():
+        return current_user
+
+    app.dependency_overrides[search.get_db] = _db
+    app.dependency_overrides[get_current_user] = _current_user
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        ac.commander = commander
+        yield ac
+
+
+@pytest.mark.no_db
+def test_cursor_round_trips_and_rejects_garbage():
+    created = datetime(2024, 7, 1, 9, 30, tzinfo=timezone.utc)
+    row_id = uuid4()
+    cursor = encode_cursor([0.25, created, row_id])
+    assert decode_cursor(cursor, "relevance", type(row_id)) == [0.25, created, row_id]
+    assert decode_cursor(encode_cursor([created, 7]), "recent", int) == [created, 7]
+    for bad in ("not-base64!", encode_cursor([created, 7])):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(bad, "relevance", int)
+
+
+@pytest.mark.no_db
+def test_migration_creates_every_search_index():
+    """schemas/migrations/search_indexes.sql must keep up with the models."""
+    migration = (Path(__file__).parents[2] / "schemas" / "migrations" / "search_indexes.sql").read_text()
+    declared = {
+        index.name
+        for model in (DisasterLog, DisasterChatMessage, NewsArticle)
+        for index in model.__table__.indexes
+        if index.name.endswith(("_search", "_trgm"))
+        or index.name in (
+            "ix_disaster_logs_disaster_created",
+            "ix_disaster_chat_messages_history",
+            "ix_news_articles_city_state_lower",
+        )
+    }
+    created = set(re.findall(r"CREATE INDEX CONCURRENTLY IF NOT EXISTS (\w+)", migration))
+    assert declared and declared == created
+    assert "CREATE EXTENSION IF NOT EXISTS pg_trgm" in migration
+
+
+@pytest.mark.no_db
+def test_city_state_index_matches_the_case_insensitive_filter():
+    from sqlalchemy import func
+    from sqlalchemy.dialects import postgresql
+
+    index = {i.name: i for i in NewsArticle.__table__.indexes}["ix_news_articles_city_state_lower"]
+    compiled = [str(e.compile(dialect=postgresql.dialect())) for e in index.expressions]
+    filters = [func.lower(NewsArticle.city), func.lower(NewsArticle.state)]
+    assert compiled == [str(f.compile(dialect=postgresql.dialect())) for f in filters]
+
+
+@pytest.mark.asyncio
+async def test_search_logs_ranks_filters_and_pages(client, async_db_session, async_create_disaster):
+    disaster = await async_create_disaster()
+    other = await async_create_disaster()
+    now = datetime.now(timezone.utc)
+    async_db_session.add_all([
+        DisasterLog(disaster_id=disaster.disaster_id, source_type="user_input", title="Flood at river bank",
+                    text_body="Flood water rising near the river bank, flood barriers needed", created_at=now),
+        DisasterLog(disaster_id=disaster.disaster_id, source_type="system", title="Supplies",
+                    text_body="Boats sent to the flood zone", created_at=now - timedelta(hours=1)),
+        DisasterLog(disaster_id=disaster.disaster_id, source_type="system", title="Power cut",
+                    text_body="Substation offline", created_at=now - timedelta(hours=2)),
+        DisasterLog(disaster_id=other.disaster_id, source_type="user_input", title="Flood elsewhere",
+                    text_body="Flood in another district", created_at=now),
+    ])
+    await async_db_session.commit()
+
+    resp = await client.get("/search/logs", params={"q": "flood", "disaster_id": str(disaster.disaster_id), "limit": 1})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [hit["title"] for hit in body["results"]] == ["Flood at river bank"]
+    assert body["results"][0]["kind"] == "log"
+    assert "<b>" in body["results"][0]["snippet"]
+
+    resp = await client.get("/search/logs", params={
+        "q": "flood", "disaster_id": str(disaster.disaster_id), "limit": 1, "cursor": body["next_cursor"],
+    })
+    body = resp.json()
+    assert [hit["title"] for hit in body["results"]] == ["Supplies"]
+    assert body["next_cursor"] is None
+
+    resp = await client.get("/search/logs", params={"q": "flood", "source": "system", "sort": "recent"})
+    assert [hit["title"] for hit in resp.json()["results"]] == ["Supplies"]
+
+    resp = await client.get("/search/logs", params={"q": "flood", "since": (now - timedelta(minutes=30)).isoformat()})
+    assert sorted(hit["title"] for hit in resp.json()["results"]) == ["Flood at river bank", "Flood elsewhere"]
+
+    resp = await client.get("/search/logs", params={"q": "flood", "cursor": "garbage"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_news_and_chat_match_misspellings(client, async_db_session, async_create_disaster):
+    disaster = await async_create_disaster()
+    async_db_session.add_all([
+        NewsArticle(canonical_url="https://a.example/cyclone", url="https://a.example/cyclone",
+                    content_hash="a" * 64, newspaper_name="The Hindu", sources=["The Hindu", "PTI"],
+                    title="Cyclone Michaung nears Chennai coast", description="Heavy rain expected"),
+        NewsArticle(canonical_url="https://b.example/heat", url="https://b.example/heat",
+                    content_hash="b" * 64, newspaper_name="Deccan Herald", sources=["Deccan Herald"],
+                    title="Heatwave grips Delhi", description="Temperatures cross 45 degrees"),
+        DisasterChatMessage(disaster_id=disaster.disaster_id, sender_user_id=client.commander.user_id,
+                            message_text="Evacuate Velachery before the cyclone makes landfall"),
+    ])
+    await async_db_session.commit()
+
+    # Misspelt place name: no lexeme match, found through the trigram index.
+    resp = await client.get("/search/news", params={"q": "Michaug"})
+    assert [hit["url"] for hit in resp.json()["results"]] == ["https://a.example/cyclone"]
+
+    resp = await client.get("/search/news", params={"q": "cyclone", "source": "PTI"})
+    assert [hit["sources"] for hit in resp.json()["results"]] == [["The Hindu", "PTI"]]
+
+    resp = await client.get("/search/chat", params={"q": "cyclone landfall", "disaster_id": str(disaster.disaster_id)})
+    results = resp.json()["results"]
+    assert [hit["kind"] for hit in results] == ["chat"]
+    assert results[0]["sender_user_id"] == str(client.commander.user_id)
@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services import chat_auth_cache
+from app.services.chat_auth_cache import ChatAuthCache, ChatUser
+
+pytestmark = pytest.mark.no_db
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Replace the loaders with counters returning the current `state`."""
+    calls = SimpleNamespace(users=0, teams=0, gate=None)
+    state = SimpleNamespace(team_id=uuid4(), teams=frozenset())
+
+    async def load_chat_user(_db, user_id):
+        calls.users += 1
+        return ChatUser(user_id=user_id, role_name="responder", responder_type="medic", team_id=state.team_id)
+
+    async def load_disaster_teams(_db, _disaster_id):
+        calls.teams += 1
+        teams = state.teams
+        if calls.gate is not None:
+            await calls.gate.wait()
+        return teams
+
+    monkeypatch.setattr(chat_auth_cache, "load_chat_user", load_chat_user)
+    monkeypatch.setattr(chat_auth_cache, "load_disaster_teams", load_disaster_teams)
+    return calls, state
+
+
+@pytest.mark.asyncio
+async def test_reconnects_are_served_from_the_cache(loads):
+    calls, state = loads
+    cache = ChatAuthCache(ttl=60)
+    user_id, disaster_id = uuid4(), uuid4()
+    state.teams = frozenset({state.team_id})
+
+    for _ in range(20):
+        user = await cache.user(None, user_id)
+        assert user.team_id in await cache.disaster_teams(None, disaster_id)
+
+    assert (calls.users, calls.teams) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_invalidation_reloads_membership(loads):
+    calls, state = loads
+    cache = ChatAuthCache(ttl=60)
+    user_id, disaster_id = uuid4(), uuid4()
+    assert await cache.disaster_teams(None, disaster_id) == frozenset()
+
+    state.teams = frozenset({state.team_id})
+    assert await cache.disaster_teams(None, disaster_id) == frozenset()
+    cache.invalidate_disaster(disaster_id)
+    assert await cache.disaster_teams(None, disaster_id) == {state.team_id}
+
+    first_team = (await cache.user(None, user_id)).team_id
+    state.team_id = uuid4()
+    cache.invalidate_user(user_id)
+    assert (await cache.user(None, user_id)).team_id != first_team
+    assert (calls.users, calls.teams) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_load_overlapping_an_invalidation_is_not_stored(loads):
+    calls, state = loads
+    cache = ChatAuthCache(ttl=60)
+    disaster_id = uuid4()
+    calls.gate = asyncio.Event()
+
+    stale = asyncio.ensure_future(cache.disaster_teams(None, disaster_id))
+    await asyncio.sleep(0)
+    state.teams = frozenset({state.team_id})
+    cache.invalidate_disaster(disaster_id)
+    calls.gate.set()
+
+    assert await stale == frozenset()
+    assert await cache.disaster_teams(None, disaster_id) == {state.team_id}
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_the_ttl(loads):
+    calls, _ = loads
+    cache = ChatAuthCache(ttl=0.01)
+    user_id = uuid4()
+    await cache.user(None, user_id)
+    await asyncio.sleep(0.02)
+    await cache.user(None, user_id)
+    assert calls.users == 2
+
+
+def test_chat_user_sender_fields():
+    assert ChatUser(user_id=uuid4(), email="a@example.com").sender_name == "a@example.com"
+    assert ChatUser(user_id=uuid4(), full_name="Asha").sender_name == "Asha"
+    assert ChatUser(user_id=uuid4()).sender_role == "civilian"
+    assert not ChatUser(user_id=uuid4(), role_name="commander").is_responder
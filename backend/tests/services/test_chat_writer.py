@@ -0,0 +1,138 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.services.chat_writer import ChatMessageWriter, new_message_row
+
+pytestmark = pytest.mark.no_db
+
+
+class RecordingSessions:
+    """Session factory that records each multi-row INSERT as a list of rows."""
+
+    def __init__(self, bad_text=None, outages=0):
+        self.batches = []
+        self.bad_text = bad_text
+        self.outages = outages
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, _stmt, rows):
+        if self.outages:
+            self.outages -= 1
+            raise OperationalError("INSERT", {}, ConnectionResetError("connection reset by peer"))
+        if any(row["message_text"] == self.bad_text for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("foreign key violation"))
+        self._pending = list(rows)
+
+    async def commit(self):
+        self.batches.append([row["message_text"] for row in self._pending])
+
+
+def _row(text):
+    return new_message_row(uuid4(), uuid4(), text, is_global=False)
+
+
+def test_new_message_row_assigns_id_and_timestamp():
+    first, second = _row("a"), _row("b")
+    assert first["message_id"] != second["message_id"]
+    assert first["created_at"].tzinfo is not None
+    assert first["team_id"] is None and first["is_global"] is False
+
+
+@pytest.mark.asyncio
+async def test_messages_are_written_in_batches_by_size_and_interval():
+    sessions = RecordingSessions()
+    writer = ChatMessageWriter(sessions, max_batch=3, flush_interval=0.05)
+
+    for text in ("1", "2", "3"):
+        writer.submit(_row(text))
+    await asyncio.sleep(0.01)
+    # A full batch is written without waiting for the interval.
+    assert sessions.batches == [["1", "2", "3"]]
+
+    writer.submit(_row("4"))
+    await asyncio.sleep(0.01)
+    assert writer.pending == 1
+    await asyncio.sleep(0.1)
+    assert sessions.batches == [["1", "2", "3"], ["4"]]
+    assert writer.stats() == {"pending": 0, "written": 4, "failed": 0, "rejected": 0, "batches": 2}
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_queued_messages():
+    sessions = RecordingSessions()
+    writer = ChatMessageWriter(sessions, max_batch=100, flush_interval=60)
+    writer.submit(_row("late"))
+    writer.submit(_row("later"))
+
+    await writer.close()
+
+    assert sessions.batches == [["late", "later"]]
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_row_by_row():
+    sessions = RecordingSessions(bad_text="orphan")
+    writer = ChatMessageWriter(sessions, max_batch=100, flush_interval=60)
+    for text in ("ok", "orphan", "fine"):
+        writer.submit(_row(text))
+
+    assert await writer.flush() == 2
+    assert sessions.batches == [["ok"], ["fine"]]
+    assert writer.stats()["failed"] == 1
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_rows_survive_a_connection_error_and_are_written_on_the_next_flush():
+    sessions = RecordingSessions(outages=1)
+    writer = ChatMessageWriter(sessions, max_batch=100, flush_interval=60)
+    for text in ("a", "b"):
+        writer.submit(_row(text))
+
+    assert await writer.flush() == 0
+    assert writer.pending == 2 and writer.stats()["failed"] == 0
+    writer.submit(_row("c"))
+
+    assert await writer.flush() == 3
+    assert sessions.batches == [["a", "b", "c"]]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_background_task_retries_after_backoff():
+    sessions = RecordingSessions(outages=2)
+    writer = ChatMessageWriter(sessions, max_batch=100, flush_interval=0.01, retry_delay=0.02)
+    writer.submit(_row("during outage"))
+
+    await asyncio.sleep(0.2)
+
+    assert sessions.batches == [["during outage"]]
+    assert writer.stats()["pending"] == 0
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_submit_refuses_rows_beyond_max_pending():
+    sessions = RecordingSessions(outages=1)
+    writer = ChatMessageWriter(sessions, max_batch=2, flush_interval=60, max_pending=2)
+    assert writer.submit(_row("1")) and writer.submit(_row("2"))
+    await writer.flush()
+
+    assert writer.submit(_row("3")) is False
+    assert writer.stats()["rejected"] == 1
+    assert await writer.flush() == 2
+    assert writer.submit(_row("3"))
+    await writer.close()
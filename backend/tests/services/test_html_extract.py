@@ -0,0 +1,86 @@
+import pytest
+
+from app.services import html_extract, news_scraper
+
+pytestmark = pytest.mark.no_db
+
+PAGE = """<!DOCTYPE html>
+<html><head>
+<title>Site title</title>
+<meta property="og:title" content="ignored">
+<meta name="pubdate" content="">
+<meta itemprop="datePublished" content="2024-07-01T10:00:00+05:30">
+<script type="application/ld+json">{"datePublished": "2024-07-01T09:00:00Z"}</script>
+<script>var x = 1;</script>
+</head><body>
+<header><a href="/home" class="logo">Home</a></header>
+<nav><ul><li><a href="/cities/chennai">Chennai <!-- c --> <b>News</b></a></li></ul></nav>
+<div class="section-list"><a href="/india" id="SectionLink" class="top  Menu">India</a><a name="anchor-only">x</a></div>
+<h1> Heavy <em>rain</em> lashes city </h1>
+<p>Outside the article.</p>
+<article>
+  <time datetime="2024-07-01T08:00:00Z">1 July</time>
+  <p>First paragraph <script>ignored()</script>with <a href="https://other.example/x">a link</a>.</p>
+  <p>   </p>
+  <p>Second paragraph.</p>
+</article>
+<footer><a href="/about">About</a></footer>
+</body></html>"""
+
+
+def test_lxml_and_bs4_backends_agree():
+    assert html_extract.lxml is not None
+    fast = html_extract._extract_lxml(PAGE)
+    slow = html_extract._extract_bs4(PAGE)
+
+    assert fast == slow
+    assert fast.title == "Heavyrainlashes city"
+    assert fast.paragraphs == ["First paragraphwitha link.", "", "Second paragraph."]
+    assert [(a.href, a.in_chrome) for a in fast.anchors][:3] == [
+        ("/home", True),
+        ("/cities/chennai", True),
+        ("/india", False),
+    ]
+    assert fast.anchors[1].text == "ChennaiNews"
+    assert fast.times == ["2024-07-01T08:00:00Z"]
+    assert html_extract.extract_links(PAGE) == [a.href for a in fast.anchors]
+
+
+def test_candidate_sections_and_publish_date_from_extract():
+    page = html_extract.extract_page(PAGE)
+    sections = news_scraper.find_candidate_sections("https://news.example", page, {"city": "Chennai", "state": ""})
+
+    assert sections == [
+        "https://news.example/home",
+        "https://news.example/cities/chennai",
+        "https://news.example/about",
+        "https://news.example/india",
+    ]
+    # The empty pubdate meta is skipped; itemprop wins over <time> and ld+json.
+    assert news_scraper.extract_publish_datetime(page).isoformat() == "2024-07-01T10:00:00+05:30"
+
+
+def test_candidate_sections_without_a_location_skip_deep_links():
+    page = html_extract.extract_page(
+        "<html><body><nav><a href='/states/tamil-nadu/chennai'>Chennai</a></nav>"
+        "<a href='/india'>India</a>"
+        "<a href='/news/2024/07/01/rain-lashes-chennai'>Rain lashes Chennai</a>"
+        "<a href='/news/2024/07/01/markets'>Markets</a></body></html>"
+    )
+
+    # Crawling for the warm store: nav and top-level links only.
+    assert news_scraper.find_candidate_sections("https://news.example", page, {"city": "", "state": ""}) == [
+        "https://news.example/states/tamil-nadu/chennai",
+        "https://news.example/india",
+    ]
+    # A city query also follows deeper links that mention it.
+    assert news_scraper.find_candidate_sections("https://news.example", page, {"city": "Chennai", "state": ""}) == [
+        "https://news.example/states/tamil-nadu/chennai",
+        "https://news.example/india",
+        "https://news.example/news/2024/07/01/rain-lashes-chennai",
+    ]
+
+
+def test_empty_document():
+    assert html_extract.extract_page("") == html_extract.PageExtract()
+    assert html_extract.extract_links("   ") == []
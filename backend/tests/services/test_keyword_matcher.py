@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from app.services import news_scraper
+from app.services.keyword_matcher import KeywordMatcher
+
+pytestmark = pytest.mark.no_db
+
+
+def test_scan_matches_naive_substring_checks():
+    matcher = news_scraper.KEYWORD_MATCHER
+    patterns = sorted({p for group in matcher.groups.values() for p in group})
+    fragments = patterns + ["ing", " ", "-", "x", "lo", "heat", "wave", "a"]
+    rng = random.Random(1234)
+    for _ in range(300):
+        title = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 6)))
+        body = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 20)))
+        text = f"{title} {body}"
+        hits = matcher.scan(text, title_end=len(title))
+
+        assert set(hits.counts) == {p for p in patterns if p in text}
+        assert set(hits.title) == {p for p in patterns if p in title}
+        for group, members in matcher.groups.items():
+            assert hits.matched(group) == [p for p in members if p in text]
+        for pattern, count in hits.counts.items():
+            occurrences = sum(1 for i in range(len(text)) if text.startswith(pattern, i))
+            assert count == occurrences
+
+
+def test_overlapping_and_nested_patterns():
+    matcher = KeywordMatcher({"a": ["flood", "flooding", "flash flood"], "b": ["heat wave", "wave"]})
+    hits = matcher.scan("flash flooding and a heat wave", title_end=11)
+
+    assert hits.by_group() == {
+        "a": {"flood": 1, "flooding": 1, "flash flood": 1},
+        "b": {"heat wave": 1, "wave": 1},
+    }
+    assert hits.title_matched("a") == ["flood", "flash flood"]
+    assert hits.first("b") == "heat wave"
+
+
+def test_detect_keyword_prefers_required_keywords():
+    assert news_scraper.detect_keyword_from_text("Storm ALERT issued") == "storm"
+    assert news_scraper.detect_keyword_from_text("Hailstorm warning") == "storm"
+    assert news_scraper.detect_keyword_from_text("Tremor felt") == "tremor"
+    assert news_scraper.detect_keyword_from_text("") is None
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.models.news_models import NewsArticle
+from app.services import news_archive
+from app.services.news_scraper import IST
+
+
+def _article(link, title="Flood in Chennai", source="The Hindu", **extra):
+    return dict(
+        {
+            "title": title,
+            "description": "Heavy rain flooded low-lying areas.",
+            "link": link,
+            "published": "2024-07-01 09:30 IST",
+            "newspaper_name": source,
+            "disaster_keyword": "flood",
+            "severity": "high",
+            "priority_score": 3,
+        },
+        **extra,
+    )
+
+
+@pytest.mark.no_db
+def test_canonical_url_ignores_tracking_and_presentation_details():
+    canonical = news_archive.canonical_url("https://example.com/news/flood?id=7")
+    for variant in (
+        "http://www.Example.com/news/flood/?utm_source=x&id=7#top",
+        "https://example.com:443/news/flood?fbclid=abc&id=7",
+    ):
+        assert news_archive.canonical_url(variant) == canonical
+    assert news_archive.canonical_url("https://example.com/news/flood?b=2&a=1") == (
+        "https://example.com/news/flood?a=1&b=2"
+    )
+    assert news_archive.canonical_url("https://example.com/news/flood?id=8") != canonical
+
+
+@pytest.mark.no_db
+def test_content_hash_normalises_case_punctuation_and_spacing():
+    assert news_archive.content_hash("Flood in Chennai!", "Heavy  rain.") == (
+        news_archive.content_hash("flood in chennai", "heavy rain")
+    )
+    assert news_archive.content_hash("Flood in Chennai", None) != news_archive.content_hash("Flood in Mumbai", None)
+
+
+@pytest.mark.no_db
+def test_parse_published_accepts_scraper_and_rfc822_times():
+    assert news_archive.parse_published("2024-07-01 09:30 IST") == datetime(2024, 7, 1, 9, 30, tzinfo=IST)
+    assert news_archive.parse_published("Mon, 01 Jul 2024 04:00:00 GMT").isoformat() == "2024-07-01T04:00:00+00:00"
+    assert news_archive.parse_published("yesterday") is None
+    assert news_archive.parse_published(None) is None
+
+
+@pytest.mark.no_db
+def test_article_rows_skip_imd_and_merge_duplicate_urls():
+    rows = news_archive.article_rows(
+        [
+            _article("https://example.com/a"),
+            _article("http://www.example.com/a/?utm_medium=rss", source="Deccan Herald"),
+            _article("", title="No link"),
+            _article("https://mausam.imd.gov.in/", source="IMD RSS Feed"),
+        ],
+        city="Chennai",
+        state="Tamil Nadu",
+    )
+    assert len(rows) == 1
+    assert rows[0]["sources"] == ["The Hindu", "Deccan Herald"]
+    assert (rows[0]["city"], rows[0]["state"]) == ("Chennai", "Tamil Nadu")
+    assert rows[0]["published_at"] == datetime(2024, 7, 1, 9, 30, tzinfo=IST)
+
+
+@pytest.mark.no_db
+def test_collapse_syndicated_folds_copies_into_the_first_row():
+    rows = news_archive.article_rows([
+        _article("https://a.example/flood"),
+        _article("https://b.example/flood", source="Deccan Herald"),
+        _article("https://c.example/other", title="Cyclone warning"),
+    ])
+    stored = {"id": 1, "canonical_url": "https://d.example/cyclone", "sources": ["PTI"]}
+    known = {rows[2]["content_hash"]: stored}
+
+    fresh = news_archive.collapse_syndicated(rows, known)
+
+    assert [r["canonical_url"] for r in fresh] == ["https://a.example/flood"]
+    assert fresh[0]["sources"] == ["The Hindu", "Deccan Herald"]
+    assert stored["sources"] == ["PTI", "The Hindu"] and stored["dirty"]
+
+
+@pytest.mark.asyncio
+async def test_store_articles_upserts_by_url_and_dedupes_syndicated_copies(async_db_session):
+    written = await news_archive.store_articles(
+        async_db_session,
+        [_article("https://a.example/flood", priority_score=2)],
+        city="Chennai",
+    )
+    assert written == 1
+
+    written = await news_archive.store_articles(
+        async_db_session,
+        [
+            _article("http://www.a.example/flood/?utm_source=rss", priority_score=5),
+            _article("https://b.example/wire-copy", source="Deccan Herald"),
+        ],
+        city="Chennai",
+    )
+    assert written == 1
+
+    stored = (await async_db_session.execute(select(NewsArticle))).scalars().all()
+    assert len(stored) == 1
+    assert stored[0].canonical_url == "https://a.example/flood"
+    assert stored[0].sources == ["The Hindu", "Deccan Herald"]
+    assert stored[0].priority_score == 5
+    assert stored[0].city == "Chennai"
+
+
+@pytest.mark.asyncio
+async def test_store_articles_moves_a_re_seen_article_to_the_latest_location(async_db_session):
+    await news_archive.store_articles(async_db_session, [_article("https://a.example/flood")], city="Chennai", state="Tamil Nadu")
+    await news_archive.store_articles(async_db_session, [_article("https://a.example/flood")], city="Puducherry", state="Puducherry")
+    # An analysis without a location keeps the last one known.
+    await news_archive.store_articles(async_db_session, [_article("https://a.example/flood")])
+
+    stored = (await async_db_session.execute(select(NewsArticle))).scalar_one()
+    assert (stored.city, stored.state) == ("Puducherry", "Puducherry")
+
+
+@pytest.mark.asyncio
+async def test_store_articles_skips_rows_taken_by_a_concurrent_archive(async_db_session, monkeypatch):
+    """The first pass misses a wire copy committed meanwhile; the retry folds into it."""
+    await news_archive.store_articles(async_db_session, [_article("https://a.example/flood")])
+    real_select = news_archive.select
+    calls = []
+
+    def blind_first_select(*columns):
+        calls.append(1)
+        stmt = real_select(*columns)
+        # The first lookup behaves as if it ran before the stored row was committed.
+        return stmt.where(NewsArticle.id < 0) if len(calls) == 1 else stmt
+
+    monkeypatch.setattr(news_archive, "select", blind_first_select)
+    written = await news_archive.store_articles(
+        async_db_session, [_article("https://b.example/wire-copy", source="Deccan Herald")],
+    )
+
+    assert written == 0
+    stored = (await async_db_session.execute(real_select(NewsArticle))).scalars().all()
+    assert [(a.canonical_url, a.sources) for a in stored] == [("https://a.example/flood", ["The Hindu", "Deccan Herald"])]
+
+
+@pytest.mark.no_db
+def test_content_hash_is_unique():
+    assert NewsArticle.__table__.c.content_hash.unique
@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import news_inference
+
+pytestmark = pytest.mark.no_db
+
+
+def _service(batches, **kwargs):
+    def predict(texts):
+        batches.append(list(texts))
+        return [{"text": t, "prediction": "FAKE" if "hoax" in t else "REAL", "confidence": 0.9} for t in texts]
+
+    kwargs.setdefault("warmup_fn", None)
+    return news_inference.NewsInferenceService(
+        executor_factory=lambda: ThreadPoolExecutor(max_workers=1), predict_fn=predict, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_micro_batches():
+    batches = []
+    service = _service(batches, max_batch_size=4, max_wait=0.05)
+    service.start()
+    try:
+        results = await asyncio.gather(
+            service.predict(["flood in chennai", "hoax cyclone"]),
+            service.predict(["rain"]),
+            service.predict(["a", "b", "c"]),
+        )
+    finally:
+        await service.stop()
+
+    assert [len(b) for b in batches] == [4, 2]
+    assert [r["prediction"] for r in results[0]] == ["REAL", "FAKE"]
+    assert results[1][0]["text"] == "rain"
+    assert [r["text"] for r in results[2]] == ["a", "b", "c"]
+    assert service.stats()["batches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_warmup_makes_classify_news_fall_back(monkeypatch):
+    def broken_warmup():
+        raise RuntimeError("model.h5 missing")
+
+    service = _service([], warmup_fn=broken_warmup)
+    monkeypatch.setattr(news_inference, "NEWS_INFERENCE", service)
+    assert await news_inference.classify_news(["flood"]) is None  # not started
+
+    service.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert not service.ready
+        assert await news_inference.classify_news(["flood"]) is None
+    finally:
+        await service.stop()
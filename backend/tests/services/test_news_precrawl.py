@@ -0,0 +1,214 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import feedparser
+import pytest
+
+from app.services import news_precrawl, news_scraper
+
+pytestmark = pytest.mark.no_db
+
+PAPERS = [
+    {"name": "Local", "rss_url": "http://local.example/rss", "city": "Chennai", "state": None},
+    {"name": "National", "rss_url": "http://nat.example/rss", "city": "Chennai", "state": None},
+]
+
+
+def _extract(title, body):
+    published = datetime.now(news_scraper.IST) - timedelta(hours=1)
+    html = (
+        f'<html><head><meta property="article:published_time" content="{published.isoformat()}"></head>'
+        f"<body><article><h1>{title}</h1><p>{body}</p></article></body></html>"
+    )
+    return news_scraper.extract_article(html)
+
+
+ARTICLES = {
+    "Local": [
+        ("http://local.example/a", _extract(
+            "Heavy rain floods Chennai streets",
+            "The IMD issued a red alert as heavy rainfall flooded low-lying areas of Chennai overnight.",
+        )),
+        ("http://local.example/b", _extract(
+            "Cyclone nears Mumbai coast",
+            "A cyclone with heavy rain is expected to make landfall near Mumbai by Thursday evening.",
+        )),
+    ],
+    "National": [
+        ("http://nat.example/c", _extract(
+            "Monsoon update for Chennai",
+            "Monsoon showers and a low pressure system will bring rainfall to Chennai this week.",
+        )),
+    ],
+}
+
+IMD_FEED = feedparser.parse(
+    "<rss><channel>"
+    "<item><title>CHENNAI</title><description>Thunderstorm with heavy rain likely</description></item>"
+    "<item><title>MUMBAI</title><description>Light rain</description></item>"
+    "</channel></rss>"
+)
+
+
+@pytest.fixture(autouse=True)
+def archived(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        news_precrawl, "archive_in_background",
+        lambda articles, city="", state="": calls.append((len(articles), city, state)),
+    )
+    return calls
+
+
+@pytest.fixture
+def crawls(monkeypatch):
+    calls = []
+
+    async def fake_crawl(paper):
+        calls.append(paper.name)
+        await asyncio.sleep(0.05)
+        return ARTICLES[paper.name]
+
+    async def fake_feed(url):
+        calls.append("IMD")
+        return IMD_FEED
+
+    monkeypatch.setattr(news_scraper, "crawl_paper_extracts", fake_crawl)
+    monkeypatch.setattr(news_scraper, "fetch_rss_feed", fake_feed)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyses_share_one_crawl_and_are_then_served_warm(crawls):
+    store = news_precrawl.WarmNewsStore(max_age=60)
+
+    results = await asyncio.gather(*(store.analyze(PAPERS, None) for _ in range(5)))
+
+    assert sorted(crawls) == ["IMD", "Local", "National"]
+    first = results[0]
+    assert all(r == first for r in results)
+    assert first[0]["newspaper_name"] == "IMD RSS Feed"
+    assert [a["link"] for a in first[1:]] == ["http://local.example/a", "http://nat.example/c"]
+
+    crawls.clear()
+    assert await store.analyze(PAPERS, None) == first
+    assert crawls == []
+
+    # Same stored extracts, different query.
+    mumbai = [dict(p, city="Mumbai") for p in PAPERS]
+    assert [a["link"] for a in (await store.analyze(mumbai, None))[1:]] == ["http://local.example/b"]
+    assert crawls == []
+
+    await store.analyze(PAPERS, None, force_refresh=True)
+    assert sorted(crawls) == ["IMD", "Local", "National"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_serves_previous_snapshot_while_crawl_completes(crawls, monkeypatch):
+    store = news_precrawl.WarmNewsStore(max_age=60)
+    await store.analyze(PAPERS[:1], None)
+
+    release = asyncio.Event()
+
+    async def slow_crawl(paper):
+        await release.wait()
+        return ARTICLES[paper.name][:1]
+
+    monkeypatch.setattr(news_scraper, "crawl_paper_extracts", slow_crawl)
+    results = await store.analyze(PAPERS[:1], None, force_refresh=True, deadline=0.05)
+    assert [a["link"] for a in results[1:]] == ["http://local.example/a"]
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert store.stats()["crawling"] == 0
+    assert len(store._snapshots[news_scraper.Paper(PAPERS[0]).key].data) == 1
+
+
+@pytest.mark.asyncio
+async def test_precrawler_crawls_every_newspaper_row(crawls):
+    rows = [
+        SimpleNamespace(name="Local", rss_url="http://local.example/rss", base_url=None),
+        SimpleNamespace(name="National", rss_url="http://nat.example/rss", base_url=None),
+    ]
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, stmt):
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+    store = news_precrawl.WarmNewsStore(max_age=60)
+    precrawler = news_precrawl.NewsPrecrawler(store, interval=3600, session_factory=Session)
+
+    assert await precrawler.crawl_all() == 3
+    assert store.stats()["articles"] == 3
+
+    precrawler.start()
+    await asyncio.sleep(0.01)
+    await precrawler.stop()
+
+
+@pytest.mark.asyncio
+async def test_analyze_news_coalesces_identical_requests_and_caches_briefly(monkeypatch, archived):
+    runs = []
+
+    async def fake_analyze(newspaper_dicts, keyword=None, force_refresh=False, deadline=None):
+        runs.append((keyword, force_refresh))
+        await asyncio.sleep(0.05)
+        return [{"title": f"{keyword} in {newspaper_dicts[0]['city']}"}]
+
+    monkeypatch.setattr(news_precrawl.NEWS_STORE, "analyze", fake_analyze)
+    monkeypatch.setattr(news_precrawl, "_ANALYSIS_RESULTS", news_precrawl.LRUCache(16, ttl=60))
+
+    results = await asyncio.gather(*(news_precrawl.analyze_news(PAPERS, "flood") for _ in range(5)))
+    assert runs == [("flood", False)]
+    assert all(r == [{"title": "flood in Chennai"}] for r in results)
+    results[0][0]["title"] = "mutated"
+
+    # A repeat right after is served from the short-TTL cache, unmutated.
+    assert await news_precrawl.analyze_news(PAPERS, "flood") == [{"title": "flood in Chennai"}]
+    assert len(runs) == 1
+
+    # A different keyword or city is a different analysis; force_refresh bypasses the cache.
+    await news_precrawl.analyze_news(PAPERS, "cyclone")
+    await news_precrawl.analyze_news([dict(p, city="Mumbai") for p in PAPERS], "flood")
+    await news_precrawl.analyze_news(PAPERS, "flood", force_refresh=True)
+    assert runs[1:] == [("cyclone", False), ("flood", False), ("flood", True)]
+    # Archived once per analysis actually run, with its location.
+    assert [city for _, city, _ in archived] == ["Chennai", "Chennai", "Mumbai", "Chennai"]
+
+
+@pytest.mark.asyncio
+async def test_analyze_stream_yields_each_source_as_it_is_ready(crawls, monkeypatch):
+    store = news_precrawl.WarmNewsStore(max_age=60)
+    await store.refresh_imd()
+    release = asyncio.Event()
+
+    async def crawl(paper):
+        if paper.name == "National":
+            await release.wait()
+        return ARTICLES[paper.name]
+
+    monkeypatch.setattr(news_scraper, "crawl_paper_extracts", crawl)
+    stream = store.analyze_stream(PAPERS, None)
+
+    # The warm IMD snapshot and the fast paper arrive while National still crawls.
+    source, alerts = await stream.__anext__()
+    assert (source, [a["title"] for a in alerts]) == ("IMD RSS Feed", ["CHENNAI"])
+    source, articles = await stream.__anext__()
+    assert (source, [a["link"] for a in articles]) == ("Local", ["http://local.example/a"])
+
+    release.set()
+    source, articles = await stream.__anext__()
+    assert (source, [a["link"] for a in articles]) == ("National", ["http://nat.example/c"])
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+    frames = [f async for f in store.analyze_stream(PAPERS, None)]
+    flat = [a for _, articles in frames for a in articles]
+    assert sorted(a["link"] for a in flat) == sorted(a["link"] for a in await store.analyze(PAPERS, None))
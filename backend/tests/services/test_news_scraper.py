@@ -0,0 +1,348 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import feedparser
+import httpx
+import pytest
+
+from app.services import news_scraper
+
+pytestmark = pytest.mark.no_db
+
+
+def _article_html(title, body, published=None):
+    published = published or datetime.now(news_scraper.IST) - timedelta(hours=1)
+    return (
+        "<html><head>"
+        f'<meta property="article:published_time" content="{published.isoformat()}">'
+        f"<title>{title}</title></head><body><article><h1>{title}</h1>"
+        f"<p>{body}</p></article></body></html>"
+    )
+
+
+def _response(url, text, status_code=200):
+    return httpx.Response(status_code, text=text, request=httpx.Request("GET", url))
+
+
+@pytest.fixture(autouse=True)
+def _reset_crawler_state():
+    news_scraper._ROBOTS_CACHE.clear()
+    news_scraper._DOMAIN_LIMITER.clear()
+    news_scraper.RESPONSE_CACHE.clear()
+    news_scraper._ARTICLE_CACHE.clear()
+    news_scraper.IMD_FEED_CACHE.clear()
+    yield
+    news_scraper._ROBOTS_CACHE.clear()
+    news_scraper._DOMAIN_LIMITER.clear()
+    news_scraper.RESPONSE_CACHE.clear()
+
+
+def test_filter_article_html_accepts_local_flood_report():
+    paper = SimpleNamespace(name="Daily")
+    html = _article_html(
+        "Heavy rain and flood alert for Chennai",
+        "The IMD issued an orange alert as heavy rainfall continued across Chennai and nearby districts.",
+    )
+    art = news_scraper.filter_article_html(paper, "http://daily/a", html, {"city": "Chennai", "state": ""})
+    assert art is not None
+    assert art["severity"] == "ORANGE"
+    assert art["disaster_keyword"] == "flood"
+    assert art["source"] == "Daily"
+
+
+def test_article_extraction_is_cached_across_queries(monkeypatch):
+    paper = SimpleNamespace(name="National")
+    html = _article_html(
+        "Cyclone and heavy rain warning for Tamil Nadu",
+        "The met department warned that the cyclone will bring heavy rainfall to Chennai and Madurai.",
+    )
+    calls = []
+    real_extract = news_scraper.extract_article
+
+    def counting_extract(page):
+        calls.append(page)
+        return real_extract(page)
+
+    monkeypatch.setattr(news_scraper, "extract_article", counting_extract)
+    chennai = news_scraper.filter_article_html(paper, "http://nat/a", html, {"city": "Chennai", "state": ""})
+    madurai = news_scraper.filter_article_html(paper, "http://nat/a", html, {"city": "Madurai", "state": ""})
+    mumbai = news_scraper.filter_article_html(paper, "http://nat/a", html, {"city": "Mumbai", "state": ""})
+
+    assert len(calls) == 1
+    assert chennai["priority_score"] == madurai["priority_score"]
+    assert mumbai is None
+
+
+def test_filter_article_html_rejects_man_made_and_stale_articles():
+    paper = SimpleNamespace(name="Daily")
+    body = "Heavy rainfall and flooding reported across Chennai as the monsoon intensified overnight."
+    crash = _article_html("Bus crash during flood in Chennai", body)
+    stale = _article_html("Flood in Chennai", body, datetime.now(news_scraper.IST) - timedelta(days=5))
+    query = {"city": "Chennai", "state": ""}
+    assert news_scraper.filter_article_html(paper, "http://daily/b", crash, query) is None
+    assert news_scraper.filter_article_html(paper, "http://daily/c", stale, query) is None
+
+
+@pytest.mark.asyncio
+async def test_crawl_delay_is_enforced_per_domain(monkeypatch):
+    async def fake_get(url, headers=None, timeout=None):
+        return _response(url, "ok")
+
+    monkeypatch.setattr(news_scraper, "_http_get", fake_get)
+    news_scraper._ROBOTS_CACHE["http://slow.example/robots.txt"] = news_scraper._RobotsEntry(None, 0.3)
+
+    start = time.monotonic()
+    await news_scraper.fetch_url("http://slow.example/1")
+    slow_second = asyncio.create_task(news_scraper.fetch_url("http://slow.example/2"))
+    await news_scraper.fetch_url("http://fast.example/1")
+    fast_elapsed = time.monotonic() - start
+    await slow_second
+    slow_elapsed = time.monotonic() - start
+
+    assert fast_elapsed < 0.2
+    assert slow_elapsed >= 0.3
+
+
+@pytest.mark.asyncio
+async def test_robots_is_fetched_once_and_unreachable_files_are_cached_briefly(monkeypatch):
+    calls = []
+
+    async def fake_get(url, headers=None, timeout=None):
+        calls.append(url)
+        if url.startswith("http://down.example"):
+            raise httpx.ConnectError("refused", request=httpx.Request("GET", url))
+        return _response(url, "User-agent: *\nDisallow: /private\nCrawl-delay: 1\n")
+
+    monkeypatch.setattr(news_scraper, "_http_get", fake_get)
+
+    results = await asyncio.gather(
+        news_scraper.check_robots("http://up.example/news/1"),
+        news_scraper.check_robots("http://up.example/private/2"),
+        news_scraper.check_robots("http://down.example/a"),
+        news_scraper.check_robots("http://down.example/b"),
+    )
+
+    assert results == [True, False, False, False]
+    assert sorted(calls) == ["http://down.example/robots.txt", "http://up.example/robots.txt"]
+    up = news_scraper._ROBOTS_CACHE["http://up.example/robots.txt"]
+    down = news_scraper._ROBOTS_CACHE["http://down.example/robots.txt"]
+    assert up.crawl_delay == 1.0
+    assert down.expires_at < up.expires_at
+
+    down.expires_at = 0
+    await news_scraper.check_robots("http://down.example/c")
+    assert calls.count("http://down.example/robots.txt") == 2
+
+
+def test_token_bucket_allows_bursts_then_spaces_requests():
+    from app.services.rate_limiter import DomainRateLimiter
+
+    limiter = DomainRateLimiter(burst=2)
+    delays = [limiter.reserve("a.example", 1.0) for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(1.0, abs=0.05)
+    assert delays[3] == pytest.approx(2.0, abs=0.05)
+    assert limiter.reserve("b.example", 1.0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_parse_rss_feed_stops_at_target_results(monkeypatch):
+    now = datetime.now(news_scraper.IST).strftime("%a, %d %b %Y %H:%M:%S %z")
+    items = "".join(
+        f"<item><title>t{i}</title><link>http://paper.example/a{i}</link><pubDate>{now}</pubDate></item>"
+        for i in range(20)
+    )
+    feed = f"<rss><channel>{items}</channel></rss>"
+    article = _article_html(
+        "Cyclone warning for Chennai",
+        "A cyclone is expected to bring heavy rain and storm surge to Chennai coastal areas tonight.",
+    )
+
+    async def fake_get(url, headers=None, timeout=None, **stream_options):
+        if url.endswith("robots.txt"):
+            return _response(url, "User-agent: *\nCrawl-delay: 0\n")
+        if url.endswith("/rss"):
+            return _response(url, feed)
+        return _response(url, article)
+
+    monkeypatch.setattr(news_scraper, "_http_get", fake_get)
+    monkeypatch.setattr(news_scraper, "_http_stream", fake_get)
+    paper = SimpleNamespace(name="Paper", rss_feed_url="http://paper.example/rss", base_url="http://paper.example")
+
+    results = await news_scraper.parse_rss_feed(paper, {"city": "Chennai", "state": ""}, None)
+
+    assert len(results) == news_scraper.TARGET_RESULTS
+    assert all(r["disaster_keyword"] == "cyclone" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_news_runs_sources_concurrently_and_drops_slow_ones(monkeypatch):
+    async def fake_scrape(paper, location_query, user_keywords):
+        if paper.name == "Slow":
+            await asyncio.sleep(5)
+        await asyncio.sleep(0.1)
+        return [{"title": f"{paper.name} flood", "url": f"http://{paper.name}/1", "priority_score": 3}]
+
+    async def fake_imd(city):
+        await asyncio.sleep(0.1)
+        return [{"title": city, "summary": "Heavy rain likely", "source": "IMD RSS Feed"}]
+
+    monkeypatch.setattr(news_scraper, "_scrape_paper", fake_scrape)
+    monkeypatch.setattr(news_scraper, "fetch_imd_alerts", fake_imd)
+    papers = [{"name": name, "base_url": f"http://{name}", "city": "Chennai"} for name in ("A", "B", "C", "Slow")]
+
+    start = time.monotonic()
+    results = await news_scraper.fetch_all_news(papers, deadline=0.5)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5 + 0.2
+    assert results[0]["newspaper_name"] == "IMD RSS Feed"
+    assert results[0]["disaster_keyword"] == "heavy rain"
+    assert sorted(r["newspaper_name"] for r in results[1:]) == ["A", "B", "C"]
+
+
+@pytest.mark.asyncio
+async def test_http_pool_reuses_one_client_per_tls_mode():
+    from app.services.http_client import get_http_pool, close_http_pool
+
+    pool = get_http_pool()
+    try:
+        assert get_http_pool() is pool
+        assert pool.client() is pool.client()
+        assert pool.client(verify=False) is not pool.client()
+        assert pool.host_slot("paper.example") is pool.host_slot("paper.example")
+    finally:
+        await close_http_pool()
+    assert get_http_pool() is not pool
+    await close_http_pool()
+
+
+def test_http_pool_from_a_previous_loop_is_closed_when_replaced():
+    from app.services import http_client
+
+    async def open_pool():
+        pool = http_client.get_http_pool()
+        return pool, pool.client()
+
+    async def replace_pool():
+        pool = http_client.get_http_pool()
+        await asyncio.gather(*http_client._CLOSING)
+        await http_client.close_http_pool()
+        return pool
+
+    old, client = asyncio.run(open_pool())
+    new = asyncio.run(replace_pool())
+
+    assert new is not old
+    assert client.is_closed
+
+def _streaming_pool(handler):
+    from app.services.http_client import HttpClientPool
+
+    pool = HttpClientPool(asyncio.get_running_loop())
+    pool._clients[True] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_stale_article_is_rejected_from_its_head(monkeypatch):
+    stale = datetime.now(news_scraper.IST) - timedelta(days=5)
+    head = _article_html("Flood in Chennai", "", stale).split("<body>")[0] + "<body>"
+    served = []
+
+    class Body(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for chunk in [head.encode()] + [b"<p>" + b"x" * 4096 + b"</p>"] * 50:
+                served.append(len(chunk))
+                yield chunk
+
+    pool = _streaming_pool(lambda request: httpx.Response(200, stream=Body()))
+    monkeypatch.setattr(news_scraper, "get_http_pool", lambda: pool)
+    news_scraper._ROBOTS_CACHE["http://paper.example/robots.txt"] = news_scraper._RobotsEntry(
+        SimpleNamespace(can_fetch=lambda *a: True), 0
+    )
+
+    paper = SimpleNamespace(name="Paper")
+    result = await news_scraper.parse_article_page(paper, "http://paper.example/a", {"city": "Chennai", "state": ""})
+
+    assert result is None
+    assert len(served) == 1
+    cached = await news_scraper.RESPONSE_CACHE.get("http://paper.example/a")
+    assert cached.content.endswith(b"</head>")
+
+
+@pytest.mark.asyncio
+async def test_article_download_is_capped(monkeypatch):
+    page = _article_html("Flood in Chennai", "heavy rain " * 2000).encode()
+    pool = _streaming_pool(lambda request: httpx.Response(200, content=page))
+    monkeypatch.setattr(news_scraper, "get_http_pool", lambda: pool)
+
+    resp = await news_scraper._http_stream("http://paper.example/b", max_bytes=1000, head_check=news_scraper.head_is_recent)
+
+    assert resp.content == page[:1000]
+    assert resp.headers["content-length"] == "1000"
+
+
+@pytest.mark.asyncio
+async def test_capped_body_is_cached_without_validators(monkeypatch):
+    page = _article_html("Flood in Chennai", "heavy rain " * 2000).encode()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"', "last-modified": "Mon, 01 Jul 2024 09:00:00 GMT"}, content=page)
+
+    monkeypatch.setattr(news_scraper, "get_http_pool", lambda: _streaming_pool(handler))
+    monkeypatch.setattr(news_scraper.RESPONSE_CACHE, "ttl", 0)
+
+    capped = await news_scraper._cached_get("http://paper.example/big", {}, 5, polite=False, max_bytes=1000)
+    assert capped.content == page[:1000] and "etag" not in capped.headers
+    cached = await news_scraper.RESPONSE_CACHE.get("http://paper.example/big")
+    assert cached.content == page[:1000] and cached.validators() == {}
+
+    # Once stale the partial body is fetched again, not revalidated into a 304.
+    await news_scraper._cached_get("http://paper.example/big", {}, 5, polite=False, max_bytes=1000)
+    assert "if-none-match" not in requests[1].headers
+
+    # A body read in full keeps its validators.
+    full = await news_scraper._cached_get("http://paper.example/big", {}, 5, polite=False, max_bytes=len(page) + 1)
+    assert full.content == page
+    assert (await news_scraper.RESPONSE_CACHE.get("http://paper.example/big")).etag == '"v1"'
+
+
+IMD_NOWCAST = feedparser.parse(
+    "<rss><channel>"
+    "<item><title>NEW DELHI</title><description>Thunderstorm likely</description></item>"
+    "<item><title>Chennai</title><description>Heavy rain likely</description></item>"
+    "<item><title>SOUTH DELHI</title><description>Light rain</description></item>"
+    "<item><title>  chennai </title><description>Gusty winds</description></item>"
+    "<item><description>Untitled entry</description></item>"
+    "</channel></rss>"
+)
+
+
+def test_imd_index_matches_legacy_city_filter():
+    index = news_scraper.ImdNowcastIndex(IMD_NOWCAST)
+    for city in ["Chennai", " CHENNAI ", "Delhi", "new delhi", "Mumbai", "", "  ", "i"]:
+        assert index.alerts(city) == news_scraper.imd_alerts_from_feed(IMD_NOWCAST, city), city
+
+
+@pytest.mark.asyncio
+async def test_imd_feed_is_fetched_once_for_all_cities(monkeypatch):
+    downloads = []
+
+    async def fake_feed(url):
+        downloads.append(url)
+        await asyncio.sleep(0.01)
+        return IMD_NOWCAST
+
+    monkeypatch.setattr(news_scraper, "fetch_rss_feed", fake_feed)
+    results = await asyncio.gather(*(news_scraper.fetch_imd_alerts(c) for c in ["Chennai", "Delhi", "Chennai", "Pune"]))
+    results.append(await news_scraper.fetch_imd_alerts("Delhi"))
+
+    assert downloads == [news_scraper.IMD_RSS_URL]
+    assert [len(r) for r in results] == [2, 2, 2, 0, 2]
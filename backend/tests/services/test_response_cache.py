@@ -0,0 +1,78 @@
+import httpx
+import pytest
+
+from app.services import news_scraper
+from app.services.lru_cache import LRUCache
+from app.services.response_cache import CachedResponse, ResponseCache, SqliteResponseStore
+
+pytestmark = pytest.mark.no_db
+
+
+def _response(url, status_code=200, text="", headers=None):
+    return httpx.Response(status_code, text=text, headers=headers, request=httpx.Request("GET", url))
+
+
+def test_lru_cache_evicts_by_weight_and_tracks_hits():
+    cache = LRUCache(10, sizeof=len)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    assert cache.get("a") == b"12345"
+    cache.set("c", b"123")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.get("c") == b"123"
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_url_serves_fresh_entries_and_revalidates_stale_ones(monkeypatch):
+    cache = ResponseCache(ttl=60)
+    monkeypatch.setattr(news_scraper, "RESPONSE_CACHE", cache)
+    monkeypatch.setattr(news_scraper, "DEFAULT_CRAWL_DELAY", 0)
+    url = "http://paper.example/article"
+    calls = []
+
+    async def fake_get(request_url, headers=None, timeout=None):
+        calls.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return _response(request_url, 304, headers={"ETag": '"v1"'})
+        return _response(request_url, text="<p>body</p>", headers={"ETag": '"v1"', "Content-Type": "text/html"})
+
+    monkeypatch.setattr(news_scraper, "_http_get", fake_get)
+
+    first = await news_scraper.fetch_url(url)
+    second = await news_scraper.fetch_url(url)
+    assert first.text == second.text == "<p>body</p>"
+    assert len(calls) == 1  # second read served from cache without a request
+
+    cache.memory.get(url).stored_at -= 120  # age past the TTL
+    third = await news_scraper.fetch_url(url)
+    assert third.text == "<p>body</p>"
+    assert calls[-1]["If-None-Match"] == '"v1"'
+    assert cache.is_fresh(cache.memory.get(url))
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_memory_loss_and_drops_expired(tmp_path):
+    store = SqliteResponseStore(str(tmp_path / "responses.sqlite"))
+    cache = ResponseCache(ttl=60, max_age=3600, disk=store)
+    url = "http://paper.example/section"
+    await cache.store(url, _response(url, text="section", headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}))
+
+    cache.clear()
+    entry = await cache.get(url)
+    assert entry.content == b"section"
+    assert entry.validators() == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+    store.put(CachedResponse(url=url, content=b"old", stored_at=0))
+    cache.clear()
+    assert await cache.get(url) is None
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_no_store_responses_are_not_cached():
+    cache = ResponseCache()
+    url = "http://paper.example/live"
+    assert await cache.store(url, _response(url, text="x", headers={"Cache-Control": "no-store"})) is None
+    assert await cache.get(url) is None
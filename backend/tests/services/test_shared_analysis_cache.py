@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.news_models import NewsAnalysisCache, NewsAnalysisLease
+from app.services.shared_analysis_cache import SharedAnalysisCache, cache_key_digest
+
+KEY = (("paper",), "Chennai", "Tamil Nadu", "")
+
+
+@pytest_asyncio.fixture
+async def sessions(async_db_session):
+    return async_sessionmaker(bind=async_db_session.bind, expire_on_commit=False)
+
+
+async def _lease(sessions):
+    async with sessions() as session:
+        return (await session.execute(select(NewsAnalysisLease))).scalar_one_or_none()
+
+
+@pytest.mark.asyncio
+async def test_one_worker_computes_outside_any_transaction(sessions):
+    workers = [SharedAnalysisCache(ttl=60, session_factory=sessions, poll_interval=0.01) for _ in range(3)]
+    calls, seen_during_compute = [], []
+
+    async def compute():
+        calls.append(1)
+        # The lease is committed and the result not yet written while computing.
+        seen_during_compute.append(await _lease(sessions))
+        async with sessions() as session:
+            assert await session.get(NewsAnalysisCache, cache_key_digest(KEY)) is None
+        await asyncio.sleep(0.05)
+        return [{"title": "Flood"}]
+
+    results = await asyncio.gather(*(w.get_or_compute(KEY, compute) for w in workers))
+
+    assert results == [[{"title": "Flood"}]] * 3
+    assert len(calls) == 1
+    assert seen_during_compute[0] is not None
+    assert await _lease(sessions) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_compute_releases_the_lease(sessions):
+    cache = SharedAnalysisCache(ttl=60, session_factory=sessions, poll_interval=0.01)
+
+    async def broken():
+        raise RuntimeError("crawl failed")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute(KEY, broken)
+    assert await _lease(sessions) is None
+
+    async def compute():
+        return [{"title": "ok"}]
+
+    assert await cache.get_or_compute(KEY, compute) == [{"title": "ok"}]
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_of_a_dead_worker_is_taken_over(sessions):
+    async with sessions() as session:
+        session.add(NewsAnalysisLease(
+            cache_key=cache_key_digest(KEY), owner="dead",
+            expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        ))
+        await session.commit()
+
+    cache = SharedAnalysisCache(ttl=60, session_factory=sessions, poll_interval=0.01)
+
+    async def compute():
+        return [{"title": "recovered"}]
+
+    result = await asyncio.wait_for(cache.get_or_compute(KEY, compute), timeout=5)
+    assert result == [{"title": "recovered"}]
@@ -0,0 +1,166 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import status
+
+from app.services import pubsub
+from app.services.pubsub import InMemoryHub, InMemoryPubSub, PayloadTooLarge, PostgresPubSub
+from app.services.websocket_manager import CHANNEL_PREFIX, ConnectionManager
+
+pytestmark = pytest.mark.no_db
+
+
+class FakeSocket:
+    def __init__(self, gate=None, fail=False):
+        self.sent = []
+        self.gate = gate
+        self.fail = fail
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code):
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_sockets_on_other_workers_once():
+    hub = InMemoryHub()
+    worker_a = ConnectionManager(backend=InMemoryPubSub(hub))
+    worker_b = ConnectionManager(backend=InMemoryPubSub(hub))
+    on_a, on_b, elsewhere = FakeSocket(), FakeSocket(), FakeSocket()
+    await worker_a.connect(on_a, "teams:1")
+    await worker_b.connect(on_b, "teams:1")
+    await worker_b.connect(elsewhere, "teams:2")
+
+    await worker_a.broadcast({"text": "evacuate"}, "teams:1")
+    await worker_a.drain()
+    await worker_b.drain()
+
+    # Local delivery plus fan-out, and no echo back to the publishing worker.
+    assert on_a.sent == [{"text": "evacuate"}]
+    assert on_b.sent == [{"text": "evacuate"}]
+    assert elsewhere.sent == []
+
+
+@pytest.mark.asyncio
+async def test_workers_subscribe_only_to_rooms_with_local_sockets():
+    hub = InMemoryHub()
+    backend = InMemoryPubSub(hub)
+    manager = ConnectionManager(backend=backend)
+    first, second = FakeSocket(), FakeSocket()
+
+    await manager.connect(first, "global:1")
+    await manager.connect(second, "global:1")
+    assert backend.channels == {CHANNEL_PREFIX + "global:1"}
+
+    manager.disconnect(first, "global:1")
+    await asyncio.sleep(0)
+    assert backend.channels == {CHANNEL_PREFIX + "global:1"}
+
+    manager.disconnect(second, "global:1")
+    await asyncio.sleep(0)
+    assert backend.channels == set()
+    assert hub.subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_publish_failure_still_delivers_locally():
+    class BrokenBackend(InMemoryPubSub):
+        async def publish(self, channel, payload):
+            raise ConnectionError("broker down")
+
+    manager = ConnectionManager(backend=BrokenBackend())
+    socket = FakeSocket()
+    await manager.connect(socket, "teams:1")
+    await manager.broadcast({"text": "hello"}, "teams:1")
+    await manager.drain()
+    assert socket.sent == [{"text": "hello"}]
+
+
+@pytest.mark.asyncio
+async def test_slow_socket_does_not_delay_the_room_and_drops_its_oldest_messages():
+    manager = ConnectionManager(queue_size=2, overflow_policy="drop_oldest")
+    gate = asyncio.Event()
+    slow, fast = FakeSocket(gate=gate), FakeSocket()
+    await manager.connect(slow, "teams:1")
+    await manager.connect(fast, "teams:1")
+
+    for n in range(5):
+        await manager.broadcast({"n": n}, "teams:1")
+        await asyncio.sleep(0)
+    assert fast.sent == [{"n": n} for n in range(5)]
+    assert slow.sent == []
+
+    gate.set()
+    await manager.drain()
+    # Message 0 was already being sent; 1 and 2 were dropped for 3 and 4.
+    assert slow.sent == [{"n": 0}, {"n": 3}, {"n": 4}]
+    assert manager.stats()["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_consumers():
+    manager = ConnectionManager(queue_size=1, overflow_policy="disconnect")
+    slow, fast = FakeSocket(gate=asyncio.Event()), FakeSocket()
+    await manager.connect(slow, "teams:1")
+    await manager.connect(fast, "teams:1")
+
+    for n in range(3):
+        await manager.broadcast({"n": n}, "teams:1")
+        await asyncio.sleep(0)
+    await manager.drain()
+
+    assert manager.active_connections["teams:1"] == [fast]
+    assert slow.close_code == status.WS_1013_TRY_AGAIN_LATER
+    assert len(fast.sent) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_and_timed_out_sockets_are_evicted():
+    manager = ConnectionManager(send_timeout=0.01)
+    dead, stuck, ok = FakeSocket(fail=True), FakeSocket(gate=asyncio.Event()), FakeSocket()
+    for socket in (dead, stuck, ok):
+        await manager.connect(socket, "global:1")
+
+    await manager.broadcast({"text": "hi"}, "global:1")
+    await asyncio.sleep(0.05)
+
+    assert manager.active_connections["global:1"] == [ok]
+    assert manager.stats() == {"rooms": 1, "connections": 1, "queued": 0, "dropped": 0, "evicted": 2}
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_rejects_oversized_payloads_before_connecting():
+    backend = PostgresPubSub("postgresql://unused")
+    with pytest.raises(PayloadTooLarge):
+        await backend.publish("ws:teams:1", "x" * (pubsub.MAX_NOTIFY_PAYLOAD + 1))
+
+
+def test_fits_counts_the_whole_published_payload():
+    assert ConnectionManager(backend=InMemoryPubSub()).fits({"message_text": "x" * 100_000})
+
+    manager = ConnectionManager(backend=PostgresPubSub("postgresql://unused"))
+    overhead = len(manager.instance_id) + 1 + len(json.dumps({"message_text": ""}))
+    room = pubsub.MAX_NOTIFY_PAYLOAD - overhead
+    assert manager.fits({"message_text": "x" * room})
+    assert not manager.fits({"message_text": "x" * (room + 1)})
+    # Multi-byte characters count in bytes, as PostgreSQL does.
+    assert not manager.fits({"message_text": "\u0928" * room})
+
+
+def test_backend_factory(monkeypatch):
+    monkeypatch.setattr("app.database.SQLALCHEMY_DATABASE_URL", "postgresql+asyncpg://u:p@db:5432/roshni")
+    backend = pubsub.create_pubsub_backend("postgres")
+    assert isinstance(backend, PostgresPubSub)
+    assert backend.dsn == "postgresql://u:p@db:5432/roshni"
+    assert isinstance(pubsub.create_pubsub_backend("memory"), InMemoryPubSub)
@@ -41,6 +41,7 @@ def test_database_extension_guard(monkeypatch):
     assert commands == [
         'CREATE EXTENSION IF NOT EXISTS "uuid-ossp"',
         'CREATE EXTENSION IF NOT EXISTS "postgis"',
+        'CREATE EXTENSION IF NOT EXISTS "pg_trgm"',
     ]
 
 